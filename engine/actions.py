@@ -1,7 +1,10 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict
+from functools import lru_cache
+from itertools import combinations
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+import hashlib
 
 
 class ActionType(str, Enum):
@@ -64,8 +67,357 @@ class ActionType(str, Enum):
 
 
 
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return ActionData(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+class ActionData(dict):
+    """
+    Payload inmutable y hashable de una Action.
+
+    Sigue siendo un dict (lectura, json.dumps, `==` contra dicts), pero no
+    admite mutación; listas anidadas se guardan como tuplas.
+    """
+
+    __slots__ = ("_hash",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        raw = dict(*args, **kwargs)
+        if any(isinstance(v, (dict, list, tuple, set)) for v in raw.values()):
+            raw = {k: _freeze(v) for k, v in raw.items()}
+        dict.__init__(self, raw)
+        self._hash = None
+
+    @classmethod
+    def of(cls, data: Any) -> "ActionData":
+        if type(data) is cls:
+            return data
+        return cls(data or {})
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        h = self._hash
+        if h is None:
+            h = self._hash = hash(frozenset(self.items()))
+        return h
+
+    def __reduce__(self):
+        return (ActionData, (dict(self),))
+
+    def __copy__(self) -> "ActionData":
+        return self
+
+    def __deepcopy__(self, memo: Any) -> "ActionData":
+        return self
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("Action.data es inmutable")
+
+    __setitem__ = __delitem__ = _immutable  # type: ignore[assignment]
+    pop = popitem = clear = update = setdefault = _immutable  # type: ignore[assignment]
+    __ior__ = _immutable  # type: ignore[assignment]
+
+
+_EMPTY_DATA = ActionData()
+
+
 @dataclass(frozen=True)
 class Action:
     actor: str
     type: ActionType
     data: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        data = self.data
+        if type(data) is not ActionData:
+            object.__setattr__(self, "data", ActionData.of(data) if data else _EMPTY_DATA)
+
+
+# --- Codificación entera de acciones (interning) ---
+# Cada acción concreta (actor + tipo + parámetros) tiene un código entero de
+# 63 bits derivado de su contenido (blake2b sobre la forma canónica), no del
+# orden en que se vio: el mismo en todos los procesos y máquinas, así que
+# logs y datasets de distintos workers se mezclan sin remapear. La tabla
+# código -> acción solo hace falta para decodificar códigos en un proceso
+# que todavía no vio esas acciones.
+
+_ACTION_CODES: Dict[Action, int] = {}
+_ACTIONS: Dict[int, Action] = {}
+
+_CODE_MASK = (1 << 63) - 1
+
+
+def _canonical(value: Any) -> Any:
+    # Valores iguales para Python (True == 1 == 1.0) deben dar el mismo
+    # código, igual que dan la misma Action
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _canonical(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_canonical(v) for v in value), key=repr))
+    if isinstance(value, bool) or (isinstance(value, float) and value.is_integer()):
+        return int(value)
+    return value
+
+
+def _content_code(action: Action) -> int:
+    key = repr((action.type.value, str(action.actor), _canonical(action.data)))
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") & _CODE_MASK
+
+
+def action_code(action: Action) -> int:
+    """Código entero de la acción (determinista, ver arriba) y la registra."""
+    code = _ACTION_CODES.get(action)
+    if code is None:
+        code = _content_code(action)
+        known = _ACTIONS.get(code)
+        if known is not None and known != action:
+            raise ValueError(f"Action code collision {code}: {known} vs {action}")
+        _ACTION_CODES[action] = code
+        _ACTIONS.setdefault(code, action)
+    return code
+
+
+def intern_action(action: Action) -> Action:
+    """Instancia canónica (compartida) equivalente a `action`."""
+    return _ACTIONS[action_code(action)]
+
+
+def decode_action(code: int) -> Action:
+    try:
+        return _ACTIONS[code]
+    except KeyError:
+        raise KeyError(f"Unknown action code: {code}") from None
+
+
+def export_action_table() -> List[Dict[str, Any]]:
+    """Tabla serializable de las acciones registradas en este proceso."""
+    return [
+        {"code": code, "actor": a.actor, "type": a.type.value, "data": dict(a.data)}
+        for code, a in _ACTIONS.items()
+    ]
+
+
+def load_action_table(rows: List[Dict[str, Any]]) -> None:
+    """
+    Registra una tabla exportada (de este u otro proceso). Como los códigos
+    salen del contenido, tablas de distintos workers se cargan una tras otra
+    sin conflictos; un "code" que no coincide con el recalculado indica una
+    tabla de otra codificación y levanta ValueError.
+    """
+    for row in rows:
+        action = Action(actor=row["actor"], type=ActionType(row["type"]), data=row.get("data") or {})
+        code = action_code(action)
+        if "code" in row and row["code"] != code:
+            raise ValueError(f"Action table code mismatch for {action}: {row['code']} != {code}")
+
+
+class LegalActions(list):
+    """
+    Lista de acciones legales con pertenencia O(1) (`action in legal` usa un
+    set construido la primera vez que se consulta). Sigue siendo una lista
+    mutable: cualquier mutación invalida el set.
+    """
+
+    __slots__ = ("_set",)
+
+    def __init__(self, actions: Any = ()) -> None:
+        list.__init__(self, actions)
+        self._set = None
+
+    def __contains__(self, action: object) -> bool:
+        s = self._set
+        if s is None:
+            s = self._set = frozenset(self)
+        try:
+            return action in s
+        except TypeError:  # objetos no hashables nunca son acciones legales
+            return False
+
+    # Mutaciones: invalidan el set de pertenencia
+    def append(self, action: Action) -> None:
+        self._set = None
+        list.append(self, action)
+
+    def extend(self, actions: Any) -> None:
+        self._set = None
+        list.extend(self, actions)
+
+    def insert(self, index: int, action: Action) -> None:
+        self._set = None
+        list.insert(self, index, action)
+
+    def pop(self, index: int = -1) -> Action:
+        self._set = None
+        return list.pop(self, index)
+
+    def remove(self, action: Action) -> None:
+        self._set = None
+        list.remove(self, action)
+
+    def clear(self) -> None:
+        self._set = None
+        list.clear(self)
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        self._set = None
+        list.__setitem__(self, index, value)
+
+    def __delitem__(self, index: Any) -> None:
+        self._set = None
+        list.__delitem__(self, index)
+
+    def __iadd__(self, actions: Any) -> "LegalActions":
+        self._set = None
+        return list.__iadd__(self, actions)
+
+
+# --- Acciones paramétricas ---
+# Acciones combinatorias (pares de TABERNA, SELL/DROP por objeto) se
+# describen como `tipo(params...)` sobre un dominio, sin materializar cada
+# combinación. get_legal_actions las expande; get_legal_action_space las
+# devuelve como ActionFamily para policies/búsqueda.
+
+FAMILY_SINGLE = "single"  # un parámetro: cada valor del pool
+FAMILY_PAIRS = "pairs"    # dos parámetros: pares (a, b) del pool con a antes que b
+
+
+@dataclass(frozen=True)
+class ActionFamily:
+    """
+    Familia de acciones `type(params)` con valores tomados de `pool`.
+
+    - single: params=(p,), una acción por valor del pool.
+    - pairs:  params=(a, b), una acción por par de posiciones i < j.
+
+    El pool no debe tener duplicados (len() y el muestreo sin reemplazo de
+    MCTS cuentan posiciones): quien arma la familia los quita antes.
+
+    `fixed` agrega pares (clave, valor) constantes al data de cada acción.
+    El orden de iteración es el de la enumeración clásica.
+    """
+    actor: str
+    type: ActionType
+    params: Tuple[str, ...]
+    pool: Tuple[Any, ...]
+    kind: str = FAMILY_SINGLE
+    fixed: Tuple[Tuple[str, Any], ...] = ()
+
+    def __len__(self) -> int:
+        n = len(self.pool)
+        return n if self.kind == FAMILY_SINGLE else n * (n - 1) // 2
+
+    def values(self) -> Iterator[Tuple[Any, ...]]:
+        """Tuplas de parámetros, de forma perezosa."""
+        if self.kind == FAMILY_SINGLE:
+            return ((v,) for v in self.pool)
+        return combinations(self.pool, 2)
+
+    def make(self, *values: Any) -> Action:
+        """Acción concreta para estos parámetros (no valida pertenencia)."""
+        data = dict(zip(self.params, values))
+        data.update(self.fixed)
+        return Action(actor=self.actor, type=self.type, data=data)
+
+    def __iter__(self) -> Iterator[Action]:
+        return (self.make(*values) for values in self.values())
+
+    def actions(self) -> Tuple[Action, ...]:
+        """Expansión completa (cacheada: la familia es inmutable)."""
+        return _family_actions(self)
+
+    def contains(self, action: Any) -> bool:
+        """Pertenencia sin expandir la familia."""
+        if not isinstance(action, Action) or action.actor != self.actor or action.type != self.type:
+            return False
+        data = action.data
+        if len(data) != len(self.params) + len(self.fixed):
+            return False
+        for key, value in self.fixed:
+            if data.get(key, _MISSING) != value:
+                return False
+        index = _pool_index(self.pool)
+        if self.kind == FAMILY_SINGLE:
+            return data.get(self.params[0], _MISSING) in index
+        ia = index.get(data.get(self.params[0], _MISSING))
+        ib = index.get(data.get(self.params[1], _MISSING))
+        return ia is not None and ib is not None and ia < ib
+
+    def sample(self, rng: Any) -> Action:
+        """Miembro uniforme de la familia (rng: RNG o random.Random)."""
+        if self.kind == FAMILY_SINGLE:
+            return self.make(rng.choice(self.pool))
+        i, j = sorted(rng.sample(range(len(self.pool)), 2))
+        return self.make(self.pool[i], self.pool[j])
+
+    def argmax(self, score: Callable[..., float]) -> Action:
+        """Miembro con mayor score(*params) (el primero en caso de empate)."""
+        best, best_score = None, None
+        for values in self.values():
+            value = score(*values)
+            if best_score is None or value > best_score:
+                best, best_score = values, value
+        if best is None:
+            raise ValueError("argmax() on empty ActionFamily")
+        return self.make(*best)
+
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=1024)
+def _family_actions(family: ActionFamily) -> Tuple[Action, ...]:
+    return tuple(family)
+
+
+@lru_cache(maxsize=1024)
+def _pool_index(pool: Tuple[Any, ...]) -> Dict[Any, int]:
+    index: Dict[Any, int] = {}
+    for i, value in enumerate(pool):
+        index.setdefault(value, i)
+    return index
+
+
+class ActionSpace(LegalActions):
+    """
+    Espacio de acciones legales: acciones concretas y ActionFamily.
+    `action in space` reconoce miembros de las familias sin expandirlas.
+    """
+
+    __slots__ = ()
+
+    def __contains__(self, action: object) -> bool:
+        if LegalActions.__contains__(self, action):
+            return True
+        return any(type(item) is ActionFamily and item.contains(action) for item in self)
+
+    def families(self) -> List[ActionFamily]:
+        return [item for item in self if type(item) is ActionFamily]
+
+    def size(self) -> int:
+        """Número de acciones concretas representadas."""
+        return sum(len(item) if type(item) is ActionFamily else 1 for item in self)
+
+    def expand(self) -> LegalActions:
+        return LegalActions(expand_action_space(self))
+
+
+def expand_action_space(items: Any) -> List[Action]:
+    """Lista de acciones concretas (familias expandidas en su posición)."""
+    out: List[Action] = []
+    for item in items:
+        if type(item) is ActionFamily:
+            out.extend(item.actions())
+        else:
+            out.append(item)
+    return out
+
+
+ActionOrFamily = Union[Action, ActionFamily]
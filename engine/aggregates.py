@@ -0,0 +1,117 @@
+"""
+Agregados del estado: llaves en mano, cordura mínima/total, salas
+reveladas, cartas restantes en las cajas, jugadores por piso y jugadores
+en el Umbral.
+
+compute_aggregates() los calcula todos en una sola pasada. state_aggregates()
+(o GameState.aggregates) los cachea en el estado indexados por `_version`,
+igual que la caché de legalidad: entre steps las lecturas repetidas (reward,
+features, resumen, policies) son O(1). step() incrementa la versión al
+entrar y al salir, así que nada calculado a mitad de un step queda vigente.
+Quien mute el estado a mano debe llamar state.touch() antes de volver a leer.
+
+Con CHECK_AGGREGATES (o CARCOSA_CHECK_AGGREGATES=1 en el entorno) cada
+lectura cacheada se contrasta con un recálculo completo.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import os
+
+from engine.board import floor_of
+
+
+CHECK_AGGREGATES = os.environ.get("CARCOSA_CHECK_AGGREGATES", "") not in ("", "0")
+
+
+@dataclass(frozen=True, slots=True)
+class StateAggregates:
+    n_players: int
+    keys_in_hand: int
+    sanity_total: int
+    min_sanity: Optional[int]      # None si no hay jugadores
+    umbral_count: int              # jugadores con at_umbral
+    revealed_rooms: int            # salas con revealed > 0
+    deck_cards_remaining: int      # cartas restantes (cajas; o salas si no hay cajas)
+    players_per_floor: Dict[int, int]  # solo lectura
+
+    @property
+    def umbral_fraction(self) -> float:
+        return self.umbral_count / self.n_players if self.n_players else 0.0
+
+    @property
+    def mean_sanity(self) -> Optional[float]:
+        return self.sanity_total / self.n_players if self.n_players else None
+
+    def players_on_floor(self, floor: int) -> int:
+        return self.players_per_floor.get(floor, 0)
+
+
+def keys_in_hand(state: Any) -> int:
+    return sum(p.keys for p in state.players.values())
+
+
+def deck_cards_remaining(state: Any) -> int:
+    """Cartas restantes en las cajas (o en las salas no-pasillo si no hay cajas)."""
+    if state.boxes:
+        return sum(box.deck.remaining() for box in state.boxes.values())
+    remaining = 0
+    for rid, room in state.rooms.items():
+        if str(rid).endswith("_P"):
+            continue
+        remaining += room.deck.remaining()
+    return remaining
+
+
+def compute_aggregates(state: Any) -> StateAggregates:
+    """Recalcula todos los agregados en una pasada (sin caché)."""
+    keys = 0
+    sanity_total = 0
+    min_sanity: Optional[int] = None
+    umbral = 0
+    per_floor: Dict[int, int] = {}
+    for p in state.players.values():
+        keys += p.keys
+        sanity = p.sanity
+        sanity_total += sanity
+        if min_sanity is None or sanity < min_sanity:
+            min_sanity = sanity
+        if p.at_umbral:
+            umbral += 1
+        f = floor_of(p.room)
+        per_floor[f] = per_floor.get(f, 0) + 1
+
+    revealed = 0
+    for room in state.rooms.values():
+        if room.revealed > 0:
+            revealed += 1
+
+    return StateAggregates(
+        n_players=len(state.players),
+        keys_in_hand=keys,
+        sanity_total=sanity_total,
+        min_sanity=min_sanity,
+        umbral_count=umbral,
+        revealed_rooms=revealed,
+        deck_cards_remaining=deck_cards_remaining(state),
+        players_per_floor=per_floor,
+    )
+
+
+def state_aggregates(state: Any) -> StateAggregates:
+    """Agregados del estado, cacheados por versión (ver docstring del módulo)."""
+    version = state._version
+    entry = state._aggregates
+    if entry is not None and entry[0] == version:
+        agg = entry[1]
+        if CHECK_AGGREGATES:
+            fresh = compute_aggregates(state)
+            if fresh != agg:
+                raise AssertionError(
+                    f"Stale aggregates at version {version} (state mutated without touch()): "
+                    f"cached={agg} fresh={fresh}"
+                )
+        return agg
+    agg = compute_aggregates(state)
+    state._aggregates = (version, agg)
+    return agg
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Tuple
 from engine.types import RoomId
 
 
@@ -7,14 +9,24 @@ FLOORS = 3
 ROOMS_PER_FLOOR = 4
 
 
-def floor_of(room_id: RoomId) -> int:
+def _parse_floor(room_id: RoomId) -> int:
     # "F2_R3" o "F2_P"
     prefix = str(room_id).split("_")[0]
     return int(prefix[1:])
 
 
+def floor_of(room_id: RoomId) -> int:
+    f = NODE_FLOOR_BY_ID.get(room_id)
+    if f is None:
+        return _parse_floor(room_id)
+    return f
+
+
 def is_corridor(room_id: RoomId) -> bool:
-    return str(room_id).endswith("_P")
+    c = NODE_IS_CORRIDOR_BY_ID.get(room_id)
+    if c is None:
+        return str(room_id).endswith("_P")
+    return c
 
 
 def corridor_id(floor: int) -> RoomId:
@@ -121,10 +133,10 @@ def _validate_box_mapping(box_at_room: Dict[RoomId, str]) -> None:
         raise ValueError(f"Invalid box mapping: {detail}")
 
 
-def neighbors(room: RoomId) -> List[RoomId]:
-    f = floor_of(room)
-    if is_corridor(room):
-        return [room_id(f, i) for i in range(1, ROOMS_PER_FLOOR + 1)]
+def _parse_neighbors(room: RoomId) -> Tuple[RoomId, ...]:
+    f = _parse_floor(room)
+    if str(room).endswith("_P"):
+        return tuple(room_id(f, i) for i in range(1, ROOMS_PER_FLOOR + 1))
     # habitación conecta a pasillo del piso (1 movimiento)
     neighbors_list = [corridor_id(f)]
     # Agregar conexiones directas canónicas (1 movimiento):
@@ -138,7 +150,69 @@ def neighbors(room: RoomId) -> List[RoomId]:
         neighbors_list.append(room_id(f, 4))
     elif room_num == 4:
         neighbors_list.append(room_id(f, 3))
-    return neighbors_list
+    return tuple(neighbors_list)
+
+
+def neighbors(room: RoomId) -> Tuple[RoomId, ...]:
+    """Vecinos en el mismo piso (tupla precomputada; no incluye escaleras)."""
+    nbs = NEIGHBOR_IDS.get(room)
+    if nbs is None:
+        return _parse_neighbors(room)
+    return nbs
+
+
+# --- Modelo entero del tablero ---
+# 15 nodos con id entero: por piso, pasillo y luego R1..R4.
+# El código caliente trabaja con índices y tuplas; los RoomId quedan en los bordes.
+
+ROOM_IDS: Tuple[RoomId, ...] = tuple(
+    rid
+    for f in range(1, FLOORS + 1)
+    for rid in (corridor_id(f), *(room_id(f, r) for r in range(1, ROOMS_PER_FLOOR + 1)))
+)
+N_NODES = len(ROOM_IDS)
+ROOM_INDEX: Dict[RoomId, int] = {rid: i for i, rid in enumerate(ROOM_IDS)}
+
+NODE_FLOOR: Tuple[int, ...] = tuple(_parse_floor(rid) for rid in ROOM_IDS)
+NODE_IS_CORRIDOR: Tuple[bool, ...] = tuple(str(rid).endswith("_P") for rid in ROOM_IDS)
+CORRIDOR_NODE: Dict[int, int] = {f: ROOM_INDEX[corridor_id(f)] for f in range(1, FLOORS + 1)}
+
+NEIGHBOR_IDS: Dict[RoomId, Tuple[RoomId, ...]] = {rid: _parse_neighbors(rid) for rid in ROOM_IDS}
+NODE_NEIGHBORS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(ROOM_INDEX[nb] for nb in NEIGHBOR_IDS[rid]) for rid in ROOM_IDS
+)
+
+NODE_FLOOR_BY_ID: Dict[RoomId, int] = dict(zip(ROOM_IDS, NODE_FLOOR))
+NODE_IS_CORRIDOR_BY_ID: Dict[RoomId, bool] = dict(zip(ROOM_IDS, NODE_IS_CORRIDOR))
+
+
+def room_index(room: RoomId) -> Optional[int]:
+    """Índice entero del nodo (None si no es un nodo canónico)."""
+    return ROOM_INDEX.get(room)
+
+
+def stairs_key(stairs: Mapping[int, RoomId]) -> Tuple[int, ...]:
+    """Clave hashable del overlay de escaleras: índice de la escalera por piso (-1 si falta)."""
+    return tuple(ROOM_INDEX.get(stairs.get(f), -1) for f in range(1, FLOORS + 1))
+
+
+@lru_cache(maxsize=None)
+def stairs_overlay(key: Tuple[int, ...]) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Vecinos por nodo incluyendo escaleras permanentes: la habitación con
+    escalera de un piso conecta con la de los pisos adyacentes (como MOVE en
+    legality). Hay 4^3 configuraciones posibles; se cachean todas.
+    """
+    adj = [list(nbs) for nbs in NODE_NEIGHBORS]
+    for f in range(1, FLOORS + 1):
+        src = key[f - 1]
+        if src < 0:
+            continue
+        if f > 1 and key[f - 2] >= 0:
+            adj[src].append(key[f - 2])
+        if f < FLOORS and key[f] >= 0:
+            adj[src].append(key[f])
+    return tuple(tuple(nbs) for nbs in adj)
 
 
 def ruleta_floor(start_floor: int, d4: int) -> int:
@@ -146,71 +220,130 @@ def ruleta_floor(start_floor: int, d4: int) -> int:
     return ((start_floor - 1 + d4) % FLOORS) + 1
 
 
+UNREACHABLE = 999
+
+
+def _bfs_row(adj: Tuple[Tuple[int, ...], ...], sources) -> Tuple[int, ...]:
+    """Distancias (multi-fuente) desde `sources` a todos los nodos."""
+    dist = [UNREACHABLE] * N_NODES
+    queue = deque()
+    for src in sources:
+        if dist[src] != 0:
+            dist[src] = 0
+            queue.append(src)
+    while queue:
+        current = queue.popleft()
+        d = dist[current] + 1
+        for nb in adj[current]:
+            if dist[nb] == UNREACHABLE:
+                dist[nb] = d
+                queue.append(nb)
+    return tuple(dist)
+
+
+@lru_cache(maxsize=None)
+def distance_matrix(key: Optional[Tuple[int, ...]] = None) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Matriz 15x15 de distancias (UNREACHABLE si no hay camino).
+
+    key=None: tablero sin escaleras (grafo que usan los monstruos).
+    key=stairs_key(state.stairs): incluye el overlay de escaleras permanentes.
+    """
+    adj = NODE_NEIGHBORS if key is None else stairs_overlay(key)
+    return tuple(_bfs_row(adj, (i,)) for i in range(N_NODES))
+
+
+def distances_to_targets(targets, key: Optional[Tuple[int, ...]] = None) -> Optional[Tuple[int, ...]]:
+    """
+    Distancia de cada nodo al target más cercano (BFS multi-fuente, una vez
+    por conjunto de targets). None si algún target no es un nodo canónico.
+    """
+    idx = []
+    for t in targets:
+        i = ROOM_INDEX.get(t)
+        if i is None:
+            return None
+        idx.append(i)
+    adj = NODE_NEIGHBORS if key is None else stairs_overlay(key)
+    return _bfs_row(adj, idx)
+
+
 def bfs_dist_to_targets(start: RoomId, targets: set[RoomId]) -> int:
     """Retorna la distancia mínima desde start a cualquiera de los targets."""
     if start in targets:
         return 0
-    
-    queue = [(start, 0)]
+
+    start_idx = ROOM_INDEX.get(start)
+    if start_idx is None:
+        return _bfs_dist_to_targets_ids(start, targets)
+
+    row = distance_matrix()[start_idx]
+    return min((row[ROOM_INDEX[t]] for t in targets if t in ROOM_INDEX), default=UNREACHABLE)
+
+
+def _bfs_dist_to_targets_ids(start: RoomId, targets: set[RoomId]) -> int:
+    """BFS sobre RoomId para nodos fuera del tablero canónico."""
+    queue = deque([(start, 0)])
     visited = {start}
-    
+
     while queue:
-        current, dist = queue.pop(0)
-        
-        # Check adjacent neighbors for targets in case we popped a node that IS a target?
-        # No, current is popped from queue. Check if current is target?
-        # Wait, if `start` is target, handled above.
-        # Use queue check.
-        
-        if current in targets:
-            return dist
-        
+        current, dist = queue.popleft()
         for nb in neighbors(current):
             if nb not in visited:
                 if nb in targets:
-                     return dist + 1
+                    return dist + 1
                 visited.add(nb)
                 queue.append((nb, dist + 1))
-                
-    return 999  # Unreachable
 
+    return UNREACHABLE
+
+
+def _target_dist_fn(targets, dist_table):
+    if dist_table is not None:
+        return lambda nb: dist_table[ROOM_INDEX[nb]] if nb in ROOM_INDEX else bfs_dist_to_targets(nb, targets)
+    return lambda nb: bfs_dist_to_targets(nb, targets)
 
-def get_next_move_to_targets(start: RoomId, targets: set[RoomId]) -> RoomId:
+
+def get_next_move_to_targets(start: RoomId, targets: set[RoomId], dist_table: Optional[Tuple[int, ...]] = None) -> RoomId:
     """
     Retorna el vecino de start que minimiza la distancia a los targets.
     Si start ya está en targets o no hay camino, retorna start.
     Priority: Primer vecino que cumple (orden de neighbors).
+
+    dist_table: distances_to_targets(targets) precomputada (lookup O(1) por vecino).
     """
     if start in targets:
         return start
-        
+
+    dist = _target_dist_fn(targets, dist_table)
     best_step = start
-    min_dist = 999
-    
+    min_dist = UNREACHABLE
+
     # Evaluar cada vecino
     for nb in neighbors(start):
-        d = bfs_dist_to_targets(nb, targets)
+        d = dist(nb)
         if d < min_dist:
             min_dist = d
             best_step = nb
-            
+
     return best_step
 
 
-def get_next_move_away_from_targets(start: RoomId, targets: set[RoomId]) -> RoomId:
+def get_next_move_away_from_targets(start: RoomId, targets: set[RoomId], dist_table: Optional[Tuple[int, ...]] = None) -> RoomId:
     """
     Retorna el vecino de start que maximiza la distancia al target más cercano.
     Flee logic.
     """
+    dist = _target_dist_fn(targets, dist_table)
     best_step = start
     max_dist = -1
-    
+
     # Evaluar cada vecino
     for nb in neighbors(start):
         # Distancia desde el vecino al target más cercano
-        d = bfs_dist_to_targets(nb, targets)
+        d = dist(nb)
         if d > max_dist:
             max_dist = d
             best_step = nb
-            
+
     return best_step
@@ -1,8 +1,12 @@
+from .cards import CardSpec, card_code, card_spec
 from .objects import OBJECT_CATALOG, ObjectDefinition
 from .roles import ROLE_CATALOG, ROLE_INVENTORY_LIMITS, RoleDefinition
 from .statuses import CANONICAL_STATES, CanonicalStateDefinition, CanonicalStateType
 
 __all__ = [
+    "CardSpec",
+    "card_code",
+    "card_spec",
     "OBJECT_CATALOG",
     "ObjectDefinition",
     "ROLE_CATALOG",
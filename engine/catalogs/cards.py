@@ -0,0 +1,117 @@
+"""
+Catálogo de cartas: cada id de carta ("KEY", "MONSTER:SPIDER", "OMEN:TUE_TUE",
+...) se interna una vez a un código entero pequeño junto con su tipo y su
+argumento ya parseado. Resolver una carta pasa a ser una búsqueda en dict
+más un despacho por tipo, sin `startswith`/`split(":")` en cada revelación.
+
+Los mazos siguen guardando los ids (CardId) para serialización y logs;
+`card_codes`/`card_ids` convierten a/desde arrays compactos de códigos.
+Los códigos son locales al proceso (orden de registro), no un formato estable.
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+import sys
+
+from .objects import OBJECT_CATALOG
+
+
+# Tipos de carta (índices de la tabla de despacho en engine.handlers.cards)
+CARD_NONE = 0      # sin efecto (id desconocido)
+CARD_KEY = 1
+CARD_OBJECT = 2    # "OBJECT:<id>" o "<id>" del catálogo de objetos
+CARD_CROWN = 3     # "CROWN" u "OBJECT:CROWN"
+CARD_MONSTER = 4
+CARD_STATE = 5
+CARD_OMEN = 6
+CARD_EVENT = 7     # "EVENT:<id>" / "EVENTS:<id>" (prefix conserva cuál)
+N_CARD_KINDS = 8
+
+_PREFIXED = {
+    "MONSTER": CARD_MONSTER,
+    "STATE": CARD_STATE,
+    "OMEN": CARD_OMEN,
+    "EVENT": CARD_EVENT,
+    "EVENTS": CARD_EVENT,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CardSpec:
+    code: int
+    card_id: str
+    kind: int
+    arg: str = ""      # id de objeto/monstruo/estado/presagio/evento
+    prefix: str = ""   # prefijo original ("EVENT", "EVENTS", ...)
+
+
+_CODES: Dict[str, int] = {}
+_SPECS: List[CardSpec] = []
+
+
+def _parse(card_id: str, code: int) -> CardSpec:
+    if card_id == "KEY":
+        return CardSpec(code, card_id, CARD_KEY)
+    if card_id == "CROWN":
+        return CardSpec(code, card_id, CARD_CROWN)
+    prefix, sep, arg = card_id.partition(":")
+    if sep:
+        if prefix == "OBJECT":
+            if arg == "CROWN":
+                return CardSpec(code, card_id, CARD_CROWN, arg, prefix)
+            if arg in OBJECT_CATALOG:
+                return CardSpec(code, card_id, CARD_OBJECT, arg, prefix)
+            return CardSpec(code, card_id, CARD_NONE, arg, prefix)
+        kind = _PREFIXED.get(prefix)
+        if kind is not None:
+            return CardSpec(code, card_id, kind, arg, prefix)
+    elif card_id in OBJECT_CATALOG:
+        return CardSpec(code, card_id, CARD_OBJECT, card_id)
+    return CardSpec(code, card_id, CARD_NONE)
+
+
+def card_code(card) -> int:
+    """Código entero de la carta (la registra si es nueva)."""
+    code = _CODES.get(card)
+    if code is None:
+        card_id = sys.intern(str(card))
+        code = _CODES.get(card_id)
+        if code is None:
+            code = len(_SPECS)
+            _SPECS.append(_parse(card_id, code))
+            _CODES[card_id] = code
+    return code
+
+
+def card_spec(card) -> CardSpec:
+    """Tipo y argumento pre-parseados de la carta."""
+    code = _CODES.get(card)
+    if code is None:
+        code = card_code(card)
+    return _SPECS[code]
+
+
+def spec_for_code(code: int) -> CardSpec:
+    return _SPECS[code]
+
+
+def intern_cards(cards: Iterable) -> List[str]:
+    """
+    Registra las cartas y devuelve la lista con los ids canónicos
+    (internados). Se usa al armar los mazos en setup.
+    """
+    out = []
+    for card in cards:
+        out.append(_SPECS[card_code(card)].card_id)
+    return out
+
+
+def card_codes(cards: Iterable) -> array:
+    """Array compacto de códigos para una secuencia de cartas."""
+    return array("H", [card_code(c) for c in cards])
+
+
+def card_ids(codes: Iterable[int]) -> List[str]:
+    return [_SPECS[c].card_id for c in codes]
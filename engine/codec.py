@@ -0,0 +1,307 @@
+"""
+Codec binario versionado para GameState (GameState.to_bytes / from_bytes).
+
+Formato (little-endian):
+
+    cabecera     MAGIC (4s) + versión (B)
+    strings      n (I) + largo del blob (I) + blob utf-8 con los strings
+                 separados por NUL
+    shapes       n (H) + por shape: k (B) + k índices de string (H)
+    cuerpo       un valor, con etiquetas de 1 byte:
+
+        None / True / False        etiqueta sola
+        int                        int8 / int32 / int64 según rango
+        float                      float64
+        str                        índice en la tabla (uint8 / uint16 / uint32)
+        list[str]                  n + índices uint8 o uint16 (un solo bloque)
+        list / tuple / dict        n + elementos (dict: clave, valor)
+        dict con claves str        n + bloque de índices uint8 de las claves + valores
+        dataclass                  id de shape (nombres de campo) + valores
+
+Las tablas se arman al codificar: ids de sala, cartas y nombres de campo se
+repiten mucho y quedan en un índice de 1 byte. Al decodificar, la tabla de
+strings sale de un único split del blob y los strings se internan.
+
+encode_state() recorre las dataclasses directamente (sin la copia profunda
+de asdict) y decode_state() devuelve el mismo dict que to_dict(), de modo
+que GameState.from_bytes(b) equivale a GameState.from_dict(state.to_dict()).
+"""
+from __future__ import annotations
+from array import array
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, List, Tuple
+import struct
+import sys
+
+
+MAGIC = b"CRCS"
+CODEC_VERSION = 1
+
+_HEADER = struct.Struct("<4sB")
+_TABLE = struct.Struct("<II")
+_I8 = struct.Struct("<b")
+_I32 = struct.Struct("<i")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+# Etiquetas (los contenedores van al final: tag >= _LIST lleva largo)
+_NONE, _TRUE, _FALSE = 0, 1, 2
+_INT8, _INT32, _INT64, _FLOAT = 3, 4, 5, 6
+_STR8, _STR16, _STR32, _RECORD = 7, 8, 9, 10
+_LIST, _TUPLE, _DICT, _STRLIST8, _STRLIST16, _STRDICT8 = 11, 12, 13, 14, 15, 16
+
+_CONSTANTS = (None, True, False)
+_LITTLE = sys.byteorder == "little"
+
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+    return names
+
+
+def _pack_len(out: bytearray, n: int) -> None:
+    if n < 0xFF:
+        out.append(n)
+    else:
+        out.append(0xFF)
+        out.extend(_U32.pack(n))
+
+
+def _u16_bytes(values: List[int]) -> bytes:
+    arr = array("H", values)
+    if not _LITTLE:
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _u16_array(data: bytes) -> array:
+    arr = array("H", data)
+    if not _LITTLE:
+        arr.byteswap()
+    return arr
+
+
+def encode_value(value: Any) -> bytes:
+    """Codifica un valor con sus tablas (sin cabecera de versión)."""
+    out = bytearray()
+    strings: Dict[str, int] = {}
+    shapes: Dict[type, int] = {}
+    shape_names: List[Tuple[str, ...]] = []
+
+    def sid(s: str) -> int:
+        idx = strings.get(s)
+        if idx is None:
+            if "\x00" in s:
+                raise ValueError(f"codec: string con NUL no soportado: {s!r}")
+            idx = strings[s] = len(strings)
+        return idx
+
+    def enc(v: Any) -> None:
+        t = type(v)
+        if t is str or isinstance(v, str):
+            idx = sid(v)
+            if idx < 0x100:
+                out.append(_STR8)
+                out.append(idx)
+            elif idx < 0x10000:
+                out.append(_STR16)
+                out.extend(_U16.pack(idx))
+            else:
+                out.append(_STR32)
+                out.extend(_U32.pack(idx))
+        elif v is None:
+            out.append(_NONE)
+        elif t is bool:
+            out.append(_TRUE if v else _FALSE)
+        elif t is int or (isinstance(v, int) and not isinstance(v, bool)):
+            if -0x80 <= v < 0x80:
+                out.append(_INT8)
+                out.extend(_I8.pack(v))
+            elif -0x80000000 <= v < 0x80000000:
+                out.append(_INT32)
+                out.extend(_I32.pack(v))
+            else:
+                out.append(_INT64)
+                out.extend(_I64.pack(v))
+        elif t is float:
+            out.append(_FLOAT)
+            out.extend(_F64.pack(v))
+        elif isinstance(v, list):
+            if v and all(isinstance(x, str) for x in v):
+                idxs = [sid(x) for x in v]
+                top = max(idxs)
+                if top < 0x10000:
+                    out.append(_STRLIST8 if top < 0x100 else _STRLIST16)
+                    _pack_len(out, len(idxs))
+                    out.extend(bytes(idxs) if top < 0x100 else _u16_bytes(idxs))
+                    return
+            out.append(_LIST)
+            _pack_len(out, len(v))
+            for item in v:
+                enc(item)
+        elif isinstance(v, dict):
+            if v and all(isinstance(k, str) for k in v):
+                idxs = [sid(k) for k in v]
+                if max(idxs) < 0x100:
+                    out.append(_STRDICT8)
+                    _pack_len(out, len(idxs))
+                    out.extend(bytes(idxs))
+                    for item in v.values():
+                        enc(item)
+                    return
+            out.append(_DICT)
+            _pack_len(out, len(v))
+            for k, item in v.items():
+                enc(k)
+                enc(item)
+        elif isinstance(v, tuple):
+            out.append(_TUPLE)
+            _pack_len(out, len(v))
+            for item in v:
+                enc(item)
+        elif is_dataclass(v) and not isinstance(v, type):
+            names = _field_names(t)
+            shape = shapes.get(t)
+            if shape is None:
+                shape = shapes[t] = len(shape_names)
+                shape_names.append(names)
+            out.append(_RECORD)
+            out.extend(_U16.pack(shape))
+            for name in names:
+                enc(getattr(v, name))
+        else:
+            raise TypeError(f"codec: tipo no serializable {t.__name__}: {v!r}")
+
+    enc(value)
+
+    shape_part = bytearray(_U16.pack(len(shape_names)))
+    for names in shape_names:
+        shape_part.append(len(names))
+        shape_part.extend(_u16_bytes([sid(n) for n in names]))
+    blob = "\x00".join(strings).encode("utf-8")
+    return b"".join((_TABLE.pack(len(strings), len(blob)), blob, shape_part, out))
+
+
+def decode_value(data: bytes, offset: int = 0) -> Tuple[Any, int]:
+    """Decodifica tablas + valor desde `offset`; retorna (valor, offset final)."""
+    n_strings, blob_len = _TABLE.unpack_from(data, offset)
+    pos = offset + _TABLE.size
+    strings: List[str] = []
+    if n_strings:
+        strings = list(map(sys.intern, data[pos : pos + blob_len].decode("utf-8").split("\x00")))
+    if len(strings) != n_strings:
+        raise ValueError("codec: tabla de strings inconsistente")
+    pos += blob_len
+
+    n_shapes = _U16.unpack_from(data, pos)[0]
+    pos += 2
+    shapes: List[Tuple[str, ...]] = []
+    for _ in range(n_shapes):
+        k = data[pos]
+        pos += 1
+        shapes.append(tuple(strings[i] for i in _u16_array(data[pos : pos + 2 * k])))
+        pos += 2 * k
+
+    get_str = strings.__getitem__
+    u16 = _U16.unpack_from
+    u32 = _U32.unpack_from
+
+    def dec_seq(n: int, pos: int) -> Tuple[List[Any], int]:
+        # n valores seguidos; las hojas comunes (str, int8, None/bool) se
+        # leen en línea para no pagar una llamada por valor
+        values: List[Any] = []
+        append = values.append
+        for _ in range(n):
+            tag = data[pos]
+            if tag == _STR8:
+                append(strings[data[pos + 1]])
+                pos += 2
+            elif tag == _INT8:
+                v = data[pos + 1]
+                append(v - 0x100 if v > 0x7F else v)
+                pos += 2
+            elif tag <= _FALSE:
+                append(_CONSTANTS[tag])
+                pos += 1
+            else:
+                v, pos = dec(pos)
+                append(v)
+        return values, pos
+
+    def dec(pos: int) -> Tuple[Any, int]:
+        tag = data[pos]
+        pos += 1
+        if tag == _RECORD:
+            names = shapes[u16(data, pos)[0]]
+            values, pos = dec_seq(len(names), pos + 2)
+            return dict(zip(names, values)), pos
+        if tag == _STR8:
+            return strings[data[pos]], pos + 1
+        if tag == _INT8:
+            v = data[pos]
+            return (v - 0x100 if v > 0x7F else v), pos + 1
+        if tag <= _FALSE:
+            return _CONSTANTS[tag], pos
+
+        if tag >= _LIST:
+            n = data[pos]
+            pos += 1
+            if n == 0xFF:
+                n = u32(data, pos)[0]
+                pos += 4
+            if tag == _STRLIST8:
+                return list(map(get_str, data[pos : pos + n])), pos + n
+            if tag == _STRDICT8:
+                keys = data[pos : pos + n]
+                values, pos = dec_seq(n, pos + n)
+                return dict(zip(map(get_str, keys), values)), pos
+            if tag == _STRLIST16:
+                return list(map(get_str, _u16_array(data[pos : pos + 2 * n]))), pos + 2 * n
+            if tag == _DICT:
+                d = {}
+                for _ in range(n):
+                    k, pos = dec(pos)
+                    d[k], pos = dec(pos)
+                return d, pos
+            items, pos = dec_seq(n, pos)
+            return (items if tag == _LIST else tuple(items)), pos
+
+        if tag == _STR16:
+            return strings[u16(data, pos)[0]], pos + 2
+        if tag == _INT32:
+            return _I32.unpack_from(data, pos)[0], pos + 4
+        if tag == _INT64:
+            return _I64.unpack_from(data, pos)[0], pos + 8
+        if tag == _FLOAT:
+            return _F64.unpack_from(data, pos)[0], pos + 8
+        if tag == _STR32:
+            return strings[u32(data, pos)[0]], pos + 4
+        raise ValueError(f"codec: etiqueta desconocida {tag} en offset {pos - 1}")
+
+    return dec(pos)
+
+
+def encode_state(state: Any) -> bytes:
+    return _HEADER.pack(MAGIC, CODEC_VERSION) + encode_value(state)
+
+
+def decode_state(data: bytes) -> Dict[str, Any]:
+    """Bytes de encode_state() -> dict equivalente a state.to_dict()."""
+    data = bytes(data)
+    if len(data) < _HEADER.size + _TABLE.size:
+        raise ValueError("codec: datos truncados")
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("codec: cabecera inválida (no es un GameState binario)")
+    if version != CODEC_VERSION:
+        raise ValueError(f"codec: versión {version} no soportada (esperada {CODEC_VERSION})")
+    value, end = decode_value(data, _HEADER.size)
+    if end != len(data):
+        raise ValueError("codec: bytes sobrantes tras el estado")
+    return value
@@ -1,6 +1,6 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Set
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Optional, Set
 
 
 @dataclass(frozen=True)
@@ -86,14 +86,61 @@ class Config:
     # --- Termination (sim-only) ---
     # 0 desactiva. Si round > MAX_ROUNDS => TIMEOUT
     MAX_ROUNDS: int = 60
+    # Tamaño del EpisodeLog (eventos del episodio): None = sin límite,
+    # N > 0 = ring buffer de los últimos N, 0 = desactivado
+    EPISODE_LOG_MAXLEN: Optional[int] = None
+    # Log de draws del RNG del episodio: "off" | "counters" | "ring" | "full"
+    # ("full" para depurar replays; RNG_LOG_SIZE aplica a "ring")
+    RNG_LOG_LEVEL: str = "off"
+    RNG_LOG_SIZE: int = 256
+    # Replay en los runs JSONL: full_state cada N steps y deltas entre medio
+    # (1 = full_state en todos los registros, ver sim.replay_records)
+    REPLAY_KEYFRAME_EVERY: int = 50
+    # Runs JSONL: flush a disco (y summary parcial) cada N registros
+    RUN_FLUSH_EVERY: int = 100
     # MCTS Configuration
     MCTS_ROLLOUTS: int = 100
     MCTS_DEPTH: int = 50
     MCTS_TOP_K: int = 5
     MCTS_DETERMINIZE: bool = False
+    # Progressive widening (0 = expandir todas las acciones; ver sim.mcts)
+    MCTS_WIDENING: float = 0.0
+    MCTS_WIDENING_ALPHA: float = 0.5
     TIMEOUT_OUTCOME: str = "TIMEOUT"
     # Si True y no quedan cartas en habitaciones (no pasillos) => LOSE_DECK
     LOSE_ON_DECK_EXHAUSTION: bool = False
 
     # --- Heurística jugadores ---
     PLAYER_SANITY_PANIC: int = -4
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Config resuelta como dict JSON-serializable (sets ordenados)."""
+        out: Dict[str, Any] = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, (set, frozenset)):
+                value = sorted(value)
+            elif isinstance(value, tuple):
+                value = list(value)
+            out[f.name] = value
+        return out
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "Config":
+        """
+        Inversa de to_dict(): listas vuelven al tipo del default (set/tuple)
+        y las claves que Config ya no conoce se ignoran.
+        """
+        defaults = Config()
+        kwargs: Dict[str, Any] = {}
+        for f in fields(Config):
+            if f.name not in d:
+                continue
+            value = d[f.name]
+            default = getattr(defaults, f.name)
+            if isinstance(default, (set, frozenset)) and value is not None:
+                value = set(value)
+            elif isinstance(default, tuple) and value is not None:
+                value = tuple(value)
+            kwargs[f.name] = value
+        return Config(**kwargs)
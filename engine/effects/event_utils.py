@@ -36,8 +36,6 @@ from typing import List, Dict, Any
 
 def add_status(p: PlayerState, status_id: str, duration: int = 2, metadata: Dict[str, Any] = None) -> None:
     """Agrega un estado con duración y metadata opcional."""
-    if metadata is None:
-        metadata = {}
     p.statuses.append(StatusInstance(status_id=status_id, remaining_rounds=duration, metadata=metadata))
 
 
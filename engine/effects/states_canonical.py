@@ -18,7 +18,7 @@ CATEGORÍAS DE ESTADOS:
 """
 
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Dict, Optional, List
 from enum import Enum
 
 
@@ -238,6 +238,60 @@ def normalize_state_id(state_id: str) -> str:
     return STATE_ALIASES.get(state_id, state_id)
 
 
+# Índice de bits: cada estado canónico tiene un bit y sus aliases comparten
+# el bit del canónico. IDs desconocidos reciben un bit nuevo la primera vez.
+_STATUS_BITS: Dict[str, int] = {}
+_N_STATUS_BITS = 0
+
+
+def status_bit(state_id: str) -> int:
+    """Bit del estado (canónico o alias)."""
+    global _N_STATUS_BITS
+    bit = _STATUS_BITS.get(state_id)
+    if bit is None:
+        normalized = normalize_state_id(state_id)
+        bit = _STATUS_BITS.get(normalized)
+        if bit is None:
+            bit = 1 << _N_STATUS_BITS
+            _N_STATUS_BITS += 1
+            _STATUS_BITS[normalized] = bit
+        _STATUS_BITS[state_id] = bit
+    return bit
+
+
+for _state_id in sorted(ALL_STATES | set(CANONICAL_STATES)):
+    status_bit(_state_id)
+for _alias in STATE_ALIASES:
+    status_bit(_alias)
+
+
+def status_mask(player) -> int:
+    """
+    Máscara de bits de los estados del jugador.
+
+    Se cachea en el jugador junto a la lista y su largo: apply_status,
+    remove_status, remove_all_statuses y decrement_status_durations la
+    mantienen, y cualquier otra edición de `player.statuses` (append directo,
+    reasignación) se detecta y se recalcula.
+    """
+    statuses = player.statuses
+    index = getattr(player, "_status_index", None)
+    if index is not None and index[0] is statuses and index[1] == len(statuses):
+        return index[2]
+    mask = 0
+    for st in statuses:
+        mask |= status_bit(st.status_id)
+    _set_status_index(player, statuses, mask)
+    return mask
+
+
+def _set_status_index(player, statuses, mask: int) -> None:
+    try:
+        player._status_index = (statuses, len(statuses), mask)
+    except AttributeError:  # objetos tipo jugador sin el slot
+        pass
+
+
 def get_all_ids_for_state(state_id: str) -> set:
     """
     Obtiene todos los IDs posibles para un estado (canónico + aliases).
@@ -260,8 +314,7 @@ def has_status(player, state_id: str) -> bool:
     Verifica si un jugador tiene un estado específico.
     Acepta IDs canónicos o aliases. Busca por todas las formas posibles.
     """
-    valid_ids = get_all_ids_for_state(state_id)
-    return any(st.status_id in valid_ids for st in player.statuses)
+    return bool(status_mask(player) & status_bit(state_id))
 
 
 def get_status(player, state_id: str):
@@ -269,9 +322,11 @@ def get_status(player, state_id: str):
     Obtiene la instancia de estado de un jugador.
     Retorna None si no tiene el estado.
     """
-    valid_ids = get_all_ids_for_state(state_id)
+    bit = status_bit(state_id)
+    if not status_mask(player) & bit:
+        return None
     for st in player.statuses:
-        if st.status_id in valid_ids:
+        if status_bit(st.status_id) == bit:
             return st
     return None
 
@@ -300,10 +355,12 @@ def apply_status(player, state_id: str, duration: Optional[int] = None, metadata
     status_instance = StatusInstance(
         status_id=normalized,
         remaining_rounds=duration,
-        metadata=metadata or {}
+        metadata=metadata or None
     )
     
+    mask = status_mask(player)
     player.statuses.append(status_instance)
+    _set_status_index(player, player.statuses, mask | status_bit(normalized))
 
 
 def remove_status(player, state_id: str) -> bool:
@@ -318,6 +375,7 @@ def remove_status(player, state_id: str) -> bool:
         st for st in player.statuses 
         if st.status_id != normalized and st.status_id != state_id
     ]
+    status_mask(player)
     return len(player.statuses) < original_len
 
 
@@ -329,6 +387,7 @@ def remove_all_statuses(player) -> List[str]:
     """
     removed = [st.status_id for st in player.statuses]
     player.statuses = []
+    _set_status_index(player, player.statuses, 0)
     return removed
 
 
@@ -351,19 +410,20 @@ def decrement_status_durations(player) -> List[str]:
     """
     removed = []
     remaining = []
+    mask = 0
     
     for st in player.statuses:
         if st.remaining_rounds > 0:
             st.remaining_rounds -= 1
             if st.remaining_rounds <= 0:
                 removed.append(st.status_id)
-            else:
-                remaining.append(st)
-        else:
-            # Estados permanentes (remaining_rounds <= 0) no se decrementan
-            remaining.append(st)
+                continue
+        # Estados permanentes (remaining_rounds <= 0) no se decrementan
+        remaining.append(st)
+        mask |= status_bit(st.status_id)
     
     player.statuses = remaining
+    _set_status_index(player, remaining, mask)
     return removed
 
 
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class EpisodeLog:
+    """
+    Journal append-only de eventos de un episodio (acciones, resultados de peek, etc.).
+
+    Vive fuera de GameState: los estados clonados comparten la misma instancia
+    y solo guardan `log_index` (cuántas entradas forman su historia), de modo
+    que clonar o serializar un estado no copia el log.
+
+    maxlen:
+      - None: sin límite.
+      - N > 0: ring buffer con las últimas N entradas (los índices siguen
+        siendo absolutos).
+      - 0: desactivado; solo se cuentan las entradas.
+
+    branch(index) crea el log de una rama de búsqueda (ver
+    GameState.lookahead): lee la historia de este log hasta `index` sin
+    copiarla y escribe solo en sus propias entradas.
+    """
+
+    def __init__(self, entries: Optional[Iterable[Dict[str, Any]]] = None, maxlen: Optional[int] = None) -> None:
+        self.maxlen = maxlen
+        self._entries = deque(maxlen=maxlen) if maxlen is not None else []
+        self._count = 0
+        # Rama: log base y el índice desde el que escribe esta rama
+        self._parent: Optional[EpisodeLog] = None
+        self._start = 0
+        for entry in entries or ():
+            self.append(entry)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def base(self) -> int:
+        """Índice absoluto de la primera entrada retenida."""
+        return self._count - len(self._entries)
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """Añade una entrada y retorna el nuevo total."""
+        if self.maxlen != 0:
+            self._entries.append(entry)
+        self._count += 1
+        return self._count
+
+    def entries_until(self, index: int) -> List[Dict[str, Any]]:
+        """Entradas retenidas con índice absoluto < index."""
+        base = self.base
+        n = min(index, self._count) - base
+        own = list(islice(self._entries, n)) if n > 0 else []
+        if self._parent is None or base > self._start:
+            return own
+        entries = self._parent.entries_until(min(index, self._start)) + own
+        if self.maxlen is not None and len(entries) > self.maxlen:
+            del entries[:len(entries) - self.maxlen]
+        return entries
+
+    def branch(self, index: int) -> "EpisodeLog":
+        """Log de rama sobre la historia hasta `index` (O(1), sin copiar)."""
+        new = EpisodeLog(maxlen=self.maxlen)
+        new._parent = self
+        new._start = new._count = index
+        return new
+
+    def fork(self, index: int) -> "EpisodeLog":
+        """
+        Nuevo log con la historia hasta `index`. Se usa cuando un estado
+        anterior (clon hermano) vuelve a escribir en un log que ya avanzó
+        por otra rama. En un log de rama solo se copian las entradas
+        propias; la historia base se sigue leyendo del log base.
+        """
+        if self._parent is not None and index >= self._start:
+            new = self._parent.branch(self._start)
+            new._entries.extend(islice(self._entries, max(0, index - self.base)))
+            new._count = index
+            return new
+        if self._parent is not None:
+            return self._parent.fork(index)
+        new = EpisodeLog(maxlen=self.maxlen)
+        retained = self.entries_until(index)
+        new._entries.extend(retained)
+        new._count = max(index, len(retained))
+        return new
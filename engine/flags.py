@@ -0,0 +1,280 @@
+"""
+Flags globales del estado (GameState.flags).
+
+FlagStore guarda las flags por entidad en slots tipados: un dict por flag
+(`GOBLIN_HAS_LOOT`, `TEMP_STAIRS`, ...) indexado por el id de la entidad.
+`flags.monster(GOBLIN_HAS_LOOT, mid)` es una consulta a ese dict, sin
+formatear ni parsear strings. El resto de flags (CROWN_YELLOW,
+PENDING_SACRIFICE_CHECK, SPECIAL_REVEALED_..., ...) viven en el propio
+dict.
+
+Shim de compatibilidad: hacia afuera FlagStore sigue siendo un dict con
+las claves serializadas "<NOMBRE>_<id>". `flags["GOBLIN_HAS_LOOT_M1"]`,
+`in`, iteración, `==`, to_dict()/JSON/codec y from_dict ven las flags por
+entidad con ese formato; las claves legacy se traducen al slot al leer o
+escribir (solo en ese camino se parsea el string).
+
+copy() copia un nivel de los valores contenedores (listas, dicts, sets),
+igual que clone() antes del FlagStore: mutar en el lugar una lista
+guardada en flags no afecta a otros clones.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+import re
+
+
+# --- Flags por monstruo ---
+GOBLIN_HAS_LOOT = "GOBLIN_HAS_LOOT"
+GOBLIN_LOOT_OBJECTS = "GOBLIN_LOOT_OBJECTS"
+GOBLIN_LOOT_KEYS = "GOBLIN_LOOT_KEYS"
+SACK_HAS_VICTIM = "SACK_HAS_VICTIM"
+
+# --- Flags por sala ---
+TEMP_STAIRS = "TEMP_STAIRS"
+ARMORY_DESTROYED = "ARMORY_DESTROYED"
+
+# --- Flags por jugador ---
+PROTECCION_AMARILLO = "PROTECCION_AMARILLO"
+SKIP_TURN = "SKIP_TURN"
+
+# Flag por entidad -> tipo de entidad (los slots de FlagStore)
+SCOPED_FLAGS: Dict[str, str] = {
+    GOBLIN_HAS_LOOT: "monster",
+    GOBLIN_LOOT_OBJECTS: "monster",
+    GOBLIN_LOOT_KEYS: "monster",
+    SACK_HAS_VICTIM: "monster",
+    TEMP_STAIRS: "room",
+    ARMORY_DESTROYED: "room",
+    PROTECCION_AMARILLO: "player",
+    SKIP_TURN: "player",
+}
+
+_SCOPED_PREFIXES = tuple(f"{name}_" for name in SCOPED_FLAGS)
+_SCOPED_KEY = re.compile("(%s)_(.+)" % "|".join(map(re.escape, sorted(SCOPED_FLAGS, key=len, reverse=True))), re.S)
+
+_MISSING = object()
+_dict_get = dict.get
+
+
+def flag_key(name: str, ident: Any) -> str:
+    """Clave serializada "<name>_<ident>" (formato legacy de las flags por entidad)."""
+    return f"{name}_{ident}"
+
+
+def _parse_key(key: Any) -> Optional[Tuple[str, str]]:
+    """(flag, id) si `key` es la clave legacy de una flag por entidad."""
+    if type(key) is not str or not key.startswith(_SCOPED_PREFIXES):
+        return None
+    m = _SCOPED_KEY.fullmatch(key)
+    return (m.group(1), m.group(2)) if m else None
+
+
+def _copy_value(value: Any) -> Any:
+    cls = type(value)
+    if cls is list or cls is dict or cls is set:
+        return cls(value)
+    return value
+
+
+class FlagStore(dict):
+    """
+    Flags del estado: dict de flags globales + slots por entidad.
+
+    `monster(...)`, `room(...)` y `player(...)` leen la flag `name` de esa
+    entidad (id str); `set_for`/`pop_for` escriben/borran en su slot. Las
+    operaciones de dict exponen los slots con las claves legacy (ver el
+    docstring del módulo); todas las mutaciones pasan por los overrides de
+    abajo, así los slots y la vista dict no se desincronizan.
+    """
+
+    __slots__ = ("_slots",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        dict.__init__(self)
+        self._slots: Dict[str, Dict[str, Any]] = {}
+        if args or kwargs:
+            self.update(*args, **kwargs)
+
+    # --- Acceso por entidad (slots) ---
+
+    def get_for(self, name: str, ident: Any, default: Any = None) -> Any:
+        slot = self._slots.get(name)
+        if slot is None:
+            return default
+        return slot.get(ident, default)
+
+    monster = room = player = get_for
+
+    def set_for(self, name: str, ident: Any, value: Any) -> None:
+        if name not in SCOPED_FLAGS:
+            raise KeyError(f"{name!r} no es una flag por entidad (ver SCOPED_FLAGS)")
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = self._slots[name] = {}
+        slot[ident] = value
+
+    def pop_for(self, name: str, ident: Any, default: Any = None) -> Any:
+        slot = self._slots.get(name)
+        if slot is None:
+            return default
+        value = slot.pop(ident, default)
+        if not slot:
+            del self._slots[name]
+        return value
+
+    # --- Vista dict (shim de claves legacy) ---
+
+    def _scoped_items(self) -> Iterator[Tuple[str, Any]]:
+        for name, slot in self._slots.items():
+            for ident, value in slot.items():
+                yield flag_key(name, ident), value
+
+    # Lecturas: primero el dict (flags globales, el caso común); solo una
+    # clave con prefijo de flag por entidad se parsea y va a su slot
+    def __getitem__(self, key: Any) -> Any:
+        value = _dict_get(self, key, _MISSING)
+        if value is _MISSING:
+            value = self._get_legacy(key, _MISSING)
+            if value is _MISSING:
+                raise KeyError(key)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        value = _dict_get(self, key, _MISSING)
+        if value is _MISSING:
+            return self._get_legacy(key, default)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        if _dict_get(self, key, _MISSING) is not _MISSING:
+            return True
+        return self._get_legacy(key, _MISSING) is not _MISSING
+
+    def _get_legacy(self, key: Any, default: Any) -> Any:
+        # Fallo de una flag global ausente (lo más frecuente): sin parsear
+        if type(key) is not str or not key.startswith(_SCOPED_PREFIXES):
+            return default
+        m = _SCOPED_KEY.fullmatch(key)
+        if m is None:
+            return default
+        return self.get_for(m.group(1), m.group(2), default)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        parsed = _parse_key(key)
+        if parsed is None:
+            dict.__setitem__(self, key, value)
+        else:
+            self.set_for(parsed[0], parsed[1], value)
+
+    def __delitem__(self, key: Any) -> None:
+        if self.pop(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+
+    def pop(self, key: Any, default: Any = _MISSING) -> Any:
+        value = dict.pop(self, key, _MISSING)
+        if value is _MISSING:
+            parsed = _parse_key(key)
+            if parsed is not None:
+                value = self.pop_for(parsed[0], parsed[1], _MISSING)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return value
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            self[key] = value = default
+        return value
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        # Ruta de construcción (from_dict, asdict): las claves globales van
+        # directo al dict; solo las de prefijo por entidad se parsean
+        prefixes = _SCOPED_PREFIXES
+        for other in args + (kwargs,):
+            items = other.items() if hasattr(other, "items") else other
+            for key, value in items:
+                if type(key) is str and not key.startswith(prefixes):
+                    dict.__setitem__(self, key, value)
+                else:
+                    self[key] = value
+
+    def __ior__(self, other: Any) -> "FlagStore":
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        dict.clear(self)
+        self._slots.clear()
+
+    def popitem(self) -> Tuple[str, Any]:
+        for name, slot in reversed(self._slots.items()):
+            ident, value = slot.popitem()
+            if not slot:
+                del self._slots[name]
+            return flag_key(name, ident), value
+        return dict.popitem(self)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from dict.__iter__(self)
+        for name, slot in self._slots.items():
+            for ident in slot:
+                yield flag_key(name, ident)
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + sum(len(slot) for slot in self._slots.values())
+
+    def keys(self) -> List[str]:  # type: ignore[override]
+        return list(self)
+
+    def values(self) -> List[Any]:  # type: ignore[override]
+        return list(dict.values(self)) + [v for slot in self._slots.values() for v in slot.values()]
+
+    def items(self) -> List[Tuple[str, Any]]:  # type: ignore[override]
+        return list(dict.items(self)) + list(self._scoped_items())
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other: Any) -> bool:
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"FlagStore({dict(self.items())!r})"
+
+    def __reduce__(self):
+        return (FlagStore, (dict(self.items()),))
+
+    def copy(self) -> "FlagStore":
+        """Copia de globales y slots, con un nivel de los valores contenedores."""
+        new = FlagStore()
+        for key, value in dict.items(self):
+            dict.__setitem__(new, key, _copy_value(value))
+        new._slots = {
+            name: {ident: _copy_value(value) for ident, value in slot.items()}
+            for name, slot in self._slots.items()
+        }
+        return new
+
+
+def as_flag_store(flags: Mapping[str, Any] | None) -> FlagStore:
+    if type(flags) is FlagStore:
+        return flags
+    return FlagStore(flags or {})
+
+
+def state_flags(state: Any) -> FlagStore:
+    """
+    FlagStore del estado. Si se asignó un dict plano (`state.flags = {}`,
+    habitual en tests/estados legacy) se envuelve una vez.
+    """
+    flags = state.flags
+    if type(flags) is not FlagStore:
+        flags = state.flags = as_flag_store(flags)
+    return flags
@@ -5,7 +5,7 @@ from typing import Optional
 from engine.boxes import active_deck_for_room
 from engine.config import Config
 from engine.inventory import add_object
-from engine.objects import OBJECT_CATALOG, get_max_keys_capacity
+from engine.objects import get_max_keys_capacity
 from engine.rng import RNG
 from engine.state import GameState, StatusInstance
 from engine.systems.monsters import spawn_monster_from_card, handle_omen_reveal
@@ -14,84 +14,104 @@ from engine.types import PlayerId, RoomId
 from engine.handlers.events import resolve_event
 from engine.effects.event_utils import add_status
 from engine.board import floor_of
+from engine.catalogs.cards import (
+    CARD_CROWN,
+    CARD_EVENT,
+    CARD_KEY,
+    CARD_MONSTER,
+    CARD_NONE,
+    CARD_OBJECT,
+    CARD_OMEN,
+    CARD_STATE,
+    N_CARD_KINDS,
+    CardSpec,
+    card_spec,
+)
+
+
+def _resolve_key(state: GameState, pid: PlayerId, card, spec: CardSpec, cfg: Config, rng: Optional[RNG]) -> None:
+    p = state.players[pid]
+    keys_in_hand = sum(pl.keys for pl in state.players.values())
+    keys_in_game = max(0, int(getattr(cfg, "KEYS_TOTAL", 6)) - state.keys_destroyed)
 
+    if keys_in_hand >= keys_in_game:
+        deck = active_deck_for_room(state, p.room)
+        if deck is not None:
+            deck.put_bottom(card)
+        return
 
-def resolve_card_minimal(state: GameState, pid: PlayerId, card, cfg: Config, rng: Optional[RNG] = None):
-    """
-    Resolver efectos minimos de cartas.
-    - KEY -> jugador gana una llave (si no excede limite)
-    - MONSTER:<id> -> monstruo entra en el tablero
-    - STATE:<id> -> status al jugador
-    - CROWN -> activa bandera de corona y crea Falso Rey en piso del jugador
-    """
-    s_str = str(card)
-    p = state.players[pid]
+    role_capacity = get_max_keys_capacity(p)
 
-    def _grant_object(obj_id: str) -> None:
-        if not add_object(state, pid, obj_id, discard_choice=None):
-            state.discard_pile.append(obj_id)
+    if p.keys < role_capacity:
+        p.keys += 1
+    else:
+        deck = active_deck_for_room(state, p.room)
+        if deck is not None:
+            deck.put_bottom(card)
 
-    if s_str == "KEY":
-        keys_in_hand = sum(pl.keys for pl in state.players.values())
-        keys_in_game = max(0, int(getattr(cfg, "KEYS_TOTAL", 6)) - state.keys_destroyed)
 
-        if keys_in_hand >= keys_in_game:
-            deck = active_deck_for_room(state, p.room)
-            if deck is not None:
-                deck.put_bottom(card)
-            return
+def _resolve_object(state: GameState, pid: PlayerId, card, spec: CardSpec, cfg: Config, rng: Optional[RNG]) -> None:
+    if not add_object(state, pid, spec.arg, discard_choice=None):
+        state.discard_pile.append(spec.arg)
 
-        role_capacity = get_max_keys_capacity(p)
 
-        if p.keys < role_capacity:
-            p.keys += 1
-        else:
-            deck = active_deck_for_room(state, p.room)
-            if deck is not None:
-                deck.put_bottom(card)
-        return
+def _resolve_crown(state: GameState, pid: PlayerId, card, spec: CardSpec, cfg: Config, rng: Optional[RNG]) -> None:
+    if not state.flags.get("CROWN_YELLOW"):
+        p = state.players[pid]
+        state.flags["CROWN_YELLOW"] = True
+        state.flags["CROWN_HOLDER"] = str(pid)
+        if "CROWN" not in p.soulbound_items:
+            p.soulbound_items.append("CROWN")
+        state.false_king_floor = floor_of(p.room)
+        state.false_king_round_appeared = state.round
 
-    if s_str.startswith("OBJECT:"):
-        obj_id = s_str.split(":", 1)[1]
-        if obj_id == "CROWN":
-            s_str = "CROWN"
-        elif obj_id in OBJECT_CATALOG:
-            _grant_object(obj_id)
-            return
 
-    if s_str in OBJECT_CATALOG and s_str != "CROWN":
-        _grant_object(s_str)
-        return
+def _resolve_monster(state: GameState, pid: PlayerId, card, spec: CardSpec, cfg: Config, rng: Optional[RNG]) -> None:
+    spawn_monster_from_card(state, pid, spec.arg, cfg, rng)
 
-    if s_str.startswith("MONSTER:"):
-        mid = s_str.split(":", 1)[1]
-        spawn_monster_from_card(state, pid, mid, cfg, rng)
-        return
 
-    if s_str.startswith("STATE:"):
-        sid = s_str.split(":", 1)[1]
-        duration = 3 if sid in ("TRAPPED", "TRAPPED_SPIDER") else 2
-        p.statuses.append(StatusInstance(status_id=sid, remaining_rounds=duration))
-        return
+def _resolve_state(state: GameState, pid: PlayerId, card, spec: CardSpec, cfg: Config, rng: Optional[RNG]) -> None:
+    sid = spec.arg
+    duration = 3 if sid in ("TRAPPED", "TRAPPED_SPIDER") else 2
+    state.players[pid].statuses.append(StatusInstance(status_id=sid, remaining_rounds=duration))
 
-    if s_str == "CROWN":
-        if not state.flags.get("CROWN_YELLOW"):
-            state.flags["CROWN_YELLOW"] = True
-            state.flags["CROWN_HOLDER"] = str(pid)
-            if "CROWN" not in p.soulbound_items:
-                p.soulbound_items.append("CROWN")
-            state.false_king_floor = floor_of(p.room)
-            state.false_king_round_appeared = state.round
-        return
 
-    if s_str.startswith("OMEN:"):
-        omen_id = s_str.split(":", 1)[1]
-        handle_omen_reveal(state, pid, omen_id, rng, cfg)
-        state.discard_pile.append(f"OMEN:{omen_id}")
-        return
+def _resolve_omen(state: GameState, pid: PlayerId, card, spec: CardSpec, cfg: Config, rng: Optional[RNG]) -> None:
+    handle_omen_reveal(state, pid, spec.arg, rng, cfg)
+    state.discard_pile.append(spec.card_id)
 
-    if s_str.startswith("EVENT:") or s_str.startswith("EVENTS:"):
-        prefix = s_str.split(":", 1)[0]
-        event_id = s_str.split(":", 1)[1]
-        resolve_event(state, pid, event_id, cfg, rng, card_prefix=prefix)
-        return
+
+def _resolve_event(state: GameState, pid: PlayerId, card, spec: CardSpec, cfg: Config, rng: Optional[RNG]) -> None:
+    resolve_event(state, pid, spec.arg, cfg, rng, card_prefix=spec.prefix)
+
+
+def _resolve_none(state: GameState, pid: PlayerId, card, spec: CardSpec, cfg: Config, rng: Optional[RNG]) -> None:
+    return None
+
+
+# Tabla de despacho indexada por tipo de carta (engine.catalogs.cards)
+_CARD_HANDLERS = [_resolve_none] * N_CARD_KINDS
+_CARD_HANDLERS[CARD_NONE] = _resolve_none
+_CARD_HANDLERS[CARD_KEY] = _resolve_key
+_CARD_HANDLERS[CARD_OBJECT] = _resolve_object
+_CARD_HANDLERS[CARD_CROWN] = _resolve_crown
+_CARD_HANDLERS[CARD_MONSTER] = _resolve_monster
+_CARD_HANDLERS[CARD_STATE] = _resolve_state
+_CARD_HANDLERS[CARD_OMEN] = _resolve_omen
+_CARD_HANDLERS[CARD_EVENT] = _resolve_event
+_CARD_HANDLERS = tuple(_CARD_HANDLERS)
+
+
+def resolve_card_minimal(state: GameState, pid: PlayerId, card, cfg: Config, rng: Optional[RNG] = None):
+    """
+    Resolver efectos minimos de cartas.
+    - KEY -> jugador gana una llave (si no excede limite)
+    - MONSTER:<id> -> monstruo entra en el tablero
+    - STATE:<id> -> status al jugador
+    - CROWN -> activa bandera de corona y crea Falso Rey en piso del jugador
+
+    El tipo y argumento de la carta vienen pre-parseados del catálogo
+    (card_spec); aquí solo se despacha al handler de su tipo.
+    """
+    spec = card_spec(card)
+    _CARD_HANDLERS[spec.kind](state, pid, card, spec, cfg, rng)
@@ -12,6 +12,7 @@ from engine.state import GameState
 from engine.systems.rooms import enter_room_and_reveal
 from engine.systems.sanity import apply_sanity_loss, heal_player
 from engine.types import PlayerId, RoomId, CardId
+from engine.flags import PROTECCION_AMARILLO, SKIP_TURN, state_flags
 
 EventHandler = Callable[..., None]
 
@@ -40,7 +41,7 @@ def resolve_event(state: GameState, pid: PlayerId, event_id: str, cfg: Config, r
     p = state.players[pid]
 
     # Proteccion Amarillo: inmunidad a eventos "amarillo" por 1 ronda
-    prot_flag = state.flags.get(f"PROTECCION_AMARILLO_{pid}", 0)
+    prot_flag = state_flags(state).player(PROTECCION_AMARILLO, pid, 0)
     amarillo_events = {
         "FURIA_AMARILLO",
         "GOLPE_AMARILLO",
@@ -102,7 +103,7 @@ def _event_hay_cadaver(s: GameState, pid: PlayerId, total: int, cfg: Config, rng
     p = s.players[pid]
 
     if total <= 2:
-        s.flags[f"SKIP_TURN_{pid}"] = True
+        state_flags(s).set_for(SKIP_TURN, pid, True)
     elif total <= 4:
         apply_sanity_loss(s, p, 1, source="HAY_CADAVER")
     else:
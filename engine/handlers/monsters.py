@@ -10,6 +10,7 @@ from engine.state import GameState, MonsterState, StatusInstance
 from engine.systems.rooms import on_player_enters_room
 from engine.systems.sanity import apply_sanity_loss
 from engine.types import PlayerId, RoomId
+from engine.flags import GOBLIN_HAS_LOOT, GOBLIN_LOOT_KEYS, GOBLIN_LOOT_OBJECTS, SACK_HAS_VICTIM, state_flags
 
 MonsterSpawnHandler = Callable[[GameState, PlayerId, str, Config, Optional[RNG]], bool]
 MonsterRevealHandler = Callable[[GameState, PlayerId, str, Config, Optional[RNG]], None]
@@ -136,13 +137,14 @@ def _post_spawn_goblin(state: GameState, pid: PlayerId, monster: MonsterState, c
     loot_keys = p.keys
     
     if loot_objects or loot_keys > 0:
-        state.flags[f"GOBLIN_LOOT_OBJECTS_{monster.monster_id}"] = loot_objects
-        state.flags[f"GOBLIN_LOOT_KEYS_{monster.monster_id}"] = loot_keys
+        flags = state_flags(state)
+        flags.set_for(GOBLIN_LOOT_OBJECTS, monster.monster_id, loot_objects)
+        flags.set_for(GOBLIN_LOOT_KEYS, monster.monster_id, loot_keys)
         
         p.objects = []
         p.object_charges = {}
         p.keys = 0
-        state.flags[f"GOBLIN_HAS_LOOT_{monster.monster_id}"] = True
+        flags.set_for(GOBLIN_HAS_LOOT, monster.monster_id, True)
 
     # CANON: Teleport a la habitación más cercana sin jugadores.
     from engine.pathing import find_nearest_empty_room
@@ -162,7 +164,7 @@ def _post_spawn_goblin_en(state: GameState, pid: PlayerId, monster: MonsterState
 def _post_spawn_sack(state: GameState, pid: PlayerId, monster: MonsterState, cfg: Config, rng: Optional[RNG]) -> None:
     p = state.players[pid]
     p.statuses.append(StatusInstance(status_id="TRAPPED", remaining_rounds=3, metadata={"source_monster_id": monster.monster_id}))
-    state.flags[f"SACK_HAS_VICTIM_{monster.monster_id}"] = True
+    state_flags(state).set_for(SACK_HAS_VICTIM, monster.monster_id, True)
 
     # CANON: Teleport to NEAREST room without players.
     occupied_rooms = {pl.room for pl in state.players.values()}
@@ -7,6 +7,7 @@ from engine.config import Config
 from engine.rng import RNG
 from engine.state import GameState, MonsterState
 from engine.types import PlayerId, RoomId
+from engine.flags import SKIP_TURN, state_flags
 from engine.pathing import find_nearest_empty_room
 from engine.handlers.monsters import apply_monster_post_spawn, try_monster_spawn
 from engine.objects import can_discard
@@ -52,7 +53,7 @@ def _omen_spider(state: GameState, pid: PlayerId, omen_id: str, spawn_pos: RoomI
         if not exists:
             _spawn_monster(state, pid, "SPIDER", spawn_pos, cfg, rng)
     else:
-        state.flags[f"SKIP_TURN_{pid}"] = True
+        state_flags(state).set_for(SKIP_TURN, pid, True)
         target_room = find_nearest_empty_room(state, spawn_pos)
         _spawn_monster(state, pid, "BABY_SPIDER", target_room, cfg, rng)
 
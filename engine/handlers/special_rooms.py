@@ -12,6 +12,7 @@ from engine.systems.decks import reveal_one
 from engine.systems.rooms import enter_room_and_reveal
 from engine.systems.sanity import apply_sanity_loss, heal_player
 from engine.types import PlayerId, RoomId
+from engine.flags import PROTECCION_AMARILLO, state_flags
 from engine.rules.keys import get_base_keys_total, get_effective_keys_total
 
 SpecialRoomHandler = Callable[[GameState, PlayerId, Action, RNG, Config], None]
@@ -56,8 +57,8 @@ def _motemey_buy(state: GameState, pid: PlayerId, action: Action, rng: RNG, cfg:
     apply_sanity_loss(state, p, 2, source="MOTEMEY_BUY", cfg=cfg)
     deck = state.motemey_deck
     if deck.remaining() >= 2:
-        card1 = deck.cards[deck.top]
-        card2 = deck.cards[deck.top + 1]
+        card1 = deck.peek(0)
+        card2 = deck.peek(1)
         deck.top += 2
 
         chosen_idx = int(action.data.get("chosen_index", 0))
@@ -166,8 +167,8 @@ def _taberna_rooms(state: GameState, pid: PlayerId, action: Action, rng: RNG, cf
     deck_a = state.boxes[state.box_at_room.get(room_a)].deck if room_a in state.box_at_room else None
     deck_b = state.boxes[state.box_at_room.get(room_b)].deck if room_b in state.box_at_room else None
 
-    card_a = deck_a.cards[deck_a.top] if deck_a and deck_a.remaining() > 0 else None
-    card_b = deck_b.cards[deck_b.top] if deck_b and deck_b.remaining() > 0 else None
+    card_a = deck_a.peek() if deck_a else None
+    card_b = deck_b.peek() if deck_b else None
 
     state.last_peek = [{"room": str(room_a), "card": str(card_a)}, {"room": str(room_b), "card": str(card_b)}]
 
@@ -224,7 +225,7 @@ def _capilla(state: GameState, pid: PlayerId, action: Action, rng: RNG, cfg: Con
 def _salon_belleza(state: GameState, pid: PlayerId, action: Action, rng: RNG, cfg: Config) -> None:
     p = state.players[pid]
     state.salon_belleza_uses += 1
-    state.flags[f"PROTECCION_AMARILLO_{pid}"] = state.round + 1
+    state_flags(state).set_for(PROTECCION_AMARILLO, pid, state.round + 1)
     if state.salon_belleza_uses >= 3:
         from engine.effects.event_utils import add_status
         add_status(p, "VANIDAD")
@@ -1,7 +1,11 @@
 from __future__ import annotations
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
-from engine.actions import Action, ActionType
+from engine.actions import (
+    Action, ActionFamily, ActionOrFamily, ActionSpace, ActionType, FAMILY_PAIRS,
+    LegalActions, expand_action_space,
+)
 from engine.board import neighbors, floor_of, is_corridor, corridor_id
 from engine.boxes import active_deck_for_room
 from engine.state import GameState, RoomState
@@ -10,6 +14,7 @@ from engine.effects.states_canonical import has_status
 from engine.objects import is_soulbound
 from engine.inventory import get_inventory_limits
 from engine.setup import normalize_room_type
+from engine.flags import ARMORY_DESTROYED, TEMP_STAIRS, state_flags
 
 
 def _get_special_room_type(state: GameState, room_id: RoomId) -> Optional[str]:
@@ -72,21 +77,138 @@ def _is_paranoia_move_legal(state: GameState, pid: PlayerId, to_room: RoomId) ->
     return True
 
 
+_NO_ROOMS: FrozenSet[RoomId] = frozenset()
+
+
+def _paranoia_blocked_rooms(state: GameState, pid: PlayerId) -> FrozenSet[RoomId]:
+    """
+    Salas a las que PARANOIA impide entrar a `pid` (misma regla que
+    _is_paranoia_move_legal, calculada en una sola pasada por los jugadores).
+    """
+    self_paranoid = has_status(state.players[pid], "PARANOIA")
+    blocked = [
+        other.room
+        for other_pid, other in state.players.items()
+        if other_pid != pid and (self_paranoid or has_status(other, "PARANOIA"))
+    ]
+    return frozenset(blocked) if blocked else _NO_ROOMS
+
+
 def _temp_stairs_active(state: GameState, room_id: RoomId, pid: PlayerId) -> bool:
     """Retorna True si hay escalera temporal activa en la habitación (solo este turno)."""
-    key = f"TEMP_STAIRS_{room_id}"
-    flag = state.flags.get(key)
+    flags = state_flags(state)
+    flag = flags.room(TEMP_STAIRS, room_id)
     if isinstance(flag, dict):
         return flag.get("round") == state.round and flag.get("pid") == str(pid)
     if isinstance(flag, int):
         # Compatibilidad con estados antiguos: fijar dueño al jugador actual.
         if flag == state.round:
-            state.flags[key] = {"round": state.round, "pid": str(pid)}
+            flags.set_for(TEMP_STAIRS, room_id, {"round": state.round, "pid": str(pid)})
             return True
     return False
 
 
-def get_legal_actions(state: GameState, actor: str) -> List[Action]:
+def get_legal_actions(state: GameState, actor: str, cached: bool = False) -> LegalActions:
+    """
+    Acciones legales de `actor` (lista con pertenencia O(1)).
+
+    Por defecto se calcula sobre el estado actual (los sub-resultados
+    caros ya se cachean por sus entradas). Con `cached=True` además se
+    reutiliza el resultado por (versión del estado, actor): consultas
+    repetidas sobre el mismo estado (runner + policy + búsqueda) no
+    regeneran la lista. Solo es seguro si el estado no se mutó a mano
+    desde la última consulta sin llamar a state.touch(); step() ya
+    incrementa la versión.
+
+    Se devuelve siempre una lista nueva: el llamador puede mutarla.
+    """
+    if not cached:
+        return LegalActions(_enumerate_legal_actions(state, actor))
+    version = state._version
+    entry = state._legal_cache
+    if entry is None or entry[0] != version:
+        # Nueva versión: diccionario nuevo (los clones pueden compartir el anterior)
+        entry = state._legal_cache = (version, {})
+    cache = entry[1]
+    acts = cache.get(actor)
+    if acts is None:
+        acts = cache[actor] = tuple(_enumerate_legal_actions(state, actor))
+    return LegalActions(acts)
+
+
+# --- Sub-resultados cacheados ---
+# Funciones puras de sus entradas (hashables): se recalculan solo cuando
+# cambian la sala, las escaleras, el bloqueo por PARANOIA, los objetos, etc.
+# Las acciones son inmutables, así que las tuplas se comparten entre estados.
+
+@lru_cache(maxsize=4096)
+def _move_actions(
+    actor: str,
+    room: RoomId,
+    stairs: Tuple[Optional[RoomId], Optional[RoomId], Optional[RoomId]],
+    temp_dests: Tuple[RoomId, ...],
+    blocked: FrozenSet[RoomId],
+) -> Tuple[Action, ...]:
+    """
+    MOVE desde `room`: vecinos del nodo, escalera del piso (si se está en
+    ella) y escaleras temporales. `stairs` = escaleras de (f-1, f, f+1).
+    """
+    dests = [RoomId(nb) for nb in neighbors(room)]
+    f = floor_of(room)
+    if room == stairs[1]:
+        if f > 1 and stairs[0]:
+            dests.append(stairs[0])
+        if f < 3 and stairs[2]:
+            dests.append(stairs[2])
+    dests.extend(temp_dests)
+    return tuple(
+        Action(actor=actor, type=ActionType.MOVE, data={"to": str(dest)})
+        for dest in dests
+        if dest not in blocked
+    )
+
+
+@lru_cache(maxsize=1024)
+def _object_actions(
+    actor: str,
+    blunt: bool,
+    compass: bool,
+    vial: bool,
+    treasure_stairs: bool,
+    portable_floor: int,
+) -> Tuple[Action, ...]:
+    """Objetos de uso libre; `portable_floor` es 0 si no aplica la escalera portátil."""
+    acts = []
+    if blunt:
+        acts.append(Action(actor=actor, type=ActionType.USE_BLUNT, data={}))
+    if compass:
+        acts.append(Action(actor=actor, type=ActionType.USE_OBJECT, data={"object_id": "COMPASS"}))
+    if vial:
+        acts.append(Action(actor=actor, type=ActionType.USE_OBJECT, data={"object_id": "VIAL"}))
+    if treasure_stairs:
+        acts.append(Action(actor=actor, type=ActionType.USE_OBJECT, data={"object_id": "TREASURE_STAIRS"}))
+    if portable_floor:
+        if portable_floor > 1:
+            acts.append(Action(actor=actor, type=ActionType.USE_PORTABLE_STAIRS, data={"direction": "DOWN"}))
+        if portable_floor < 3:
+            acts.append(Action(actor=actor, type=ActionType.USE_PORTABLE_STAIRS, data={"direction": "UP"}))
+    return tuple(acts)
+
+
+def get_legal_action_space(state: GameState, actor: str) -> ActionSpace:
+    """
+    Como get_legal_actions, pero las acciones combinatorias (pares de
+    TABERNA, SELL de Motemey, DROP de objetos en Armería) se devuelven como
+    ActionFamily sin materializar cada combinación.
+    """
+    return ActionSpace(_enumerate_action_space(state, actor))
+
+
+def _enumerate_legal_actions(state: GameState, actor: str) -> List[Action]:
+    return expand_action_space(_enumerate_action_space(state, actor))
+
+
+def _enumerate_action_space(state: GameState, actor: str) -> List[ActionOrFamily]:
     if state.game_over:
         return []
 
@@ -163,7 +285,7 @@ def get_legal_actions(state: GameState, actor: str) -> List[Action]:
                 acts.insert(0, Action(actor=str(pid), type=ActionType.DISCARD_SANIDAD, data={}))
             return acts
 
-        acts: List[Action] = []
+        acts: List[ActionOrFamily] = []
         
         # CANON Fix: TRAPPED State blocks ALL actions except Escape
         if has_status(p, "TRAPPED"):
@@ -172,43 +294,24 @@ def get_legal_actions(state: GameState, actor: str) -> List[Action]:
             return acts
         # MOVIMIENTO_BLOQUEADO: Reina Helada bloquea movimiento
         movement_allowed = not _is_movement_blocked(state, pid)
-
-        # MOVE a vecinos del nodo actual (misma planta: pasillo <-> habitaciones)
-        for nb in neighbors(p.room):
-            # MOVIMIENTO_BLOQUEADO y PARANOIA bloquean movimiento
-            if movement_allowed and _is_paranoia_move_legal(state, pid, RoomId(nb)):
-                acts.append(Action(actor=str(pid), type=ActionType.MOVE, data={"to": str(nb)}))
-
-        # MOVE especial: si estás en la habitación que tiene escaleras en tu piso,
-        # puedes moverte a la habitación con escalera del piso arriba/abajo (según canon P0).
         f = floor_of(p.room)
-        if p.room == state.stairs.get(f):
-            if f > 1:
-                dest_stair = state.stairs.get(f - 1)
-                if dest_stair:
-                    # MOVIMIENTO_BLOQUEADO y PARANOIA bloquean movimiento
-                    if movement_allowed and _is_paranoia_move_legal(state, pid, dest_stair):
-                        acts.append(Action(actor=str(pid), type=ActionType.MOVE, data={"to": str(dest_stair)}))
-            if f < 3:
-                dest_stair = state.stairs.get(f + 1)
-                if dest_stair:
-                    # MOVIMIENTO_BLOQUEADO y PARANOIA bloquean movimiento
-                    if movement_allowed and _is_paranoia_move_legal(state, pid, dest_stair):
-                        acts.append(Action(actor=str(pid), type=ActionType.MOVE, data={"to": str(dest_stair)}))
-
-        # MOVE especial: escaleras temporales (TREASURE_STAIRS) permiten subir/bajar al mismo cuarto
-        if _temp_stairs_active(state, p.room, pid):
-            suffix = str(p.room).split("_", 1)[1]
-            if f > 1:
-                dest = RoomId(f"F{f-1}_{suffix}")
-                if dest in state.rooms:
-                    if movement_allowed and _is_paranoia_move_legal(state, pid, dest):
-                        acts.append(Action(actor=str(pid), type=ActionType.MOVE, data={"to": str(dest)}))
-            if f < 3:
-                dest = RoomId(f"F{f+1}_{suffix}")
-                if dest in state.rooms:
-                    if movement_allowed and _is_paranoia_move_legal(state, pid, dest):
-                        acts.append(Action(actor=str(pid), type=ActionType.MOVE, data={"to": str(dest)}))
+        blocked = _paranoia_blocked_rooms(state, pid) if movement_allowed else _NO_ROOMS
+
+        # MOVE a vecinos del nodo actual (misma planta: pasillo <-> habitaciones),
+        # a la escalera del piso arriba/abajo si estás en la habitación con
+        # escaleras (canon P0) y por escaleras temporales (TREASURE_STAIRS).
+        # MOVIMIENTO_BLOQUEADO y PARANOIA bloquean movimiento.
+        if movement_allowed:
+            temp_dests: Tuple[RoomId, ...] = ()
+            if _temp_stairs_active(state, p.room, pid):
+                suffix = str(p.room).split("_", 1)[1]
+                temp_dests = tuple(
+                    RoomId(f"F{tf}_{suffix}")
+                    for tf in (f - 1, f + 1)
+                    if 1 <= tf <= 3 and RoomId(f"F{tf}_{suffix}") in state.rooms
+                )
+            stairs = (state.stairs.get(f - 1), state.stairs.get(f), state.stairs.get(f + 1))
+            acts.extend(_move_actions(str(pid), p.room, stairs, temp_dests, blocked))
 
         # SEARCH solo en habitación con mazo activo
         deck = active_deck_for_room(state, p.room)
@@ -241,7 +344,8 @@ def get_legal_actions(state: GameState, actor: str) -> List[Action]:
 
         # ===== B2: MOTEMEY (buy/sell) =====
         # Disponible si actor está en habitación MOTEMEY o evento es activo
-        is_in_motemey = _get_special_room_type(state, p.room) == "MOTEMEY"
+        room_type = _get_special_room_type(state, p.room)
+        is_in_motemey = room_type == "MOTEMEY"
 
         if is_in_motemey or state.motemey_event_active:
             # Paso 1: Iniciar compra (requiere sanidad >= 2)
@@ -252,14 +356,13 @@ def get_legal_actions(state: GameState, actor: str) -> List[Action]:
 
             # SELL: requiere tener al menos un objeto (siempre disponible)
             if p.objects:
-                for item in p.objects:
-                    if not is_soulbound(item):
-                        acts.append(Action(actor=str(pid), type=ActionType.USE_MOTEMEY_SELL, data={"item_name": item}))
+                # Pool sin duplicados (dos VIAL = una sola acción SELL VIAL)
+                sellable = tuple(dict.fromkeys(item for item in p.objects if not is_soulbound(item)))
+                if sellable:
+                    acts.append(ActionFamily(str(pid), ActionType.USE_MOTEMEY_SELL, ("item_name",), sellable))
 
         # ===== B4: PUERTAS AMARILLO =====
         # Disponible si actor está en habitación PUERTAS y existe al menos otro jugador
-        # Usar normalización o ID canónico
-        room_type = _get_special_room_type(state, p.room)
         is_in_puertas = room_type == "PUERTAS_AMARILLO"
         other_players = [p2_id for p2_id in state.players if p2_id != pid]
 
@@ -269,26 +372,23 @@ def get_legal_actions(state: GameState, actor: str) -> List[Action]:
 
         # ===== B5: TABERNA =====
         # CANON: Solo habitaciones (NO pasillos), 2 distintas, 1x turno
-        room_type = _get_special_room_type(state, p.room)
         is_in_taberna = room_type == "TABERNA"
         taberna_used = state.taberna_used_this_turn.get(pid, False)
 
         if is_in_taberna and not taberna_used:
             # CANON: Solo habitaciones, NO pasillos
-            valid_rooms = [rid for rid in state.rooms.keys() if not is_corridor(rid)]
+            valid_rooms = tuple(str(rid) for rid in state.rooms.keys() if not is_corridor(rid))
             if len(valid_rooms) >= 2:
-                for i, room_a in enumerate(valid_rooms):
-                    for room_b in valid_rooms[i+1:]:
-                        if room_a != room_b:
-                            acts.append(Action(actor=str(pid), type=ActionType.USE_TABERNA_ROOMS, data={"room_a": str(room_a), "room_b": str(room_b)}))
+                acts.append(ActionFamily(
+                    str(pid), ActionType.USE_TABERNA_ROOMS, ("room_a", "room_b"), valid_rooms, kind=FAMILY_PAIRS,
+                ))
 
         # ===== B6: ARMERÍA =====
         # Disponible si actor está en habitación ARMERÍA y armería no está destruida
-        room_type = _get_special_room_type(state, p.room)
         is_in_armory = room_type == "ARMERIA"
         # La destrucción ya está manejada por special_destroyed en _get_special_room_type
         # pero mantenemos compatibilidad con flag por si acaso
-        armory_destroyed = state.flags.get(f"ARMORY_DESTROYED_{p.room}", False)
+        armory_destroyed = state_flags(state).room(ARMORY_DESTROYED, p.room, False)
 
         if is_in_armory and not armory_destroyed:
             # CANON: Storage permite hasta 2 ítems en total (objetos y llaves)
@@ -296,9 +396,12 @@ def get_legal_actions(state: GameState, actor: str) -> List[Action]:
             
             # DROP OBJECTS: si tiene objetos y hay espacio (< 2)
             if p.objects and current_storage_count < 2:
-                for obj in p.objects:
-                    if not is_soulbound(obj):
-                        acts.append(Action(actor=str(pid), type=ActionType.USE_ARMORY_DROP, data={"item_name": obj, "item_type": "object"}))
+                droppable = tuple(dict.fromkeys(obj for obj in p.objects if not is_soulbound(obj)))
+                if droppable:
+                    acts.append(ActionFamily(
+                        str(pid), ActionType.USE_ARMORY_DROP, ("item_name",), droppable,
+                        fixed=(("item_type", "object"),),
+                    ))
 
             # DROP KEYS: si tiene llaves y hay espacio (< 2)
             if p.keys > 0 and current_storage_count < 2:
@@ -309,29 +412,19 @@ def get_legal_actions(state: GameState, actor: str) -> List[Action]:
                 acts.append(Action(actor=str(pid), type=ActionType.USE_ARMORY_TAKE, data={}))
 
         # ===== OBJETOS (contundente / escaleras portÃ¡tiles) =====
-        # Contundente: solo si hay monstruo en la sala
-        if "BLUNT" in p.objects:
-            if any(m.room == p.room for m in state.monsters):
-                acts.append(Action(actor=str(pid), type=ActionType.USE_BLUNT, data={}))
-
-        # Objetos gratuitos: COMPASS / VIAL / TREASURE_STAIRS
-        if "COMPASS" in p.objects:
-            corridor = corridor_id(floor_of(p.room))
-            if p.room != corridor:
-                if movement_allowed and _is_paranoia_move_legal(state, pid, corridor):
-                    acts.append(Action(actor=str(pid), type=ActionType.USE_OBJECT, data={"object_id": "COMPASS"}))
-        if "VIAL" in p.objects:
-            acts.append(Action(actor=str(pid), type=ActionType.USE_OBJECT, data={"object_id": "VIAL"}))
-        if "TREASURE_STAIRS" in p.objects:
-            acts.append(Action(actor=str(pid), type=ActionType.USE_OBJECT, data={"object_id": "TREASURE_STAIRS"}))
-
-        # Escalera portÃ¡til: moverse +/-1 piso (respeta bloqueo de movimiento)
-        if "PORTABLE_STAIRS" in p.objects and movement_allowed:
-            f = floor_of(p.room)
-            if f > 1:
-                acts.append(Action(actor=str(pid), type=ActionType.USE_PORTABLE_STAIRS, data={"direction": "DOWN"}))
-            if f < 3:
-                acts.append(Action(actor=str(pid), type=ActionType.USE_PORTABLE_STAIRS, data={"direction": "UP"}))
+        # Contundente: solo si hay monstruo en la sala.
+        # Objetos gratuitos: COMPASS / VIAL / TREASURE_STAIRS.
+        # Escalera portÃ¡til: moverse +/-1 piso (respeta bloqueo de movimiento).
+        objects = p.objects
+        if objects:
+            blunt = "BLUNT" in objects and any(m.room == p.room for m in state.monsters)
+            corridor = corridor_id(f)
+            compass = ("COMPASS" in objects and p.room != corridor
+                       and movement_allowed and corridor not in blocked)
+            portable_floor = f if ("PORTABLE_STAIRS" in objects and movement_allowed) else 0
+            acts.extend(_object_actions(
+                str(pid), blunt, compass, "VIAL" in objects, "TREASURE_STAIRS" in objects, portable_floor,
+            ))
 
         # ===== B3: CÁMARA LETAL =====
         # P1 - FASE 1.5.4: Ritual para obtener 7ª llave
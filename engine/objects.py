@@ -31,6 +31,9 @@ from engine.catalogs.objects import OBJECT_CATALOG
 from engine.handlers.objects import get_object_use_handler, register_object_use
 from engine.state import GameState, PlayerState
 from engine.types import PlayerId
+from engine.flags import (
+    GOBLIN_HAS_LOOT, GOBLIN_LOOT_KEYS, GOBLIN_LOOT_OBJECTS, SACK_HAS_VICTIM, TEMP_STAIRS, state_flags,
+)
 
 
 def is_soulbound(object_id: str) -> bool:
@@ -128,15 +131,16 @@ def _use_blunt(s: GameState, pid: PlayerId, cfg) -> None:
                 
                 # GOBLIN: Drop Loot
                 if "DUENDE" in mid or "GOBLIN" in mid:
-                    loot_objects = s.flags.get(f"GOBLIN_LOOT_OBJECTS_{mid}")
-                    loot_keys = s.flags.get(f"GOBLIN_LOOT_KEYS_{mid}", 0)
+                    flags = state_flags(s)
+                    loot_objects = flags.monster(GOBLIN_LOOT_OBJECTS, mid)
+                    loot_keys = flags.monster(GOBLIN_LOOT_KEYS, mid, 0)
                     
                     if loot_objects:
                         from engine.inventory import add_object
                         for obj_id in loot_objects:
                             if not add_object(s, pid, obj_id, discard_choice=None):
                                 s.discard_pile.append(obj_id)
-                        del s.flags[f"GOBLIN_LOOT_OBJECTS_{mid}"]
+                        flags.pop_for(GOBLIN_LOOT_OBJECTS, mid)
 
                     if loot_keys > 0:
                         from engine.inventory import can_add_key
@@ -145,9 +149,9 @@ def _use_blunt(s: GameState, pid: PlayerId, cfg) -> None:
                                 p.keys += 1
                             else:
                                 s.keys_destroyed += 1
-                        del s.flags[f"GOBLIN_LOOT_KEYS_{mid}"]
+                        flags.pop_for(GOBLIN_LOOT_KEYS, mid)
                         
-                    s.flags[f"GOBLIN_HAS_LOOT_{mid}"] = False
+                    flags.set_for(GOBLIN_HAS_LOOT, mid, False)
                     
                 # BOGEYMAN: Release Victim
                 if "VIEJO" in mid or "SACK" in mid:
@@ -155,14 +159,14 @@ def _use_blunt(s: GameState, pid: PlayerId, cfg) -> None:
                         new_statuses = []
                         released = False
                         for st in target_p.statuses:
-                            if st.status_id == "TRAPPED" and st.metadata.get("source_monster_id") == mid:
+                            if st.status_id == "TRAPPED" and (st.metadata or {}).get("source_monster_id") == mid:
                                 released = True
                             else:
                                 new_statuses.append(st)
                         target_p.statuses = new_statuses
                         
                         if released:
-                            s.flags[f"SACK_HAS_VICTIM_{mid}"] = False
+                            state_flags(s).set_for(SACK_HAS_VICTIM, mid, False)
 
             break
 
@@ -174,7 +178,7 @@ def _use_treasure_stairs(s: GameState, pid: PlayerId, cfg) -> None:
     """
     p = s.players[pid]
     # Registrar escalera temporal (válida solo este turno)
-    s.flags[f"TEMP_STAIRS_{p.room}"] = {"round": s.round, "pid": str(pid)}
+    state_flags(s).set_for(TEMP_STAIRS, p.room, {"round": s.round, "pid": str(pid)})
 
     # Decrementar usos (manejado automáticamente por el sistema en use_object)
 
@@ -3,7 +3,17 @@ from __future__ import annotations
 from collections import deque
 from typing import Iterable
 
-from engine.board import floor_of, is_corridor, neighbors
+from engine.board import (
+    N_NODES,
+    NODE_IS_CORRIDOR,
+    ROOM_IDS,
+    ROOM_INDEX,
+    floor_of,
+    is_corridor,
+    neighbors,
+    stairs_key,
+    stairs_overlay,
+)
 from engine.state import GameState
 from engine.types import RoomId
 
@@ -32,6 +42,24 @@ def find_nearest_empty_room(state: GameState, origin: RoomId) -> RoomId:
     """
     occupied = {p.room for p in state.players.values()}
 
+    origin_idx = ROOM_INDEX.get(origin)
+    stairs = list(state.stairs.values())
+    if origin_idx is not None and all(r in ROOM_INDEX for r in stairs):
+        # Grafo cacheado por configuración de escaleras (índices enteros)
+        adj = stairs_overlay(stairs_key(state.stairs))
+        visited = [False] * N_NODES
+        visited[origin_idx] = True
+        queue = deque([origin_idx])
+        while queue:
+            current = queue.popleft()
+            if not NODE_IS_CORRIDOR[current] and ROOM_IDS[current] not in occupied:
+                return ROOM_IDS[current]
+            for nb in adj[current]:
+                if not visited[nb]:
+                    visited[nb] = True
+                    queue.append(nb)
+        return origin
+
     queue = deque([origin])
     visited = {origin}
 
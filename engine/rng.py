@@ -1,58 +1,249 @@
 from __future__ import annotations
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, List, Sequence, Tuple
+from typing import Any, Dict, List, Sequence, Tuple, Union
 import hashlib
 import random
 
 
+# Niveles de log de draws
+LOG_OFF = "off"            # sin registro (default: simulación batch y búsqueda)
+LOG_COUNTERS = "counters"  # solo conteo de draws por tipo
+LOG_RING = "ring"          # últimos `log_size` draws
+LOG_FULL = "full"          # todos los draws (debug de replays)
+LOG_LEVELS = (LOG_OFF, LOG_COUNTERS, LOG_RING, LOG_FULL)
+DEFAULT_LOG_SIZE = 256
+
+# Algoritmos base
+ALGO_MT = "mt"            # Mersenne Twister (random.Random); default de RNG(seed)
+ALGO_COUNTER = "counter"  # SplitMix64 por contador; usado por fork()
+ALGOS = (ALGO_MT, ALGO_COUNTER)
+
+_MASK64 = (1 << 64) - 1
+_GAMMA = 0x9E3779B97F4A7C15
+
+
+def _mix64(z: int) -> int:
+    """Finalizador de SplitMix64 (biyección sobre 64 bits)."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def _key64(value: Union[int, str]) -> int:
+    """Reduce una semilla/tag a 64 bits de forma estable entre procesos."""
+    if isinstance(value, int) and 0 <= value <= _MASK64:
+        return value
+    h = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8)
+    return int.from_bytes(h.digest(), byteorder="big", signed=False)
+
+
+class CounterRandom:
+    """
+    Generador counter-based (SplitMix64): el draw n es mix(key + n * GAMMA).
+
+    No tiene estado pesado que inicializar (solo key y contador), así que
+    crear streams es O(1), y el stream es función pura de la key: idéntico
+    en cualquier proceso/plataforma. randint/choice/shuffle/sample son los
+    algoritmos de random.Random sobre getrandbits(); no se hereda de
+    random.Random porque su constructor siempre siembra un Mersenne Twister.
+    """
+
+    __slots__ = ("_key", "_counter")
+
+    randrange = random.Random.randrange
+    randint = random.Random.randint
+    choice = random.Random.choice
+    shuffle = random.Random.shuffle
+    sample = random.Random.sample
+    _randbelow = random.Random._randbelow_with_getrandbits
+
+    def __init__(self, key: Any = 0) -> None:
+        self.seed(key)
+
+    def seed(self, a: Any = None) -> None:
+        self._key = _key64(a if a is not None else 0)
+        self._counter = 0
+
+    def _next64(self) -> int:
+        self._counter += 1
+        return _mix64((self._key + self._counter * _GAMMA) & _MASK64)
+
+    def random(self) -> float:
+        return (self._next64() >> 11) * (1.0 / 9007199254740992.0)
+
+    def getrandbits(self, k: int) -> int:
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        if k <= 64:
+            return self._next64() >> (64 - k)
+        x = 0
+        for shift in range(0, k, 64):
+            x |= self._next64() << shift
+        return x & ((1 << k) - 1)
+
+    def getstate(self) -> Tuple[int, int]:
+        return (self._key, self._counter)
+
+    def setstate(self, state: Tuple[int, int]) -> None:
+        self._key, self._counter = state
+
+
 @dataclass
 class RNG:
     """
     RNG determinista con log opcional de draws.
     Requisito central para simulaciones reproducibles.
+
+    `log_level` controla el registro de draws (ver LOG_LEVELS); los forks
+    heredan el nivel del padre.
+
+    `algo` elige el generador base: "mt" (default, conserva los streams
+    históricos de cada seed) o "counter" (CounterRandom). fork() siempre
+    devuelve streams counter-based.
     """
     seed: int
     _r: random.Random = None
     log: List[Tuple[str, Any]] = None
     last_king_d6: int = None  # Track last d6 generated for KING_ENDROUND
     last_king_d4: int = None  # Track last d4 generated for KING_ENDROUND
+    log_level: str = LOG_OFF
+    log_size: int = DEFAULT_LOG_SIZE
+    counters: Dict[str, int] = None
+    algo: str = ALGO_MT
 
     def __post_init__(self) -> None:
-        self._r = random.Random(self.seed)
-        self.log = []
+        if self.algo == ALGO_MT:
+            self._r = random.Random(self.seed)
+        elif self.algo == ALGO_COUNTER:
+            self._r = CounterRandom(self.seed)
+        else:
+            raise ValueError(f"Unknown RNG algo: {self.algo!r} (expected one of {ALGOS})")
+        self.set_log_level(self.log_level, self.log_size)
+
+    def set_log_level(self, level: str, size: int = None) -> None:
+        """Cambia el nivel de log (reinicia log y contadores)."""
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown RNG log level: {level!r} (expected one of {LOG_LEVELS})")
+        self.log_level = level
+        if size is not None:
+            self.log_size = int(size)
+        self.log = deque(maxlen=self.log_size) if level == LOG_RING else []
+        self.counters = {}
+        self._log_draws = level in (LOG_RING, LOG_FULL)
+        self._count_draws = level != LOG_OFF
+
+    def _record(self, kind: str, payload: Any) -> None:
+        self.counters[kind] = self.counters.get(kind, 0) + 1
+        if self._log_draws:
+            self.log.append((kind, payload))
 
     def randint(self, a: int, b: int) -> int:
         x = self._r.randint(a, b)
-        self.log.append(("randint", (a, b, x)))
+        if self._count_draws:
+            self._record("randint", (a, b, x))
         return x
 
     def choice(self, seq: Sequence[Any]) -> Any:
         if not seq:
             raise ValueError("choice() on empty sequence")
         x = self._r.choice(list(seq))
-        self.log.append(("choice", (len(seq), x)))
+        if self._count_draws:
+            self._record("choice", (len(seq), x))
         return x
 
     def shuffle(self, seq: List[Any]) -> None:
         self._r.shuffle(seq)
-        self.log.append(("shuffle", len(seq)))
+        if self._count_draws:
+            self._record("shuffle", len(seq))
 
     def sample(self, population: Sequence[Any], k: int) -> List[Any]:
         """Muestrea k elementos de la población sin reemplazo."""
         if not population:
             raise ValueError("sample() on empty population")
         result = self._r.sample(list(population), k)
-        self.log.append(("sample", (len(population), k, result)))
+        if self._count_draws:
+            self._record("sample", (len(population), k, list(result)))
         return result
 
-    def fork(self, tag: str) -> "RNG":
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Captura el estado del generador (y last_king_d4/d6) como dict
+        JSON-serializable, para checkpoints/replays. No incluye el log.
+        """
+        if self.algo == ALGO_MT:
+            version, internal, gauss_next = self._r.getstate()
+            gen_state: Any = [version, list(internal), gauss_next]
+        else:
+            gen_state = list(self._r.getstate())
+        return {
+            "seed": self.seed,
+            "algo": self.algo,
+            "state": gen_state,
+            "last_king_d6": self.last_king_d6,
+            "last_king_d4": self.last_king_d4,
+        }
+
+    def restore(self, snap: Dict[str, Any]) -> None:
+        """Restaura un snapshot(); el RNG continúa exactamente desde ese punto."""
+        algo = snap.get("algo", ALGO_MT)
+        if algo != self.algo:
+            self.algo = algo
+            self._r = random.Random() if algo == ALGO_MT else CounterRandom()
+        self.seed = snap["seed"]
+        gen_state = snap["state"]
+        if algo == ALGO_MT:
+            version, internal, gauss_next = gen_state
+            self._r.setstate((version, tuple(internal), gauss_next))
+        else:
+            self._r.setstate(tuple(gen_state))
+        self.last_king_d6 = snap.get("last_king_d6")
+        self.last_king_d4 = snap.get("last_king_d4")
+
+    @classmethod
+    def from_snapshot(cls, snap: Dict[str, Any], **kwargs: Any) -> "RNG":
+        rng = cls(snap["seed"], algo=snap.get("algo", ALGO_MT), **kwargs)
+        rng.restore(snap)
+        return rng
+
+    @property
+    def position(self) -> int:
+        """
+        Número de palabras consumidas del stream (solo "counter"; MT no
+        expone su posición).
+        """
+        if self.algo != ALGO_COUNTER:
+            raise ValueError("position solo está disponible para RNG counter-based")
+        return self._r.getstate()[1]
+
+    def seek(self, n: int) -> None:
+        """
+        Posiciona el stream en la palabra n desde el inicio (solo "counter",
+        O(1): la palabra n es función pura de (key, n)).
+
+        n cuenta palabras de 64 bits del generador, no draws: randint,
+        choice, shuffle y sample consumen un número variable de palabras
+        (rechazo, una por elemento), así que n debe tomarse de `position`
+        o de un snapshot, nunca contando llamadas. MT no expone posición y
+        levanta ValueError; para volver a un punto de un stream MT usar
+        snapshot()/restore().
+        """
+        if self.algo != ALGO_COUNTER:
+            raise ValueError("seek() solo está disponible para RNG counter-based; en MT usar snapshot()/restore()")
+        if n < 0:
+            raise ValueError("seek() requiere n >= 0")
+        key, _ = self._r.getstate()
+        self._r.setstate((key, n))
+
+    def fork(self, tag: Union[str, int]) -> "RNG":
         """
         Deriva un nuevo RNG a partir de (seed, tag).
         Útil para mantener reproducibilidad en sub-procesos/rollouts.
+
+        Derivación O(1) de key (sin inicializar un Mersenne Twister): el hijo
+        es un stream counter-based, independiente de la posición del padre.
+        Tags enteros se mezclan directamente; tags str se hashean (blake2b).
         """
-        h = hashlib.blake2b(digest_size=8)
-        h.update(str(self.seed).encode("utf-8"))
-        h.update(b"|")
-        h.update(tag.encode("utf-8"))
-        derived = int.from_bytes(h.digest(), byteorder="big", signed=False)
-        return RNG(derived)
+        tag_key = tag & _MASK64 if isinstance(tag, int) else _key64(tag)
+        derived = _mix64(_key64(self.seed) ^ _mix64(tag_key))
+        return RNG(derived, log_level=self.log_level, log_size=self.log_size, algo=ALGO_COUNTER)
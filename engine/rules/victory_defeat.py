@@ -4,6 +4,7 @@ from engine.config import Config
 from engine.rules.keys import get_effective_keys_total
 from engine.rules.umbral import all_players_in_umbral
 from engine.state import GameState
+from engine.aggregates import keys_in_hand
 
 
 def can_win(state: GameState, cfg: Config) -> bool:
@@ -11,7 +12,7 @@ def can_win(state: GameState, cfg: Config) -> bool:
         return False
     if not all_players_in_umbral(state, cfg):
         return False
-    total_keys = sum(p.keys for p in state.players.values())
+    total_keys = keys_in_hand(state)
     return total_keys >= int(cfg.KEYS_TO_WIN)
 
 
@@ -14,6 +14,7 @@ from typing import Dict, List
 from engine.state import GameState, RoomState, RoomId, DeckState, BoxState
 from engine.boxes import sync_boxes_from_rooms
 from engine.rng import RNG
+from engine.catalogs.cards import intern_cards
 
 
 def validate_special_rooms_invariants(state: GameState) -> None:
@@ -256,7 +257,7 @@ def setup_motemey_deck(state: GameState, rng: RNG) -> None:
     rng.shuffle(cards)
     
     # Asignar a state
-    state.motemey_deck = DeckState(cards=cards)
+    state.motemey_deck = DeckState(cards=intern_cards(cards))
     state.motemey_deck.top = 0
 
 
@@ -316,6 +317,8 @@ def setup_canonical_deck(state: GameState, rng: RNG) -> None:
 
     # Shuffle
     rng.shuffle(cards)
+    # Registrar en el catálogo (código + tipo pre-parseado) e internar ids
+    cards = intern_cards(cards)
 
     # Distribute to Rooms (12 rooms: F1_R1..F3_R4)
     # Total 108. 108 / 12 = 9 cards per room.
@@ -1,24 +1,46 @@
 from __future__ import annotations
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields, asdict
+from collections.abc import Sequence
+from itertools import islice
 from typing import Any, Dict, List, Optional
 import copy
 
 from engine.types import PlayerId, RoomId, CardId
 from engine.boxes import sync_room_decks_from_boxes
+from engine.episode_log import EpisodeLog
+from engine.flags import FlagStore, as_flag_store
+from engine.aggregates import StateAggregates, state_aggregates
+from engine.codec import decode_state, encode_state
+from engine.zobrist import state_zobrist, zobrist_key
 
 
-@dataclass
+@dataclass(slots=True)
 class StatusInstance:
     status_id: str
     remaining_rounds: int
     stacks: int = 1
     # CORRECCIÓN B: Metadata para estados complejos
     # Para TRAPPED_SPIDER: almacena monster_id fuente del trap
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    # None si el estado no lleva metadata (evita un dict vacío por instancia)
+    metadata: Optional[Dict[str, Any]] = None
+
+    def clone(self) -> "StatusInstance":
+        return StatusInstance(
+            self.status_id,
+            self.remaining_rounds,
+            self.stacks,
+            dict(self.metadata) if self.metadata is not None else None,
+        )
 
 
-@dataclass
-class PlayerState:
+class _PlayerPrivate:
+    # Índice de estados: (lista indexada, largo, máscara de bits). Lo mantiene
+    # engine.effects.states_canonical (status_mask); fuera de los campos.
+    __slots__ = ("_status_index",)
+
+
+@dataclass(slots=True)
+class PlayerState(_PlayerPrivate):
     player_id: PlayerId
     sanity: int
     room: RoomId
@@ -49,9 +71,23 @@ class PlayerState:
     def __post_init__(self) -> None:
         if self.sanity_max is None:
             self.sanity_max = self.sanity
+        self._status_index = None
+
+    def clone(self) -> "PlayerState":
+        new = _shallow_copy(self)
+        new.objects = list(self.objects)
+        new.object_charges = dict(self.object_charges)
+        new.soulbound_items = list(self.soulbound_items)
+        new.statuses = [st.clone() for st in self.statuses]
+        index = self._status_index
+        if index is not None and index[0] is self.statuses and index[1] == len(self.statuses):
+            new._status_index = (new.statuses, index[1], index[2])
+        else:
+            new._status_index = None
+        return new
 
 
-@dataclass
+@dataclass(slots=True)
 class MonsterState:
     monster_id: str
     room: RoomId
@@ -60,14 +96,75 @@ class MonsterState:
     # Rey de Amarillo: inmune (no puede ser stuneado)
     stunned_remaining_rounds: int = 0
 
+    def clone(self) -> "MonsterState":
+        return _shallow_copy(self)
 
-@dataclass
-class DeckState:
+
+class _DeckPrivate:
+    # Atributos privados del mazo (fuera de los campos del dataclass)
+    __slots__ = ("_cards_shared", "_zobrist")
+
+
+@dataclass(slots=True)
+class DeckState(_DeckPrivate):
+    """
+    Mazo con puntero top.
+
+    La lista `cards` se comparte entre clones (copy-on-write): cualquier
+    escritura debe pasar por los métodos del mazo (put_bottom, set_card,
+    shuffle_remaining), que copian la lista la primera vez que se muta.
+    """
     cards: List[CardId]
     top: int = 0
 
+    def __post_init__(self) -> None:
+        self._cards_shared = False
+        # (cards, len, top, hash) de engine.zobrist.deck_hash, o None
+        self._zobrist = None
+
+    def clone(self) -> "DeckState":
+        """Copia O(1): comparte `cards` hasta la primera escritura."""
+        new = _shallow_copy(self)
+        new._cards_shared = True
+        self._cards_shared = True
+        return new
+
+    def _own_cards(self) -> None:
+        if self._cards_shared:
+            self.cards = list(self.cards)
+            self._cards_shared = False
+
+    def set_card(self, index: int, card: CardId) -> None:
+        self._own_cards()
+        self.cards[index] = card
+        self._zobrist = None
+
+    def shuffle_remaining(self, rng) -> None:
+        """Baraja las cartas no consumidas (desde top hasta el fondo)."""
+        tail = self.cards[self.top :]
+        rng.shuffle(tail)
+        self._own_cards()
+        self.cards[self.top :] = tail
+        self._zobrist = None
+
     def remaining(self) -> int:
-        return max(0, len(self.cards) - self.top)
+        n = len(self.cards) - self.top
+        return n if n > 0 else 0
+
+    def peek(self, offset: int = 0) -> Optional[CardId]:
+        """
+        Carta en top+offset sin consumirla (no avanza top).
+        Retorna None si esa posición no existe.
+        """
+        i = self.top + offset
+        cards = self.cards
+        if offset < 0 or i >= len(cards):
+            return None
+        return cards[i]
+
+    def view(self) -> "DeckView":
+        """Vista de solo lectura de las cartas restantes (sin copiar)."""
+        return DeckView(self.cards, self.top, len(self.cards))
 
     def draw_top(self) -> Optional[CardId]:
         """
@@ -75,10 +172,17 @@ class DeckState:
         Avanza el puntero top.
         Retorna None si no quedan cartas.
         """
-        if self.remaining() <= 0:
+        top = self.top
+        cards = self.cards
+        n = len(cards)
+        if top >= n:
             return None
-        card = self.cards[self.top]
-        self.top += 1
+        self.top = top + 1
+        card = cards[top]
+        zh = self._zobrist
+        if zh is not None and zh[0] is cards and zh[1] == n and zh[2] == top:
+            # Hash incremental: sale la carta de la posición n-1-top (desde el fondo)
+            self._zobrist = (cards, n, top + 1, zh[3] ^ zobrist_key(("card", n - 1 - top, card)))
         return card
 
     def put_bottom(self, card: CardId) -> None:
@@ -87,19 +191,54 @@ class DeckState:
         No duplica - asume que la carta ya fue extraída/consumida del mazo.
 
         Implementa compactación automática: si top >= len(cards) / 2, compacta el mazo
-        removiendo cartas consumidas y reiniciando top a 0.
+        removiendo cartas consumidas y reiniciando top a 0. La compactación es
+        in-place (sin realocar la lista); amortizada O(1) por carta.
         """
-        self.cards.append(card)
+        self._own_cards()
+        cards = self.cards
+        cards.append(card)
+        self._zobrist = None
 
         # Compactación automática para evitar crecimiento indefinido
         # Umbral: cuando top alcanza la mitad del array
-        if self.top >= len(self.cards) // 2 and self.top > 0:
+        top = self.top
+        if top > 0 and top >= len(cards) // 2:
             # Remover cartas consumidas (antes de top)
-            self.cards = self.cards[self.top:]
+            del cards[:top]
             self.top = 0
 
 
-@dataclass
+class DeckView(Sequence):
+    """
+    Secuencia de solo lectura sobre cards[start:stop] de un mazo, sin copia.
+    Válida hasta la siguiente escritura del mazo (put_bottom, set_card, ...).
+    """
+
+    __slots__ = ("_cards", "_start", "_stop")
+
+    def __init__(self, cards: List[CardId], start: int, stop: int) -> None:
+        self._cards = cards
+        self._start = start
+        self._stop = max(start, stop)
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._cards[self._start : self._stop][index])
+        n = self._stop - self._start
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("DeckView index out of range")
+        return self._cards[self._start + index]
+
+    def __iter__(self):
+        return islice(self._cards, self._start, self._stop)
+
+
+@dataclass(slots=True)
 class RoomState:
     room_id: RoomId
     deck: DeckState
@@ -111,12 +250,57 @@ class RoomState:
     special_destroyed: bool = False         # Si fue destruida por monstruo
     special_activation_count: int = 0       # Contador de activaciones (para Salón de Belleza, etc.)
 
+    def clone(self, deck: Optional[DeckState] = None) -> "RoomState":
+        new = _shallow_copy(self)
+        new.deck = deck if deck is not None else self.deck.clone()
+        return new
+
 
 @dataclass
 class BoxState:
     box_id: str
     deck: DeckState
 
+    def clone(self, deck: Optional[DeckState] = None) -> "BoxState":
+        new = _shallow_copy(self)
+        new.deck = deck if deck is not None else self.deck.clone()
+        return new
+
+
+def _slot_names(cls) -> tuple:
+    names = _SLOT_NAMES.get(cls)
+    if names is None:
+        names = tuple(
+            name
+            for klass in cls.__mro__
+            for name in getattr(klass, "__slots__", ())
+            if name not in ("__dict__", "__weakref__")
+        )
+        _SLOT_NAMES[cls] = names
+    return names
+
+
+_SLOT_NAMES: Dict[type, tuple] = {}
+
+
+def _shallow_copy(obj):
+    """Copia superficial para clases con __slots__ y/o __dict__."""
+    new = object.__new__(type(obj))
+    for name in _slot_names(type(obj)):
+        setattr(new, name, getattr(obj, name))
+    if hasattr(obj, "__dict__"):
+        new.__dict__.update(obj.__dict__)
+    return new
+
+
+def _copy_container(value):
+    """Copia un nivel de listas/dicts (valores de flags, colas de eventos)."""
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
 
 def ensure_canonical_rooms(state: "GameState") -> None:
     from engine.board import canonical_room_ids, corridor_id, FLOORS
@@ -159,8 +343,8 @@ class GameState:
     remaining_actions: Dict[PlayerId, int] = field(default_factory=dict)
     limited_action_floor_next: Optional[int] = None
 
-    # Flags globales
-    flags: Dict[str, Any] = field(default_factory=dict)
+    # Flags globales (FlagStore: dict con acceso por entidad, ver engine.flags)
+    flags: Dict[str, Any] = field(default_factory=FlagStore)
 
     # Cola y logs
     event_queue: List[Dict[str, Any]] = field(default_factory=list)
@@ -190,7 +374,9 @@ class GameState:
     
     # B6: Armory storage (por room_id, lista de items, capacidad 2)
     armory_storage: Dict[RoomId, List[str]] = field(default_factory=dict)
-    action_log: List[Dict[str, Any]] = field(default_factory=list)
+    # Entradas del EpisodeLog que pertenecen a la historia de este estado
+    # (el log vive fuera del estado y se comparte entre clones).
+    log_index: int = 0
 
     # RNG seed y fin de juego
     seed: int = 0
@@ -220,6 +406,14 @@ class GameState:
     last_sanity_loss_events: List[str] = field(default_factory=list)  # Eventos de daño a -5 en el último step
 
     def __post_init__(self) -> None:
+        self.episode_log = EpisodeLog()
+        # Versión del contenido: step() la incrementa; cachés derivadas
+        # (legalidad, agregados, zobrist) se indexan por ella. Ver touch().
+        self._version = 0
+        self._legal_cache = None
+        self._aggregates = None
+        self._zobrist = None
+        self.flags = as_flag_store(self.flags)
         ensure_canonical_rooms(self)
 
         if not self.turn_order:
@@ -258,12 +452,117 @@ class GameState:
             if rid not in self.box_at_room:
                 self.box_at_room[rid] = box_id
 
-    def clone(self) -> "GameState":
-        return copy.deepcopy(self)
+    def clone(self, deep: bool = False) -> "GameState":
+        """
+        Clona el estado.
+
+        Por defecto usa structural sharing: las entidades (jugadores, salas,
+        cajas, mazos) se copian de forma superficial y las listas de cartas
+        se comparten copy-on-write, de modo que el coste es proporcional al
+        número de entidades y no al tamaño de los mazos. `deep=True`
+        conserva el deepcopy completo.
+        """
+        if deep:
+            return copy.deepcopy(self)
+
+        new = _shallow_copy(self)
+
+        # Mazos compartidos entre sala y caja deben seguir siendo el mismo objeto.
+        decks: Dict[int, DeckState] = {}
+
+        def clone_deck(deck: DeckState) -> DeckState:
+            copied = decks.get(id(deck))
+            if copied is None:
+                copied = deck.clone()
+                decks[id(deck)] = copied
+            return copied
+
+        new.players = {pid: p.clone() for pid, p in self.players.items()}
+        new.roles_assigned = dict(self.roles_assigned)
+        if isinstance(self.monsters, list):
+            new.monsters = [m.clone() for m in self.monsters]
+        else:
+            # Estados legacy (tests) guardan solo el conteo de monstruos
+            new.monsters = copy.deepcopy(self.monsters)
+        new.boxes = {bid: box.clone(clone_deck(box.deck)) for bid, box in self.boxes.items()}
+        new.rooms = {rid: room.clone(clone_deck(room.deck)) for rid, room in self.rooms.items()}
+        new.motemey_deck = clone_deck(self.motemey_deck)
+        new.box_at_room = dict(self.box_at_room)
+        new.stairs = dict(self.stairs)
+        new.turn_order = list(self.turn_order)
+        new.remaining_actions = dict(self.remaining_actions)
+        # Copia un nivel de los valores contenedores (ver FlagStore.copy)
+        new.flags = as_flag_store(self.flags).copy()
+        new.event_queue = [_copy_container(e) for e in self.event_queue]
+        if self.pending_motemey_choice is not None:
+            new.pending_motemey_choice = {k: list(v) for k, v in self.pending_motemey_choice.items()}
+        new.taberna_used_this_turn = dict(self.taberna_used_this_turn)
+        new.peek_used_this_turn = dict(self.peek_used_this_turn)
+        if self.last_peek is not None:
+            new.last_peek = [_copy_container(e) for e in self.last_peek]
+        new.movement_blocked_players = list(self.movement_blocked_players)
+        new.armory_storage = {rid: list(items) for rid, items in self.armory_storage.items()}
+        new.discard_pile = list(self.discard_pile)
+        new.last_sanity_loss_events = list(self.last_sanity_loss_events)
+
+        # Atributos fuera del esquema (no dataclass) se copian en profundidad.
+        for name, value in self.__dict__.items():
+            if name not in _GAMESTATE_FIELDS and name not in _SHARED_ATTRS:
+                new.__dict__[name] = copy.deepcopy(value)
+        return new
+
+    def touch(self) -> None:
+        """
+        Marca el estado como modificado e invalida las cachés derivadas.
+        step() lo hace solo; código que mute el estado a mano y luego
+        consulte la legalidad, los agregados o zobrist() debe llamarlo.
+        """
+        self._version += 1
+
+    @property
+    def aggregates(self) -> "StateAggregates":
+        """Agregados O(1) entre steps (ver engine.aggregates)."""
+        return state_aggregates(self)
+
+    def zobrist(self) -> int:
+        """Hash de 64 bits de la posición, O(1) entre steps (ver engine.zobrist)."""
+        return state_zobrist(self)
+
+    @property
+    def action_log(self) -> List[Dict[str, Any]]:
+        """Historia de eventos de este estado (vista de solo lectura del EpisodeLog)."""
+        return self.episode_log.entries_until(self.log_index)
+
+    def lookahead(self) -> "GameState":
+        """
+        Clon raíz para búsqueda (evaluación del Rey, MCTS). Sus steps
+        escriben en un log de rama (EpisodeLog.branch): el log del episodio
+        no recibe entradas de la búsqueda y el siguiente step real no
+        tiene que bifurcarlo.
+        """
+        new = self.clone()
+        new.episode_log = self.episode_log.branch(self.log_index)
+        return new
+
+    def log_event(self, entry: Dict[str, Any]) -> None:
+        log = self.episode_log
+        if len(log) != self.log_index:
+            # El log avanzó por otra rama (clon hermano): bifurcar
+            log = self.episode_log = log.fork(self.log_index)
+        log.append(entry)
+        self.log_index += 1
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
+    def to_bytes(self) -> bytes:
+        """Serialización binaria compacta y versionada (ver engine.codec)."""
+        return encode_state(self)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "GameState":
+        return GameState.from_dict(decode_state(data))
+
     @staticmethod
     def from_dict(d: Dict[str, Any]) -> "GameState":
         players: Dict[PlayerId, PlayerState] = {}
@@ -283,13 +582,23 @@ class GameState:
                 at_minus5=pdata.get("at_minus5", False),
                 last_minus5_round=pdata.get("last_minus5_round", -1),
                 object_slots_penalty=pdata.get("object_slots_penalty", 0),
+                role_id=pdata.get("role_id", "DEFAULT"),
+                double_roll_used_this_turn=pdata.get("double_roll_used_this_turn", False),
+                free_move_used_this_turn=pdata.get("free_move_used_this_turn", False),
                 shield=pdata.get("shield", 0),
             )
 
         roles_assigned_data = d.get("roles_assigned", {})
         roles_assigned = {str(k): str(v) for k, v in roles_assigned_data.items()}
 
-        monsters = [MonsterState(monster_id=m["monster_id"], room=RoomId(m["room"])) for m in d.get("monsters", [])]
+        monsters = [
+            MonsterState(
+                monster_id=m["monster_id"],
+                room=RoomId(m["room"]),
+                stunned_remaining_rounds=int(m.get("stunned_remaining_rounds", 0)),
+            )
+            for m in d.get("monsters", [])
+        ]
 
         rooms: Dict[RoomId, RoomState] = {}
         for rid, rdata in d.get("rooms", {}).items():
@@ -353,7 +662,7 @@ class GameState:
         # B6: Armory storage
         armory_storage = {RoomId(k): list(v) for k, v in d.get("armory_storage", {}).items()}
 
-        return GameState(
+        state = GameState(
             round=int(d["round"]),
             players=players,
             roles_assigned=roles_assigned,
@@ -374,11 +683,12 @@ class GameState:
             limited_action_floor_next=d.get("limited_action_floor_next", None),
             flags=d.get("flags", {}),
             event_queue=d.get("event_queue", []),
-            action_log=d.get("action_log", []),
+            log_index=int(d.get("log_index", 0)),
             seed=int(d.get("seed", 0)),
             game_over=bool(d.get("game_over", False)),
             outcome=d.get("outcome", None),
             keys_destroyed=int(d.get("keys_destroyed", 0)),
+            discard_pile=list(d.get("discard_pile", [])),
             # B2: MOTEMEY
             motemey_deck=motemey_deck,
             motemey_event_active=bool(d.get("motemey_event_active", False)),
@@ -409,3 +719,15 @@ class GameState:
             last_sanity_loss_event=d.get("last_sanity_loss_event"),
             last_sanity_loss_events=list(d.get("last_sanity_loss_events", [])),
         )
+        # Compatibilidad: dumps antiguos incluían el log completo en el estado
+        legacy_log = d.get("action_log")
+        if legacy_log:
+            state.episode_log = EpisodeLog(legacy_log)
+            state.log_index = len(legacy_log)
+        return state
+
+
+_GAMESTATE_FIELDS = frozenset(f.name for f in fields(GameState))
+# Atributos que los clones comparten por referencia (la caché de legalidad
+# es válida para ambos mientras ninguno cambie de versión)
+_SHARED_ATTRS = frozenset({"episode_log", "_legal_cache", "_aggregates", "_zobrist"})
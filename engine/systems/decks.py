@@ -10,9 +10,10 @@ def reveal_one(state: GameState, room_id: RoomId):
     if room is None:
         return None
     deck = active_deck_for_room(state, room_id)
-    if deck is None or deck.remaining() <= 0:
+    if deck is None:
+        return None
+    card = deck.draw_top()
+    if card is None:
         return None
-    card = deck.cards[deck.top]
-    deck.top += 1
     room.revealed += 1
     return card
@@ -3,6 +3,7 @@ from __future__ import annotations
 from engine.config import Config
 from engine.state import GameState
 from engine.rules.sanity import sanity_cap
+from engine.aggregates import deck_cards_remaining
 
 
 def finalize_step(state: GameState, cfg: Config, check_defeat_fn) -> None:
@@ -31,15 +32,7 @@ def finalize_step(state: GameState, cfg: Config, check_defeat_fn) -> None:
         check_defeat_fn(state, cfg)
 
     if (not state.game_over) and getattr(cfg, "LOSE_ON_DECK_EXHAUSTION", False):
-        if state.boxes:
-            remaining = sum(box.deck.remaining() for box in state.boxes.values())
-        else:
-            remaining = 0
-            for rid, room in state.rooms.items():
-                if str(rid).endswith("_P"):
-                    continue
-                remaining += room.deck.remaining()
-        if remaining <= 0:
+        if deck_cards_remaining(state) <= 0:
             state.game_over = True
             state.outcome = "LOSE_DECK"
 
@@ -71,9 +71,7 @@ def shuffle_all_room_decks(state: GameState, rng: RNG) -> None:
         decks = [room.deck for room in state.rooms.values()]
     for deck in decks:
         if deck.remaining() > 1:
-            tail = deck.cards[deck.top :]
-            rng.shuffle(tail)
-            deck.cards[deck.top :] = tail
+            deck.shuffle_remaining(rng)
 
 
 def expel_players_from_floor(state: GameState, floor: int) -> None:
@@ -7,6 +7,7 @@ from engine.state import GameState, MonsterState
 from engine.handlers.monsters import apply_monster_post_spawn, apply_monster_reveal, try_monster_spawn
 from engine.handlers.omens import get_omen_handler
 from engine.types import PlayerId, RoomId
+from engine.flags import ARMORY_DESTROYED, GOBLIN_HAS_LOOT, SACK_HAS_VICTIM, state_flags
 from engine.effects.event_utils import add_status
 
 
@@ -36,7 +37,7 @@ def on_monster_enters_room(state: GameState, room: RoomId) -> None:
                 state.armory_storage[room] = []
 
         if room_type == "ARMERIA":
-            state.flags[f"ARMORY_DESTROYED_{room}"] = True
+            state_flags(state).set_for(ARMORY_DESTROYED, room, True)
 
 
 def monster_phase(state: GameState, cfg) -> None:
@@ -60,9 +61,11 @@ def move_monsters(state: GameState, cfg) -> None:
     """
     Lógica de movimiento de monstruos (AI).
     """
-    from engine.board import get_next_move_to_targets, get_next_move_away_from_targets
+    from engine.board import distances_to_targets, get_next_move_to_targets, get_next_move_away_from_targets
 
     player_rooms = {p.room for p in state.players.values()}
+    # Distancia al jugador más cercano para todo nodo: un BFS multi-fuente por fase
+    dist = distances_to_targets(player_rooms)
 
     for m in state.monsters:
         if m.stunned_remaining_rounds > 0:
@@ -73,7 +76,7 @@ def move_monsters(state: GameState, cfg) -> None:
         if "SPIDER" in mid or "ARAÑA" in mid:
             if m.room in player_rooms:
                 continue
-            next_room = get_next_move_to_targets(m.room, player_rooms)
+            next_room = get_next_move_to_targets(m.room, player_rooms, dist)
             if next_room != m.room:
                 m.room = next_room
                 on_monster_enters_room(state, next_room)
@@ -87,25 +90,25 @@ def move_monsters(state: GameState, cfg) -> None:
                              add_status(p, "TRAPPED", duration=3, metadata={"source_monster_id": mid})
 
         elif "DUENDE" in mid or "GOBLIN" in mid:
-            has_loot = state.flags.get(f"GOBLIN_HAS_LOOT_{mid}", False)
+            has_loot = state_flags(state).monster(GOBLIN_HAS_LOOT, mid, False)
             if has_loot:
-                next_room = get_next_move_away_from_targets(m.room, player_rooms)
+                next_room = get_next_move_away_from_targets(m.room, player_rooms, dist)
             else:
                 if m.room in player_rooms:
                     continue
-                next_room = get_next_move_to_targets(m.room, player_rooms)
+                next_room = get_next_move_to_targets(m.room, player_rooms, dist)
             if next_room != m.room:
                 m.room = next_room
                 on_monster_enters_room(state, next_room)
 
         elif "VIEJO" in mid or "SACK" in mid:
-            has_victim = state.flags.get(f"SACK_HAS_VICTIM_{mid}", False)
+            has_victim = state_flags(state).monster(SACK_HAS_VICTIM, mid, False)
             if has_victim:
-                next_room = get_next_move_away_from_targets(m.room, player_rooms)
+                next_room = get_next_move_away_from_targets(m.room, player_rooms, dist)
             else:
                 if m.room in player_rooms:
                     continue
-                next_room = get_next_move_to_targets(m.room, player_rooms)
+                next_room = get_next_move_to_targets(m.room, player_rooms, dist)
             if next_room != m.room:
                 m.room = next_room
                 on_monster_enters_room(state, next_room)
@@ -115,7 +118,7 @@ def move_monsters(state: GameState, cfg) -> None:
                     victim_pids = []
                     for pid, p in state.players.items():
                         for st in getattr(p, "statuses", []):
-                            if st.status_id == "TRAPPED" and st.metadata.get("source_monster_id") == mid:
+                            if st.status_id == "TRAPPED" and (st.metadata or {}).get("source_monster_id") == mid:
                                 victim_pids.append(pid)
                                 break
                     if victim_pids:
@@ -123,7 +126,7 @@ def move_monsters(state: GameState, cfg) -> None:
                             state.players[vpid].room = next_room
                     else:
                         # Flag inconsistente: no hay víctima con status -> liberar flag
-                        state.flags[f"SACK_HAS_VICTIM_{mid}"] = False
+                        state_flags(state).set_for(SACK_HAS_VICTIM, mid, False)
 
         elif "REINA" in mid or "HELADA" in mid:
             pass
@@ -131,7 +134,7 @@ def move_monsters(state: GameState, cfg) -> None:
         else:
             if m.room in player_rooms:
                 continue
-            next_room = get_next_move_to_targets(m.room, player_rooms)
+            next_room = get_next_move_to_targets(m.room, player_rooms, dist)
             if next_room != m.room:
                 m.room = next_room
                 on_monster_enters_room(state, next_room)
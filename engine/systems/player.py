@@ -85,7 +85,7 @@ def apply_player_action(state: GameState, action: Action, rng: RNG, cfg: Config)
     elif action.type == ActionType.ESCAPE_TRAPPED:
         d6 = rng.randint(1, 6)
         total = d6 + p.sanity
-        s.action_log.append({"event": "ESCAPE_ATTEMPT", "d6": d6, "sanity": p.sanity, "total": total, "success": total >= 3})
+        s.log_event({"event": "ESCAPE_ATTEMPT", "d6": d6, "sanity": p.sanity, "total": total, "success": total >= 3})
 
         if total >= 3:
             trapped_st = None
@@ -96,7 +96,7 @@ def apply_player_action(state: GameState, action: Action, rng: RNG, cfg: Config)
 
             p.statuses = [st for st in p.statuses if st.status_id not in ("TRAPPED", "TRAPPED_SPIDER")]
 
-            if trapped_st and trapped_st.metadata.get("source_monster_id"):
+            if trapped_st and (trapped_st.metadata or {}).get("source_monster_id"):
                 mid = trapped_st.metadata["source_monster_id"]
                 for monster in s.monsters:
                     if monster.monster_id == mid:
@@ -129,7 +129,7 @@ def apply_player_action(state: GameState, action: Action, rng: RNG, cfg: Config)
             s.flags[f"TALE_ATTACHED_{tale_id}"] = True
             if s.chambers_tales_attached >= 4:
                 s.king_vanished_turns = 4
-                s.action_log.append({"event": "KING_VANISHED", "turns": 4})
+                s.log_event({"event": "KING_VANISHED", "turns": 4})
 
     elif action.type == ActionType.USE_HEALER_HEAL:
         apply_sanity_loss(s, p, 1, source="HEALER_ABILITY", cfg=cfg)
@@ -29,8 +29,8 @@ def on_player_enters_room(state: GameState, pid: PlayerId, room: RoomId) -> None
     if getattr(p, "role_id", "") == "PSYCHIC":
         deck = active_deck_for_room(state, room)
         if deck and deck.remaining() >= 2:
-            c1 = deck.cards[deck.top]
-            c2 = deck.cards[deck.top + 1]
+            c1 = deck.peek(0)
+            c2 = deck.peek(1)
 
             # Score descending (High = Top)
             s1 = -2 if str(c1).startswith("MONSTER") else -1
@@ -38,8 +38,8 @@ def on_player_enters_room(state: GameState, pid: PlayerId, room: RoomId) -> None
 
             if s2 > s1:
                 # c2 es mejor, poner c2 primero
-                deck.cards[deck.top] = c2
-                deck.cards[deck.top + 1] = c1
+                deck.set_card(deck.top, c2)
+                deck.set_card(deck.top + 1, c1)
 
     room_state = state.rooms[room]
 
@@ -97,9 +97,9 @@ def handle_hallway_peek_action(state: GameState, pid: PlayerId, action: Action)
         if floor_of(target_room) != floor_of(state.players[pid].room) or is_corridor(target_room):
             raise ValueError("Invalid room for peek")
         deck = active_deck_for_room(state, target_room)
-        if deck and deck.remaining() > 0:
-            card = deck.cards[deck.top]
-            state.action_log.append({"event": "PEEK_RESULT", "room": str(target_room), "card": str(card)})
+        card = deck.peek() if deck else None
+        if card is not None:
+            state.log_event({"event": "PEEK_RESULT", "room": str(target_room), "card": str(card)})
         if state.flags.get("PENDING_HALLWAY_PEEK") == str(pid):
             del state.flags["PENDING_HALLWAY_PEEK"]
         return True
@@ -6,6 +6,7 @@ from engine.effects.protect import apply_tank_shields
 from engine.entities import normalize_monster_id
 from engine.systems.status import apply_end_of_turn_status_effects
 from engine.state import GameState
+from engine.flags import SKIP_TURN, state_flags
 
 
 def advance_turn_or_king(state: GameState) -> None:
@@ -64,9 +65,9 @@ def start_new_round(state: GameState) -> None:
     for pid in order:
         p = state.players[pid]
 
-        skip_flag = f"SKIP_TURN_{pid}"
-        if state.flags.get(skip_flag, False):
-            state.flags[skip_flag] = False
+        flags = state_flags(state)
+        if flags.player(SKIP_TURN, pid, False):
+            flags.set_for(SKIP_TURN, pid, False)
             state.remaining_actions[pid] = 0
             p.double_roll_used_this_turn = False
             p.free_move_used_this_turn = False
@@ -4,7 +4,7 @@ import math
 
 from engine.config import Config
 from engine.state import GameState
-from engine.board import floor_of
+from engine.aggregates import StateAggregates, compute_aggregates
 
 
 def _clip01(x: float) -> float:
@@ -52,8 +52,9 @@ def monster_pressure(state: GameState, cfg: Config) -> float:
     return _clip01(1.0 - math.exp(-(m / cfg.TAU_MONSTERS)))
 
 
-def keys_pressure(state: GameState, cfg: Config) -> float:
-    keys_in_hand = sum(p.keys for p in state.players.values())
+def keys_pressure(state: GameState, cfg: Config, agg: Optional[StateAggregates] = None) -> float:
+    agg = agg or compute_aggregates(state)
+    keys_in_hand = agg.keys_in_hand
     if cfg.KEYS_TO_WIN <= 0:
         return 0.0
     return _clip01(keys_in_hand / cfg.KEYS_TO_WIN)
@@ -64,12 +65,12 @@ def crown_pressure(state: GameState) -> float:
     return 1.0 if bool(state.flags.get("CROWN_YELLOW", False)) else 0.0
 
 
-def umbral_pressure(state: GameState) -> float:
+def umbral_pressure(state: GameState, agg: Optional[StateAggregates] = None) -> float:
     # fracción de jugadores "en umbral" (placeholder)
     if not state.players:
         return 0.0
-    frac = sum(1 for p in state.players.values() if p.at_umbral) / len(state.players)
-    return _clip01(frac)
+    agg = agg or compute_aggregates(state)
+    return _clip01(agg.umbral_fraction)
 
 
 def debuff_pressure(state: GameState, cfg: Config) -> float:
@@ -89,32 +90,37 @@ def debuff_pressure(state: GameState, cfg: Config) -> float:
     return _clip01(total / emax)
 
 
-def king_risk_pressure(state: GameState, cfg: Config) -> float:
+def king_risk_pressure(state: GameState, cfg: Config, agg: Optional[StateAggregates] = None) -> float:
     """
     Riesgo del Rey: (jugadores en piso del Rey) × (severidad por min_sanity).
     Captura el peligro de tener jugadores expuestos a King Presence.
     """
     if not state.players:
         return 0.0
-    on_king_floor = sum(1 for p in state.players.values() 
-                        if floor_of(p.room) == state.king_floor)
+    agg = agg or compute_aggregates(state)
+    on_king_floor = agg.players_on_floor(state.king_floor)
     exposure = on_king_floor / len(state.players)
-    min_sanity = min(p.sanity for p in state.players.values())
+    min_sanity = agg.min_sanity
     # Multiplicador de severidad: crece cuando min_sanity < -2
     severity = 1 + max(0, -2 - min_sanity)
     return _clip01(exposure * severity / 3.0)  # normalizar a [0,1]
 
 
-def compute_features(state: GameState, cfg: Config) -> Dict[str, float]:
+def compute_features(state: GameState, cfg: Config, aggregates: Optional[StateAggregates] = None) -> Dict[str, float]:
+    """
+    Features de presión. `aggregates` (p.ej. state.aggregates entre steps)
+    evita recorrer jugadores una vez por feature; sin él se calculan en una pasada.
+    """
+    agg = aggregates or compute_aggregates(state)
     return {
         "P_sanity": sanity_pressure(state, cfg),
         "P_round": round_pressure(state, cfg),
         "P_mon": monster_pressure(state, cfg),
-        "P_keys": keys_pressure(state, cfg),
+        "P_keys": keys_pressure(state, cfg, agg),
         "P_crown": crown_pressure(state),
-        "P_umbral": umbral_pressure(state),
+        "P_umbral": umbral_pressure(state, agg),
         "P_debuff": debuff_pressure(state, cfg),
-        "P_king_risk": king_risk_pressure(state, cfg),
+        "P_king_risk": king_risk_pressure(state, cfg, agg),
     }
 
 
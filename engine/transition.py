@@ -3,7 +3,7 @@ from typing import Optional
 
 from engine.actions import Action, ActionType
 from engine.config import Config
-from engine.legality import get_legal_actions
+from engine.legality import get_legal_action_space
 from engine.rng import RNG
 from engine.state import GameState
 from engine.types import PlayerId, RoomId, CardId
@@ -149,9 +149,29 @@ def _start_new_round(s, cfg):
 
 
 
-def step(state: GameState, action: Action, rng: RNG, cfg: Optional[Config] = None) -> GameState:
-    cfg = cfg or Config()
-    s = state.clone()
+def step(
+    state: GameState,
+    action: Action,
+    rng: RNG,
+    cfg: Optional[Config] = None,
+    trusted: bool = False,
+) -> GameState:
+    """
+    Aplica `action` sobre una copia de `state` y retorna el nuevo estado.
+
+    trusted=True omite la regeneración de acciones legales para validar:
+    solo debe usarse cuando `action` se tomó de get_legal_actions(state, ...)
+    sobre este mismo estado (runner tras su chequeo, MCTS, lookahead del Rey).
+    Por defecto la validación es estricta.
+    """
+    s = _apply_step(state.clone(), action, rng, cfg or Config(), trusted)
+    # Cerrar la versión: cachés llenadas a mitad del step no quedan vigentes
+    s.touch()
+    return s
+
+
+def _apply_step(s: GameState, action: Action, rng: RNG, cfg: Config, trusted: bool = False) -> GameState:
+    """Núcleo de step(): muta `s` en el lugar y lo devuelve."""
     if hasattr(s, "last_sanity_loss_events"):
         s.last_sanity_loss_events = []
 
@@ -159,17 +179,19 @@ def step(state: GameState, action: Action, rng: RNG, cfg: Optional[Config] = Non
         normalized = normalize_action_type(str(action.type))
         action = Action(actor=action.actor, type=ActionType(normalized), data=action.data)
 
-    legal = get_legal_actions(s, action.actor)
-    
-    # Validación: KING_ENDROUND puede tener cualquier data (se ignora y se usa RNG)
-    if action.type == ActionType.KING_ENDROUND and action.actor == "KING":
-        # Solo verificar que existe al menos una acción KING_ENDROUND legal
-        if not any(a.type == ActionType.KING_ENDROUND for a in legal):
+    if not trusted:
+        legal = get_legal_action_space(s, action.actor)
+
+        # Validación: KING_ENDROUND puede tener cualquier data (se ignora y se usa RNG)
+        if action.type == ActionType.KING_ENDROUND and action.actor == "KING":
+            # Solo verificar que existe al menos una acción KING_ENDROUND legal
+            if not any(a.type == ActionType.KING_ENDROUND for a in legal):
+                raise ValueError(f"Illegal action for actor={action.actor}: {action}")
+        elif action not in legal:
             raise ValueError(f"Illegal action for actor={action.actor}: {action}")
-    elif action not in legal:
-        raise ValueError(f"Illegal action for actor={action.actor}: {action}")
 
-    s.action_log.append(
+    s.touch()
+    s.log_event(
         {"round": s.round, "phase": s.phase, "actor": action.actor, "type": action.type.value, "data": action.data}
     )
 
@@ -0,0 +1,187 @@
+"""
+Hash Zobrist de 64 bits del estado (GameState.zobrist()).
+
+Cada componente (campo escalar, entrada de dict, entidad con sus campos,
+carta en una posición del mazo) tiene una clave aleatoria de 64 bits y el
+hash es el XOR de las claves presentes. Las claves salen de blake2b sobre
+el repr del componente: son estables entre procesos y máquinas (sirven
+para deduplicar datasets o comparar replays), a diferencia de hash().
+
+Quedan fuera los campos de historia que no cambian la posición:
+log_index, seed y los eventos de daño del último step. Los dicts se
+hashean por entrada, así que el orden de inserción no importa.
+
+Los mazos son la parte cara y se hashean de forma incremental: cada
+DeckState guarda su hash (validado contra la lista, el largo y top), que
+se comparte entre clones copy-on-write; draw_top lo actualiza con un XOR
+y set_card/shuffle_remaining/put_bottom lo invalidan. Los jugadores y
+salas se mutan directamente en todo el engine, así que se re-hashean en
+cada cálculo; state_zobrist() cachea el total por `_version`, igual que
+los agregados (quien mute a mano debe llamar state.touch()).
+"""
+from __future__ import annotations
+from dataclasses import fields, is_dataclass
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, Tuple
+import hashlib
+import os
+
+
+CHECK_ZOBRIST = os.environ.get("CARCOSA_CHECK_ZOBRIST", "") not in ("", "0")
+
+MASK64 = (1 << 64) - 1
+
+# Campos de historia: no distinguen posiciones (transposiciones)
+_HISTORY_FIELDS = frozenset({"log_index", "seed", "last_sanity_loss_event", "last_sanity_loss_events"})
+
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+_RECORDS: Dict[type, bool] = {}
+_PLANS: Dict[type, Tuple[Callable[[Any], Tuple[Any, ...]], Tuple[str, ...]]] = {}
+
+# Campos con DeckState (se hashean con deck_hash, ligado al dueño)
+_DECK_FIELDS = frozenset({"deck", "motemey_deck"})
+
+_ATOMS = frozenset({str, int, float, bool, type(None)})
+
+
+def _canonical(part: Any) -> Any:
+    # Valores iguales para Python (True == 1 == 1.0) comparten entrada en
+    # la caché de claves: el digest debe ser el mismo para todos ellos
+    if isinstance(part, tuple):
+        return tuple(_canonical(p) for p in part)
+    if isinstance(part, bool) or (isinstance(part, float) and part.is_integer()):
+        return int(part)
+    return part
+
+
+@lru_cache(maxsize=1 << 16)
+def zobrist_key(part: Any) -> int:
+    """Clave de 64 bits determinista para un componente (tupla hasheable)."""
+    digest = hashlib.blake2b(repr(_canonical(part)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+    return names
+
+
+def _is_record(value: Any) -> bool:
+    cls = type(value)
+    rec = _RECORDS.get(cls)
+    if rec is None:
+        rec = _RECORDS[cls] = is_dataclass(cls)
+    return rec
+
+
+def _mix(h: int) -> int:
+    # Finalizador de splitmix64: liga un sub-hash (mazo) a su dueño
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & MASK64
+    return h ^ (h >> 31)
+
+
+def _freeze(value: Any) -> Any:
+    """Valor -> forma hasheable con repr estable (dicts ordenados por clave)."""
+    if type(value) in _ATOMS or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted(((k, _freeze(v)) for k, v in value.items()), key=lambda kv: repr(kv[0])))
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value, key=repr))
+    if _is_record(value):
+        return tuple(_freeze(getattr(value, name)) for name in _field_names(type(value)))
+    return repr(value)
+
+
+def deck_hash(deck: Any) -> int:
+    """
+    Hash de las cartas restantes del mazo (posición contada desde el fondo).
+    Dos mazos con las mismas cartas por delante tienen el mismo hash aunque
+    difieran en cartas ya consumidas o en el valor de top.
+    """
+    cards = deck.cards
+    top = deck.top
+    n = len(cards)
+    cached = deck._zobrist
+    if cached is not None and cached[0] is cards and cached[1] == n and cached[2] == top:
+        return cached[3]
+    h = 0
+    for i in range(top, n):
+        h ^= zobrist_key(("card", n - 1 - i, cards[i]))
+    deck._zobrist = (cards, n, top, h)
+    return h
+
+
+def _entity_plan(cls: type) -> Tuple[Callable[[Any], Tuple[Any, ...]], Tuple[str, ...]]:
+    plan = _PLANS.get(cls)
+    if plan is None:
+        names = _field_names(cls)
+        plain = tuple(n for n in names if n not in _DECK_FIELDS)
+        getter = attrgetter(*plain)
+        if len(plain) == 1:
+            getter = lambda obj, _get=getter: (_get(obj),)
+        plan = _PLANS[cls] = (getter, tuple(n for n in names if n in _DECK_FIELDS))
+    return plan
+
+
+def _entity_hash(scope: Tuple[Any, ...], entity: Any) -> int:
+    # Una clave por entidad (sus campos juntos) + sus mazos por separado:
+    # entre steps cambian pocas entidades, el resto son aciertos de caché
+    getter, decks = _entity_plan(type(entity))
+    values = tuple([v if type(v) in _ATOMS else _freeze(v) for v in getter(entity)])
+    h = zobrist_key((scope, values))
+    for name in decks:
+        h ^= _mix(deck_hash(getattr(entity, name)) ^ zobrist_key((scope, name)))
+    return h
+
+
+def compute_zobrist(state: Any) -> int:
+    """Hash completo del estado (sin la caché por versión)."""
+    h = 0
+    for name in _field_names(type(state)):
+        if name in _HISTORY_FIELDS:
+            continue
+        value = getattr(state, name)
+        if type(value) in _ATOMS:
+            h ^= zobrist_key((name, value))
+        elif name in _DECK_FIELDS:
+            h ^= _mix(deck_hash(value) ^ zobrist_key((name,)))
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                if type(item) in _ATOMS:
+                    h ^= zobrist_key((name, key, item))
+                elif _is_record(item):
+                    h ^= _entity_hash((name, key), item)
+                else:
+                    h ^= zobrist_key((name, key, _freeze(item)))
+        elif isinstance(value, list) and value and _is_record(value[0]):
+            for i, item in enumerate(value):
+                h ^= _entity_hash((name, i), item)
+        else:
+            h ^= zobrist_key((name, _freeze(value)))
+    return h
+
+
+def state_zobrist(state: Any) -> int:
+    """Hash del estado, cacheado por versión (ver docstring del módulo)."""
+    version = state._version
+    entry = state._zobrist
+    if entry is not None and entry[0] == version:
+        h = entry[1]
+        if CHECK_ZOBRIST:
+            fresh = compute_zobrist(state)
+            if fresh != h:
+                raise AssertionError(
+                    f"Stale zobrist hash at version {version} (state mutated without touch()): "
+                    f"cached={h:#018x} fresh={fresh:#018x}"
+                )
+        return h
+    h = compute_zobrist(state)
+    state._zobrist = (version, h)
+    return h
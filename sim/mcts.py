@@ -4,13 +4,17 @@ import math
 import time
 
 from engine.state import GameState
-from engine.actions import Action, ActionType
+from engine.actions import Action, ActionFamily, ActionType
 from engine.config import Config
 from engine.rng import RNG
 from engine.transition import step
-from engine.legality import get_legal_actions
+from engine.legality import get_legal_actions, get_legal_action_space
 from sim.metrics import calculate_reward
 
+# Progressive widening: rejected samples of an almost exhausted family before
+# falling back to enumerating its remaining members.
+PW_MAX_REJECTIONS = 8
+
 class MCTSNode:
     def __init__(
         self, 
@@ -25,9 +29,66 @@ class MCTSNode:
         self.visits: int = 0
         self.value: float = 0.0
         self.untried_actions: Optional[List[Action]] = None
+        # True if untried_actions came from get_legal_actions(state) (step can skip revalidation)
+        self.actions_trusted: bool = False
+        # Progressive widening: parametric families are sampled lazily instead of
+        # being expanded, and at most ceil(c * visits^alpha) children are allowed.
+        self.untried_families: List[ActionFamily] = []
+        self.tried_from_families: set = set()
+        self.widening: Optional[tuple] = None  # (c, alpha)
+
+    def _untried_family_count(self) -> int:
+        return sum(len(f) for f in self.untried_families) - len(self.tried_from_families)
+
+    def has_untried(self) -> bool:
+        return bool(self.untried_actions) or self._untried_family_count() > 0
 
     def is_fully_expanded(self) -> bool:
-        return self.untried_actions is not None and len(self.untried_actions) == 0
+        if self.untried_actions is None:
+            return False
+        if self.widening is not None:
+            c, alpha = self.widening
+            if len(self.children) >= max(1, math.ceil(c * max(1, self.visits) ** alpha)):
+                return True
+        return not self.has_untried()
+
+    def pop_untried(self, rng: Optional[RNG] = None) -> Action:
+        """
+        Next action to expand. Without families this is untried_actions.pop()
+        (no rng needed); with families, a draw without replacement over the
+        concrete actions still untried, sampling family members lazily.
+        """
+        if not self.untried_families:
+            return self.untried_actions.pop()
+        n_single = len(self.untried_actions)
+        r = rng.randint(0, n_single + self._untried_family_count() - 1)
+        if r < n_single:
+            self.untried_actions[r], self.untried_actions[-1] = self.untried_actions[-1], self.untried_actions[r]
+            return self.untried_actions.pop()
+        family = rng.choice([f for f in self.untried_families if len(f) > self._family_tried(f)])
+        for _ in range(PW_MAX_REJECTIONS):
+            action = family.sample(rng)
+            if action not in self.tried_from_families:
+                break
+        else:
+            # Mostly tried family: pick among its remaining members directly
+            action = rng.choice([a for a in family if a not in self.tried_from_families])
+        self.tried_from_families.add(action)
+        return action
+
+    def _family_tried(self, family: ActionFamily) -> int:
+        return sum(1 for a in self.tried_from_families if family.contains(a))
+
+    def set_untried_from_space(self, state: GameState, actor: str, widening: Optional[tuple]) -> None:
+        """Untried actions for a node we search over (root / own turn)."""
+        if widening is None:
+            self.untried_actions = get_legal_actions(state, actor, cached=True)
+        else:
+            space = get_legal_action_space(state, actor)
+            self.untried_actions = [a for a in space if type(a) is not ActionFamily]
+            self.untried_families = space.families()
+            self.widening = widening
+        self.actions_trusted = True
 
     def best_child(self, exploration_weight: float = 1.41) -> MCTSNode:
         # UCB1 Selection
@@ -94,7 +155,10 @@ def mcts_search(
     opponent_policy_fn: Callable[[GameState, RNG], Action],
     num_rollouts: int = 100,
     max_depth: int = 50,
-    exploration_weight: float = 1.41
+    exploration_weight: float = 1.41,
+    widening: float = 0.0,
+    widening_alpha: float = 0.5,
+    rollout_setup: Optional[Callable[[], None]] = None,
 ) -> Action:
     """
     Performs MCTS Search.
@@ -109,7 +173,18 @@ def mcts_search(
                             This allows us to model King/Other Players as fixed policies rather than searching their trees.
         num_rollouts: Number of iterations.
         max_depth: Max depth for rollout.
+        widening: Progressive widening constant c (0 disables). When > 0, parametric
+                  actions (Taberna pairs, Motemey SELL, Armory DROP) are sampled
+                  lazily and a node holds at most ceil(c * visits^widening_alpha) children.
+        widening_alpha: Progressive widening exponent.
+        rollout_setup: Called at the start of every iteration, before selection. Lets the
+                       caller give the policies behind rollout_policy_fn/opponent_policy_fn
+                       fresh per-rollout state so iterations never see each other's moves.
     """
+    pw = (widening, widening_alpha) if widening > 0 else None
+
+    # Search steps log into a branch of the episode log, not the shared one
+    root_state = root_state.lookahead()
     
     # Root Node
     root = MCTSNode(root_state)
@@ -119,12 +194,14 @@ def mcts_search(
     actor = root_state.turn_order[root_state.turn_pos] if root_state.phase == "PLAYER" else "KING"
     # assert str(actor) == player_id, f"MCTS called for {player_id} but it is {actor}'s turn"
     
-    root.untried_actions = get_legal_actions(root_state, actor)
+    root.set_untried_from_space(root_state, actor, pw)
     
-    if not root.untried_actions:
+    if not root.has_untried():
         return Action(actor=actor, type=ActionType.END_TURN, data={})
 
     for i in range(num_rollouts):
+        if rollout_setup is not None:
+            rollout_setup()
         node = root
         state = root_state
         
@@ -136,9 +213,9 @@ def mcts_search(
                 break
         
         # 2. Expansion
-        if not state.game_over and node.untried_actions:
+        if not state.game_over and node.has_untried():
             # Pop an untried action
-            action = node.untried_actions.pop()
+            action = node.pop_untried(rng.fork(f"pw_{i}") if node.untried_families else None)
             
             # Step
             # Use a forked RNG for the step from the tree node? 
@@ -149,7 +226,7 @@ def mcts_search(
             # For P0, we will just sample ONE transition per expansion.
             # This makes it "Open Loop" effectively if we don't aggregate same-param states.
             # We are building a tree of STATES.
-            next_state = step(state, action, rng.fork(f"mcts_{i}_{node.visits}"), cfg)
+            next_state = step(state, action, rng.fork(f"mcts_{i}_{node.visits}"), cfg, trusted=node.actions_trusted)
             
             child_node = MCTSNode(next_state, parent=node, action=action)
             
@@ -159,7 +236,7 @@ def mcts_search(
                 
                 if str(next_actor) == player_id:
                     # It's our turn again: Expand ALL options
-                    child_node.untried_actions = get_legal_actions(next_state, next_actor)
+                    child_node.set_untried_from_space(next_state, str(next_actor), pw)
                 else:
                     # It's opponent/teammate turn: Model them with Fixed Policy
                     # We treat their move as a deterministic (or single-sample) transition
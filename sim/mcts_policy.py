@@ -60,6 +60,15 @@ class MCTSPlayerPolicy(PlayerPolicy):
                  act = Action(actor=str(active), type=ActionType.END_TURN, data={})
             return act
 
+    def _begin_rollout(self) -> None:
+        """
+        Each MCTS iteration simulates from a copy of the episode context:
+        rollouts start from the episode's bookkeeping and never share it.
+        """
+        rollout_context = self.context.copy()
+        self._default_player_policy.set_context(rollout_context)
+        self._king_policy.set_context(rollout_context)
+
     def _opponent_policy(self, state: GameState, rng: RNG) -> Action:
         """
         Policy used during Tree Expansion for NON-controlled actors.
@@ -83,7 +92,10 @@ class MCTSPlayerPolicy(PlayerPolicy):
             rollout_policy_fn=self._rollout_policy,
             opponent_policy_fn=self._opponent_policy,
             num_rollouts=self.rollouts,
-            max_depth=self.depth
+            max_depth=self.depth,
+            widening=getattr(self.cfg, "MCTS_WIDENING", 0.0),
+            widening_alpha=getattr(self.cfg, "MCTS_WIDENING_ALPHA", 0.5),
+            rollout_setup=self._begin_rollout,
         )
         
         if best_action:
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import json
 import os
 import time
@@ -7,28 +7,29 @@ import time
 from engine.config import Config
 from engine.state import GameState
 from engine.tension import compute_features, tension_T, king_utility
+from sim.replay_records import ReplayRecorder
 
 
 def _keys_in_hand(state: GameState) -> int:
-    return sum(p.keys for p in state.players.values())
+    return state.aggregates.keys_in_hand
 
 
 def _keys_in_game(state: GameState, cfg: Config) -> int:
     return max(0, cfg.KEYS_TOTAL - state.keys_destroyed)
 
 
-def _summary(state: GameState, cfg: Config) -> Dict[str, Any]:
-    sanities = [p.sanity for p in state.players.values()] if state.players else []
-    umbral_frac = (sum(1 for p in state.players.values() if p.at_umbral) / len(state.players)) if state.players else 0.0
+def state_summary(state: GameState, cfg: Config) -> Dict[str, Any]:
+    """Resumen del estado que va en summary_pre/summary_post de cada registro."""
+    agg = state.aggregates
     return {
-        "min_sanity": min(sanities) if sanities else None,
-        "mean_sanity": (sum(sanities) / len(sanities)) if sanities else None,
+        "min_sanity": agg.min_sanity,
+        "mean_sanity": agg.mean_sanity,
         "monsters": len(state.monsters),
-        "keys_in_hand": _keys_in_hand(state),
+        "keys_in_hand": agg.keys_in_hand,
         "keys_destroyed": state.keys_destroyed,
         "keys_in_game": _keys_in_game(state, cfg),
         "crown": bool(state.flags.get("CROWN_YELLOW", False)),
-        "umbral_frac": umbral_frac,
+        "umbral_frac": agg.umbral_fraction,
         "king_floor": state.king_floor,
     }
 
@@ -52,10 +53,12 @@ def calculate_reward(state: GameState, next_state: GameState, cfg: Config) -> fl
             return -10.0
 
     reward = 0.0
+    agg_prev = state.aggregates
+    agg_next = next_state.aggregates
 
     # 1. Keys Progress
-    keys_prev = sum(p.keys for p in state.players.values())
-    keys_next = sum(p.keys for p in next_state.players.values())
+    keys_prev = agg_prev.keys_in_hand
+    keys_next = agg_next.keys_in_hand
     if keys_next > keys_prev:
         reward += 1.0 * (keys_next - keys_prev)
 
@@ -65,15 +68,15 @@ def calculate_reward(state: GameState, next_state: GameState, cfg: Config) -> fl
     # Let's stick to keys in hand for now.
 
     # 3. Exploration (Revealed Rooms)
-    revealed_prev = sum(1 for r in state.rooms.values() if r.revealed > 0)
-    revealed_next = sum(1 for r in next_state.rooms.values() if r.revealed > 0)
+    revealed_prev = agg_prev.revealed_rooms
+    revealed_next = agg_next.revealed_rooms
     if revealed_next > revealed_prev:
         reward += 0.1 * (revealed_next - revealed_prev)
 
     # 4. Sanity Loss (Penalización leve)
     # Comparar sanidad total
-    sanity_prev = sum(p.sanity for p in state.players.values())
-    sanity_next = sum(p.sanity for p in next_state.players.values())
+    sanity_prev = agg_prev.sanity_total
+    sanity_next = agg_next.sanity_total
     diff_sanity = sanity_next - sanity_prev
     # Note: diff_sanity is negative if damage taken
     if diff_sanity < 0:
@@ -88,6 +91,8 @@ def transition_record(
     next_state: GameState,
     cfg: Config,
     step_idx: int,
+    replay: Optional[ReplayRecorder] = None,
+    rng_state: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     roles_assigned = None
     if step_idx == 0:
@@ -96,8 +101,9 @@ def transition_record(
         else:
             roles_assigned = {str(pid): p.role_id for pid, p in state.players.items()}
 
-    f0 = compute_features(state, cfg)
-    f1 = compute_features(next_state, cfg)
+    # Estados entre steps: agregados cacheados (una pasada por estado)
+    f0 = compute_features(state, cfg, aggregates=state.aggregates)
+    f1 = compute_features(next_state, cfg, aggregates=next_state.aggregates)
     T0 = tension_T(state, cfg, features=f0)
     T1 = tension_T(next_state, cfg, features=f1)
 
@@ -106,7 +112,9 @@ def transition_record(
 
     # Prepare action_data, including d6 if present
     action_data = action.get("data", {}).copy()
+    d6_rolled = False
     if "d6" in action:
+        d6_rolled = "d6" not in action_data
         action_data["d6"] = action["d6"]
 
     rec: Dict[str, Any] = {
@@ -124,8 +132,8 @@ def transition_record(
         "features_pre": f0,
         "features_post": f1,
 
-        "summary_pre": _summary(state, cfg),
-        "summary_post": _summary(next_state, cfg),
+        "summary_pre": state_summary(state, cfg),
+        "summary_post": state_summary(next_state, cfg),
 
         "king_utility_pre": king_utility(state, cfg, features=f0),
         "king_utility_post": king_utility(next_state, cfg, features=f1),
@@ -134,20 +142,73 @@ def transition_record(
         "done": bool(next_state.game_over),
         "outcome": next_state.outcome,
         "sanity_loss_events": list(getattr(next_state, "last_sanity_loss_events", [])),
-        
-        # FULL REPLAY STATE
-        "full_state": state.to_dict()
     }
+    # REPLAY STATE: full_state en cada registro, o keyframes + deltas si
+    # el caller lleva un ReplayRecorder (ver sim.replay_records)
+    if replay is not None:
+        rec.update(replay.record(state, rng_state))
+    else:
+        rec["full_state"] = state.to_dict()
+    if d6_rolled:
+        # El d6 lo tiró el engine (no venía en la acción): el replay no debe pasarlo
+        rec["d6_rolled"] = True
     if roles_assigned is not None:
         rec["roles_assigned"] = roles_assigned
+        # Config resuelta del run: el replay la recupera de aquí
+        rec["config"] = cfg.to_dict()
     return rec
 
 
+class JsonlWriter:
+    """
+    Escritor JSONL en streaming: cada registro se serializa al llegar y va
+    al buffer del archivo, con flush explícito cada `flush_every` registros
+    (<= 0: solo al cerrar). Lo escrito hasta el último flush sobrevive a un
+    corte del proceso.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100, buffer_size: int = 1 << 20):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.flush_every = flush_every
+        self.count = 0
+        self._f = open(path, "w", encoding="utf-8", buffering=buffer_size)
+
+    def write(self, record: Dict[str, Any]) -> bool:
+        """Escribe un registro; retorna True si este registro disparó un flush."""
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+        if self.flush_every > 0 and self.count % self.flush_every == 0:
+            self._f.flush()
+            return True
+        return False
+
+    def flush(self) -> None:
+        self._f.flush()
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
 def write_jsonl(path: str, records: List[Dict[str, Any]]) -> None:
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
+    with JsonlWriter(path, flush_every=0) as writer:
         for r in records:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            writer.write(r)
+
+
+def write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    """Escribe JSON vía archivo temporal + rename: el archivo nunca queda a medias."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
 
 
 def default_run_path(prefix: str = "runs/run") -> str:
@@ -1,18 +1,41 @@
 from __future__ import annotations
 from collections import deque
-from typing import Dict, List, Optional, Set
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
 
-from engine.board import neighbors, corridor_id, floor_of
+from engine.board import (
+    CORRIDOR_NODE,
+    FLOORS,
+    N_NODES,
+    NODE_NEIGHBORS,
+    ROOM_IDS,
+    ROOM_INDEX,
+    neighbors,
+    corridor_id,
+    floor_of,
+    stairs_key,
+)
 from engine.state import GameState
 from engine.types import RoomId
 
+_CANONICAL_NODES = frozenset(ROOM_IDS)
+
 
 def adjacency(state: GameState) -> Dict[RoomId, List[RoomId]]:
     """
-    Grafo de movimiento coherente con engine/legality.py:
+    Grafo de movimiento de las políticas:
     - vecinos pasillo<->habitaciones (mismo piso)
-    - transición vertical solo desde la habitación que tiene escalera del piso.
+    - transición vertical solo desde la habitación que tiene escalera del
+      piso, hacia el pasillo del piso adyacente (ver _corridor_overlay).
     """
+    if _canonical_board(state):
+        adj = _corridor_overlay(stairs_key(state.stairs))
+        return {ROOM_IDS[i]: [ROOM_IDS[j] for j in nbs] for i, nbs in enumerate(adj)}
+    return _adjacency_ids(state)
+
+
+def _adjacency_ids(state: GameState) -> Dict[RoomId, List[RoomId]]:
+    """Construcción sobre RoomId (tableros no canónicos)."""
     adj: Dict[RoomId, List[RoomId]] = {}
 
     # Nodos existentes: tomamos rooms del estado
@@ -42,11 +65,77 @@ def adjacency(state: GameState) -> Dict[RoomId, List[RoomId]]:
     return adj
 
 
+def _canonical_board(state: GameState) -> bool:
+    """
+    True si las tablas por stairs_key(state.stairs) describen el estado:
+    tablero canónico y escaleras en nodos canónicos de los pisos 1..3. Si
+    no, se cae al grafo por RoomId.
+    """
+    if state.rooms.keys() != _CANONICAL_NODES:
+        return False
+    return all(1 <= f <= FLOORS and stair_room in ROOM_INDEX for f, stair_room in state.stairs.items())
+
+
+# Distinto de engine.board.stairs_overlay (el grafo de MOVE en legality, que
+# une la escalera con la escalera del piso adyacente): las políticas siempre
+# han planificado con la escalera llevando al pasillo del piso adyacente.
+# Se mantiene para no cambiar las decisiones (ni las corridas) de las políticas.
+@lru_cache(maxsize=None)
+def _corridor_overlay(key: Tuple[int, ...]) -> Tuple[Tuple[int, ...], ...]:
+    """Vecinos por nodo: horizontales + escalera -> pasillos de pisos adyacentes."""
+    adj = [list(nbs) for nbs in NODE_NEIGHBORS]
+    for f in range(1, FLOORS + 1):
+        stair = key[f - 1]
+        if stair < 0:
+            continue
+        if f > 1:
+            adj[stair].append(CORRIDOR_NODE[f - 1])
+        if f < FLOORS:
+            adj[stair].append(CORRIDOR_NODE[f + 1])
+    return tuple(tuple(nbs) for nbs in adj)
+
+
+@lru_cache(maxsize=None)
+def next_hop_table(key: Tuple[int, ...]) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Tabla 15x15 de primer paso: next_hop_table(key)[start][goal] es el nodo
+    al que moverse desde start (BFS, mismo orden de vecinos), -1 si goal es
+    inalcanzable o start == goal. Una tabla por configuración de escaleras:
+    cambia solo cuando roll_stairs modifica state.stairs.
+    """
+    adj = _corridor_overlay(key)
+    rows = []
+    for start in range(N_NODES):
+        first = [-1] * N_NODES
+        seen = [False] * N_NODES
+        seen[start] = True
+        q = deque([start])
+        while q:
+            cur = q.popleft()
+            for nb in adj[cur]:
+                if not seen[nb]:
+                    seen[nb] = True
+                    first[nb] = nb if cur == start else first[cur]
+                    q.append(nb)
+        rows.append(tuple(first))
+    return tuple(rows)
+
+
 def bfs_next_step(state: GameState, start: RoomId, goal: RoomId) -> Optional[RoomId]:
     if start == goal:
         return None
 
-    adj = adjacency(state)
+    s_idx = ROOM_INDEX.get(start)
+    g_idx = ROOM_INDEX.get(goal)
+    if s_idx is not None and g_idx is not None and _canonical_board(state):
+        hop = next_hop_table(stairs_key(state.stairs))[s_idx][g_idx]
+        return ROOM_IDS[hop] if hop >= 0 else None
+
+    return _bfs_next_step_ids(state, start, goal)
+
+
+def _bfs_next_step_ids(state: GameState, start: RoomId, goal: RoomId) -> Optional[RoomId]:
+    adj = _adjacency_ids(state)
 
     q = deque([start])
     prev: Dict[RoomId, Optional[RoomId]] = {start: None}
@@ -9,7 +9,7 @@ from engine.config import Config
 from engine.legality import get_legal_actions
 from engine.rng import RNG
 from engine.state import GameState
-from engine.tension import king_utility
+from engine.tension import compute_features, king_utility
 from engine.transition import step
 from engine.types import RoomId, PlayerId
 
@@ -17,6 +17,8 @@ from engine.board import floor_of, neighbors, is_corridor, corridor_id
 from sim.pathing import bfs_next_step
 from engine.inventory import get_inventory_limits, get_object_count, get_key_count
 from engine.objects import is_soulbound
+from engine.flags import TEMP_STAIRS, state_flags
+from sim.policy_context import PolicyContext
 
 
 
@@ -32,18 +34,32 @@ def _get_active_actor(state: GameState) -> str:
     return str(pid)
 
 
-class PlayerPolicy:
+class _PolicyBase:
+    # Memoria de decisión por episodio (ver sim.policy_context)
+    _context: Optional[PolicyContext] = None
+
+    def set_context(self, context: PolicyContext) -> None:
+        self._context = context
+
+    @property
+    def context(self) -> PolicyContext:
+        if self._context is None:
+            self._context = PolicyContext()
+        return self._context
+
+
+class PlayerPolicy(_PolicyBase):
     def choose(self, state: GameState, rng: RNG) -> Action:
         raise NotImplementedError
 
 
-class KingPolicy:
+class KingPolicy(_PolicyBase):
     def choose(self, state: GameState, rng: RNG) -> Action:
         raise NotImplementedError
 
 
 def _keys_total(state: GameState) -> int:
-    return sum(p.keys for p in state.players.values())
+    return state.aggregates.keys_in_hand
 
 
 _POLICY_PARAMS_CACHE: Optional[Dict[str, Any]] = None
@@ -99,8 +115,7 @@ def _temp_stairs_dest(state: GameState, room: RoomId, target_floor: int) -> Opti
     return dest if dest in state.rooms else None
 
 def _temp_stairs_active_for_pid(state: GameState, room: RoomId, pid: PlayerId) -> bool:
-    key = f"TEMP_STAIRS_{room}"
-    flag = state.flags.get(key)
+    flag = state_flags(state).room(TEMP_STAIRS, room)
     if isinstance(flag, dict):
         return flag.get("round") == state.round and flag.get("pid") == str(pid)
     return False
@@ -156,37 +171,29 @@ ARMORY_STREAK_LIMIT = 2
 STALL_KEY_STEPS = 24
 
 
-def _policy_flags(state: GameState) -> dict:
-    if state.flags is None:
-        state.flags = {}
-    return state.flags
-
-
-def _policy_update_stall(state: GameState, keys_total: int) -> int:
-    flags = _policy_flags(state)
-    last = int(flags.get("POLICY_LAST_KEYS_TOTAL", keys_total))
-    steps = int(flags.get("POLICY_NO_KEY_STEPS", 0))
+def _policy_update_stall(ctx: PolicyContext, keys_total: int) -> int:
+    last = ctx.last_keys_total if ctx.last_keys_total is not None else keys_total
+    steps = ctx.no_key_steps
     if keys_total > last:
         steps = 0
     else:
         steps += 1
-    flags["POLICY_LAST_KEYS_TOTAL"] = keys_total
-    flags["POLICY_NO_KEY_STEPS"] = steps
+    ctx.last_keys_total = keys_total
+    ctx.no_key_steps = steps
     return steps
 
 
-def _policy_armory_streak(state: GameState, pid: PlayerId) -> int:
-    flags = _policy_flags(state)
-    return int(flags.get(f"POLICY_ARMORY_STREAK_{pid}", 0))
+def _policy_armory_streak(ctx: PolicyContext, pid: PlayerId) -> int:
+    return ctx.armory_streak.get(str(pid), 0)
 
 
-def _policy_record_action(state: GameState, pid: PlayerId, action: Action) -> None:
-    flags = _policy_flags(state)
+def _policy_record_action(ctx: PolicyContext, pid: PlayerId, action: Action) -> None:
+    key = str(pid)
     if action.type in (ActionType.USE_ARMORY_DROP, ActionType.USE_ARMORY_TAKE):
-        flags[f"POLICY_ARMORY_STREAK_{pid}"] = int(flags.get(f"POLICY_ARMORY_STREAK_{pid}", 0)) + 1
+        ctx.armory_streak[key] = ctx.armory_streak.get(key, 0) + 1
     else:
-        flags[f"POLICY_ARMORY_STREAK_{pid}"] = 0
-    flags[f"POLICY_LAST_ACTION_{pid}"] = action.type.value
+        ctx.armory_streak[key] = 0
+    ctx.last_action[key] = action.type.value
 
 
 def _choose_sacrifice_action(acts: List[Action], state: GameState, pid: PlayerId, cfg: Config) -> Optional[Action]:
@@ -536,20 +543,22 @@ class GoalDirectedPlayerPolicy(PlayerPolicy):
         else:
              return Action(actor=actor, type=ActionType.END_TURN, data={})
 
-        acts = get_legal_actions(state, actor)
+        acts = get_legal_actions(state, actor, cached=True)
         if not acts:
             return Action(actor=actor, type=ActionType.END_TURN, data={})
 
+        ctx = self.context
+
         def finalize(a: Action) -> Action:
-            _policy_record_action(state, pid, a)
+            _policy_record_action(ctx, pid, a)
             return a
 
         keys_total = _keys_total(state)
         umbral = RoomId(self.cfg.UMBRAL_NODE)
         need_keys = keys_total < self.cfg.KEYS_TO_WIN
 
-        stall_steps = _policy_update_stall(state, keys_total)
-        armory_streak = _policy_armory_streak(state, pid)
+        stall_steps = _policy_update_stall(ctx, keys_total)
+        armory_streak = _policy_armory_streak(ctx, pid)
         avoid_armory = stall_steps >= STALL_KEY_STEPS
 
         forced = _choose_forced_action(acts, state, pid, rng, self.cfg)
@@ -922,7 +931,7 @@ class HeuristicKingPolicy(KingPolicy):
     cfg: Config = Config()
 
     def choose(self, state: GameState, rng: RNG) -> Action:
-        acts = get_legal_actions(state, "KING")
+        acts = get_legal_actions(state, "KING", cached=True)
         if not acts:
              # Should not happen in canonical simulation
              return None
@@ -934,17 +943,20 @@ class HeuristicKingPolicy(KingPolicy):
         all_umbral = all((pl.at_umbral or pl.room == umbral) for pl in state.players.values())
         ready_now = (total_keys >= self.cfg.KEYS_TO_WIN) and all_umbral
 
-        hits = int(state.flags.get("win_ready_hits", 0)) if state.flags else 0
+        ctx = self.context
         if ready_now:
-            hits += 1
-            state.flags["win_ready_hits"] = hits
+            ctx.win_ready_hits += 1
+        hits = ctx.win_ready_hits
 
         allow_win = (state.round >= self.cfg.KING_ALLOW_WIN_START_ROUND) or (hits >= self.cfg.KING_ALLOW_WIN_AFTER_READY_HITS)
 
+        # Las evaluaciones escriben en un log de rama, no en el del episodio
+        root = state.lookahead()
+
         if allow_win:
             win_candidates = []
             for a in acts:
-                s2 = step(state, a, rng.fork(f"king_eval_win:{a.data}"), self.cfg)
+                s2 = step(root, a, rng.fork(f"king_eval_win:{a.data}"), self.cfg, trusted=True)
                 if s2.game_over and s2.outcome == "WIN":
                     win_candidates.append(a)
             if win_candidates:
@@ -954,13 +966,15 @@ class HeuristicKingPolicy(KingPolicy):
         best_u = -1e18
 
         for a in acts:
-            s2 = step(state, a, rng.fork(f"king_eval:{a.data}"), self.cfg)
-            u = king_utility(s2, self.cfg)
+            s2 = step(root, a, rng.fork(f"king_eval:{a.data}"), self.cfg, trusted=True)
+            agg = s2.aggregates
+            u = king_utility(s2, self.cfg, features=compute_features(s2, self.cfg, aggregates=agg))
 
             if s2.game_over and s2.outcome == "LOSE":
                 continue
 
-            min_sanity = min(p.sanity for p in s2.players.values()) if s2.players else 999
+            min_sanity = agg.min_sanity if agg.min_sanity is not None else 999
+
             if min_sanity <= self.cfg.S_LOSS:
                 if state.round < self.cfg.KING_KILL_AVOID_START_ROUND:
                     continue
@@ -982,7 +996,7 @@ class RandomKingPolicy(KingPolicy):
     cfg: Config = Config()
 
     def choose(self, state: GameState, rng: RNG) -> Action:
-        acts = get_legal_actions(state, "KING")
+        acts = get_legal_actions(state, "KING", cached=True)
         if not acts:
             return None
         d4 = rng.randint(1, 4)
@@ -1008,7 +1022,7 @@ class CowardPolicy(PlayerPolicy):
         else:
             return Action(actor=actor, type=ActionType.END_TURN, data={})
             
-        acts = get_legal_actions(state, actor)
+        acts = get_legal_actions(state, actor, cached=True)
         if not acts: return Action(actor=actor, type=ActionType.END_TURN, data={})
 
         forced = _choose_forced_action(acts, state, pid, rng, self.cfg)
@@ -1072,7 +1086,7 @@ class BerserkerPolicy(PlayerPolicy):
 
     def choose(self, state: GameState, rng: RNG) -> Action:
         actor = _get_active_actor(state)
-        acts = get_legal_actions(state, actor)
+        acts = get_legal_actions(state, actor, cached=True)
         if not acts: return Action(actor=actor, type=ActionType.END_TURN, data={})
 
         if actor in state.players:
@@ -1115,7 +1129,7 @@ class SpeedrunnerPolicy(PlayerPolicy):
         
         pid = PlayerId(actor)
         p = state.players[pid]
-        acts = get_legal_actions(state, actor)
+        acts = get_legal_actions(state, actor, cached=True)
         if not acts: return Action(actor=actor, type=ActionType.END_TURN, data={})
 
         forced = _choose_forced_action(acts, state, pid, rng, self.cfg)
@@ -1163,7 +1177,7 @@ class RandomPolicy(PlayerPolicy):
     """
     def choose(self, state: GameState, rng: RNG) -> Action:
         actor = _get_active_actor(state)
-        acts = get_legal_actions(state, actor)
+        acts = get_legal_actions(state, actor, cached=True)
         if not acts: return Action(actor=actor, type=ActionType.END_TURN, data={})
         return rng.choice(acts)
 
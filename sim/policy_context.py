@@ -0,0 +1,46 @@
+"""
+Contexto de policies por episodio.
+
+Memoria de decisión de las policies (racha de Armería, pasos sin progreso
+de llaves, hits de victoria del Rey...). Vive fuera de GameState: el estado
+que el engine clona y serializa no se muta al decidir, y es el mismo antes
+y después de consultar una policy.
+
+El runner crea un PolicyContext por episodio y lo comparte con las
+policies vía set_context(); una policy sin contexto asignado usa uno propio.
+Las búsquedas (MCTS) simulan con copy() del contexto del episodio, una por
+rollout, para que las jugadas simuladas no se filtren entre rollouts ni al
+episodio.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+@dataclass
+class PolicyContext:
+    # Progreso de llaves (GoalDirected): total visto y pasos sin aumentar
+    last_keys_total: Optional[int] = None
+    no_key_steps: int = 0
+    # Por jugador: acciones de Armería consecutivas y último tipo de acción
+    armory_streak: Dict[str, int] = field(default_factory=dict)
+    last_action: Dict[str, str] = field(default_factory=dict)
+    # Rey: veces que la victoria estuvo disponible (gate de allow_win)
+    win_ready_hits: int = 0
+
+    def reset(self) -> None:
+        self.last_keys_total = None
+        self.no_key_steps = 0
+        self.armory_streak.clear()
+        self.last_action.clear()
+        self.win_ready_hits = 0
+
+    def copy(self) -> "PolicyContext":
+        """Copia independiente (los dicts por jugador no se comparten)."""
+        return PolicyContext(
+            last_keys_total=self.last_keys_total,
+            no_key_steps=self.no_key_steps,
+            armory_streak=dict(self.armory_streak),
+            last_action=dict(self.last_action),
+            win_ready_hits=self.win_ready_hits,
+        )
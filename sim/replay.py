@@ -0,0 +1,252 @@
+"""
+Replay determinista y verificado de runs JSONL.
+
+Re-ejecuta las acciones registradas de un run con engine.transition.step
+y compara cada step contra lo registrado: estado siguiente (keyframe o
+delta del registro siguiente), done/outcome, summary_post, d6 tirado por
+el engine y posición del stream de step. Reporta la primera divergencia
+con la ruta del primer campo distinto ("players.P1.sanity").
+
+El runner tira los dados de step() con un stream propio (rng.fork("step"))
+y guarda su snapshot en cada keyframe: seek() arranca desde el keyframe
+más cercano anterior al step pedido (estado + RNG) en vez de re-ejecutar
+desde el step 0. Las policies no intervienen en el replay.
+
+La Config se toma del registro del step 0 (campo "config", la Config
+resuelta del run); --config pisa campos con un JSON propio. Runs sin ese
+campo se re-ejecutan con Config().
+
+Uso:
+    python -m sim.replay runs/run_GOAL_seed1_*.jsonl
+    python -m sim.replay runs/x.jsonl --start 400 --stop 450
+    python -m sim.replay runs/x.jsonl --config overrides.json
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import json
+
+from engine.actions import Action, ActionType
+from engine.config import Config
+from engine.legality import get_legal_actions
+from engine.rng import RNG
+from engine.state import GameState
+from engine.transition import step
+from sim.metrics import state_summary
+from sim.replay_records import iter_state_dicts, read_records, rebuild_state
+
+
+@dataclass
+class Divergence:
+    step: int
+    what: str            # "state" | "done" | "outcome" | "summary" | "d6" | "rng" | "illegal" | "error"
+    path: str = ""       # primer campo distinto dentro de lo comparado
+    expected: Any = None
+    actual: Any = None
+
+    def __str__(self) -> str:
+        where = f" at {self.path}" if self.path else ""
+        return f"step {self.step}: {self.what}{where}: expected {self.expected!r}, got {self.actual!r}"
+
+
+@dataclass
+class ReplayReport:
+    run_path: str
+    start_step: int
+    steps: int = 0                      # steps re-ejecutados y verificados
+    divergence: Optional[Divergence] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.divergence is None
+
+
+def action_from_record(rec: Dict[str, Any]) -> Action:
+    """Acción que se aplicó en el registro (sin el d6 que agregó el engine)."""
+    data = dict(rec.get("action_data") or {})
+    if rec.get("d6_rolled"):
+        data.pop("d6", None)
+    return Action(actor=rec["actor"], type=ActionType(rec["action_type"]), data=data)
+
+
+def _normalize(value: Any) -> Any:
+    # Misma forma que tras escribir/leer el JSONL (tuplas -> listas, claves str)
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+
+def _first_diff(expected: Any, actual: Any, path: str = "") -> Optional[Tuple[str, Any, Any]]:
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in list(expected) + [k for k in actual if k not in expected]:
+            sub = f"{path}.{key}" if path else str(key)
+            if key not in actual or key not in expected:
+                return sub, expected.get(key), actual.get(key)
+            found = _first_diff(expected[key], actual[key], sub)
+            if found:
+                return found
+        return None
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            found = _first_diff(e, a, f"{path}[{i}]")
+            if found:
+                return found
+        return None
+    return None if expected == actual else (path, expected, actual)
+
+
+def load_run(run_path: str) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(registro, estado previo como dict) por step del run."""
+    return list(iter_state_dicts(read_records(run_path)))
+
+
+def run_config(
+    run: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    overrides: Optional[Dict[str, Any]] = None,
+) -> Config:
+    """Config grabada en el run (Config() si no la tiene), con `overrides` encima."""
+    recorded = dict(run[0][0].get("config") or {}) if run else {}
+    recorded.update(overrides or {})
+    return Config.from_dict(recorded)
+
+
+def _keyframe_before(run: List[Tuple[Dict[str, Any], Dict[str, Any]]], step_idx: int) -> int:
+    for i in range(min(step_idx, len(run) - 1), -1, -1):
+        rec = run[i][0]
+        if "full_state" in rec and "rng_state" in rec:
+            return i
+    raise ValueError("el run no tiene keyframes con rng_state (grabado sin replay determinista)")
+
+
+def _resume(run: List[Tuple[Dict[str, Any], Dict[str, Any]]], i: int) -> Tuple[GameState, RNG]:
+    rec = run[i][0]
+    return rebuild_state(rec["full_state"]), RNG.from_snapshot(rec["rng_state"])
+
+
+def seek(
+    run: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    step_idx: int,
+    cfg: Optional[Config] = None,
+) -> Tuple[GameState, RNG]:
+    """
+    Estado y RNG de step previos al step `step_idx`: arranca del keyframe
+    más cercano y re-ejecuta solo los steps que faltan (sin verificar).
+    Sin `cfg` usa la Config grabada en el run.
+    """
+    cfg = cfg or run_config(run)
+    i = _keyframe_before(run, step_idx)
+    state, rng = _resume(run, i)
+    for rec, _ in run[i:step_idx]:
+        state = step(state, action_from_record(rec), rng, cfg)
+    return state, rng
+
+
+def replay_run(
+    run_path: str,
+    cfg: Optional[Config] = None,
+    start: int = 0,
+    stop: Optional[int] = None,
+    check_states: bool = True,
+    overrides: Optional[Dict[str, Any]] = None,
+) -> ReplayReport:
+    """
+    Re-ejecuta los steps [start, stop) del run y los verifica; se detiene
+    en la primera divergencia. Sin `cfg` usa la Config grabada en el run,
+    con `overrides` (campos de Config) encima.
+    """
+    run = load_run(run_path)
+    cfg = cfg or run_config(run, overrides)
+    stop = len(run) if stop is None else min(stop, len(run))
+    report = ReplayReport(run_path=run_path, start_step=start)
+    if start >= stop:
+        return report
+    state, rng = seek(run, start, cfg)
+
+    for i in range(start, stop):
+        rec = run[i][0]
+        action = action_from_record(rec)
+        legal = get_legal_actions(state, action.actor)
+        if legal and action not in legal:
+            report.divergence = Divergence(i, "illegal", expected="legal action", actual=rec["action_type"])
+            return report
+        try:
+            next_state = step(state, action, rng, cfg, trusted=bool(legal))
+        except Exception as exc:  # regla que ahora explota con la acción registrada
+            report.divergence = Divergence(i, "error", expected=None, actual=f"{type(exc).__name__}: {exc}")
+            return report
+
+        div = _check_step(i, rec, next_state, rng, cfg)
+        if div is None and i + 1 < len(run):
+            div = _check_next(i, run[i + 1], next_state, rng, check_states)
+        if div is not None:
+            report.divergence = div
+            return report
+        report.steps += 1
+        state = next_state
+    return report
+
+
+def _check_step(i: int, rec: Dict[str, Any], next_state: GameState, rng: RNG, cfg: Config) -> Optional[Divergence]:
+    if bool(next_state.game_over) != rec["done"]:
+        return Divergence(i, "done", expected=rec["done"], actual=bool(next_state.game_over))
+    if next_state.outcome != rec["outcome"]:
+        return Divergence(i, "outcome", expected=rec["outcome"], actual=next_state.outcome)
+    if rec.get("d6_rolled") and rng.last_king_d6 != rec["action_data"].get("d6"):
+        return Divergence(i, "d6", expected=rec["action_data"].get("d6"), actual=rng.last_king_d6)
+    if "summary_post" in rec:
+        found = _first_diff(rec["summary_post"], _normalize(state_summary(next_state, cfg)))
+        if found:
+            return Divergence(i, "summary", *found)
+    return None
+
+
+def _check_next(
+    i: int,
+    nxt: Tuple[Dict[str, Any], Dict[str, Any]],
+    next_state: GameState,
+    rng: RNG,
+    check_states: bool,
+) -> Optional[Divergence]:
+    rec, expected = nxt
+    if "rng_pos" in rec and rng.algo == "counter" and rng.position != rec["rng_pos"]:
+        return Divergence(i, "rng", "position", expected=rec["rng_pos"], actual=rng.position)
+    if check_states:
+        found = _first_diff(expected, _normalize(next_state.to_dict()))
+        if found:
+            return Divergence(i, "state", *found)
+    return None
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Deterministic replay + verification of runner JSONL files")
+    ap.add_argument("runs", nargs="+", help="Run JSONL files")
+    ap.add_argument("--start", type=int, default=0, help="First step to verify (seeks from nearest keyframe)")
+    ap.add_argument("--stop", type=int, default=None, help="Stop before this step")
+    ap.add_argument("--no-state-check", action="store_true",
+                    help="Only check done/outcome/summary/RNG, not the full state diff")
+    ap.add_argument("--config", type=str, default=None,
+                    help="JSON file with Config fields overriding the config recorded in each run")
+    args = ap.parse_args()
+
+    overrides = None
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+
+    failed = 0
+    for path in args.runs:
+        try:
+            report = replay_run(path, start=args.start, stop=args.stop,
+                                check_states=not args.no_state_check, overrides=overrides)
+        except ValueError as exc:
+            print(f"SKIP {path}: {exc}")
+            continue
+        if report.ok:
+            print(f"OK   {path}: {report.steps} steps")
+        else:
+            failed += 1
+            print(f"DIFF {path}: {report.divergence}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
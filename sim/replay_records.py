@@ -0,0 +1,164 @@
+"""
+Replay delta-codificado en los runs JSONL.
+
+Cada registro de transición lleva el estado previo al step de una de dos
+formas:
+
+    "full_state"   keyframe: state.to_dict() completo (cada K steps y en el
+                   step 0; mismo esquema que los runs anteriores)
+    "state_delta"  diferencia estructural contra el estado del registro
+                   anterior
+
+Un delta de dict es {"set": {clave: valor}, "del": [claves], "sub":
+{clave: delta}}, omitiendo las partes vacías: "sub" desciende en dicts
+anidados y todo lo demás (listas, escalares) se reemplaza entero. Las
+claves de "del" se emiten como str, igual que las que JSON convierte en
+"set"/"sub", porque los deltas se aplican sobre el estado leído del JSONL.
+
+Con un snapshot del RNG de step (ver sim.replay), los keyframes llevan
+además "rng_state" y cada registro "rng_pos", la posición del stream antes
+del step.
+
+iter_states(run_path) reconstruye el GameState de cada step; los runs
+viejos (full_state en todas las líneas) se leen igual.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+
+from engine.state import GameState
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Delta estructural old -> new (ver docstring del módulo)."""
+    sets: Dict[str, Any] = {}
+    subs: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            sets[key] = value
+            continue
+        prev = old[key]
+        if prev == value:
+            continue
+        if isinstance(value, dict) and isinstance(prev, dict):
+            subs[key] = diff_state(prev, value)
+        else:
+            sets[key] = value
+    delta: Dict[str, Any] = {}
+    if sets:
+        delta["set"] = sets
+    dels = [str(key) for key in old if key not in new]
+    if dels:
+        delta["del"] = dels
+    if subs:
+        delta["sub"] = subs
+    return delta
+
+
+def apply_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aplica un delta y retorna un dict nuevo; `base` no se modifica y los
+    subárboles sin cambios se comparten con él.
+    """
+    out = dict(base)
+    for key in delta.get("del", ()):
+        out.pop(key, None)
+    out.update(delta.get("set", {}))
+    for key, sub in delta.get("sub", {}).items():
+        out[key] = apply_delta(out[key], sub)
+    return out
+
+
+class ReplayRecorder:
+    """
+    Emite el campo de replay de cada registro: keyframe cada
+    `keyframe_every` steps (<= 1: keyframe siempre) y delta entre medio.
+    """
+
+    def __init__(self, keyframe_every: int = 50):
+        self.keyframe_every = keyframe_every
+        self._prev: Optional[Dict[str, Any]] = None
+        self._count = 0
+
+    def record(self, state: GameState, rng_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        current = state.to_dict()
+        prev = self._prev
+        keyframe = prev is None or self.keyframe_every <= 1 or self._count % self.keyframe_every == 0
+        self._prev = current
+        self._count += 1
+        out: Dict[str, Any] = {"full_state": current} if keyframe else {"state_delta": diff_state(prev, current)}
+        if rng_state is not None:
+            if keyframe:
+                out["rng_state"] = rng_state
+            if rng_state.get("algo") == "counter":
+                out["rng_pos"] = rng_state["state"][1]
+        return out
+
+
+def iter_state_dicts(records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    (registro, estado como dict) por cada registro, aplicando los deltas
+    sobre el último keyframe. Los dicts comparten estructura entre steps:
+    son de solo lectura. Registros sin estado (runs sin replay) se omiten.
+    """
+    current: Optional[Dict[str, Any]] = None
+    for rec in records:
+        full = rec.get("full_state")
+        if full:
+            current = full
+        elif "state_delta" in rec:
+            if current is None:
+                raise ValueError(f"state_delta sin keyframe previo (step {rec.get('step')})")
+            current = apply_delta(current, rec["state_delta"])
+        else:
+            continue
+        yield rec, current
+
+
+def read_records(run_path: str) -> Iterator[Dict[str, Any]]:
+    with open(run_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _copy_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+def rebuild_state(d: Dict[str, Any]) -> GameState:
+    """GameState independiente a partir de un dict de iter_state_dicts()."""
+    return GameState.from_dict(_copy_json(d))
+
+
+def iter_states(run_path: str) -> Iterator[GameState]:
+    """GameState previo a cada step del run (independientes entre sí)."""
+    for _, d in iter_state_dicts(read_records(run_path)):
+        yield rebuild_state(d)
+
+
+def state_at(run_path: str, step: int) -> GameState:
+    """
+    Estado previo al step `step` del run. Solo aplica los deltas posteriores
+    al último keyframe anterior a `step`.
+    """
+    keyframe: Optional[Dict[str, Any]] = None
+    deltas: List[Dict[str, Any]] = []
+    for rec in read_records(run_path):
+        if rec.get("full_state"):
+            keyframe = rec["full_state"]
+            deltas = []
+        elif "state_delta" in rec:
+            deltas.append(rec["state_delta"])
+        if rec.get("step") == step:
+            if keyframe is None:
+                break
+            current = keyframe
+            for delta in deltas:
+                current = apply_delta(current, delta)
+            return rebuild_state(current)
+    raise KeyError(f"step {step} no tiene estado en {run_path}")
@@ -8,6 +8,7 @@ import argparse
 
 from engine.actions import Action, ActionType
 from engine.config import Config
+from engine.episode_log import EpisodeLog
 from engine.rng import RNG
 from engine.state import GameState, PlayerState, RoomState, DeckState
 from engine.types import PlayerId, RoomId, CardId
@@ -15,8 +16,10 @@ from engine.board import corridor_id, room_id, is_corridor
 from engine.transition import step
 from engine.legality import get_legal_actions
 from sim.policies import get_king_policy, get_player_policy
+from sim.policy_context import PolicyContext
 from sim.memory import create_team_memory, create_bot_memories, TeamMemory
-from sim.metrics import transition_record, write_jsonl
+from sim.metrics import JsonlWriter, transition_record, write_json_atomic
+from sim.replay_records import ReplayRecorder
 
 
 SPECIAL_ACTION_TYPES = {
@@ -48,6 +51,41 @@ def _status_counts(state: GameState) -> Dict[str, int]:
     return counts
 
 
+def _episode_summary(
+    policy_name: str,
+    seed: int,
+    step_idx: int,
+    state: GameState,
+    cfg: Config,
+    episode_stats: Dict[str, Any],
+    rng: RNG,
+    step_rng: RNG,
+) -> Dict[str, Any]:
+    role_draw_mode = getattr(cfg, "ROLE_DRAW_MODE", "FIXED")
+    role_pool = list(getattr(cfg, "ROLE_POOL", []) or [])
+    roles_assigned = state.roles_assigned or {str(pid): p.role_id for pid, p in state.players.items()}
+
+    summary = {
+        "policy": policy_name,
+        "seed": seed,
+        "steps": step_idx,
+        "round": state.round,
+        "game_over": state.game_over,
+        "outcome": state.outcome,
+        "keys_destroyed_total": state.keys_destroyed,
+        "keys_in_hand": state.aggregates.keys_in_hand,
+        "role_draw_mode": role_draw_mode,
+        "role_pool": role_pool,
+        "roles_assigned": roles_assigned,
+        **episode_stats,
+    }
+    if rng.log_level != "off":
+        summary["rng_log_level"] = rng.log_level
+        summary["rng_draws"] = dict(rng.counters)
+        summary["rng_draws_step"] = dict(step_rng.counters)
+    return summary
+
+
 def _bump(counter: Dict[str, int], key: str, amount: int = 1) -> None:
     counter[key] = counter.get(key, 0) + amount
 
@@ -146,6 +184,7 @@ def make_smoke_state(seed: int = 1, cfg: Optional[Config] = None) -> GameState:
     rooms: Dict[RoomId, RoomState] = {}
     state = GameState(round=1, players=players, rooms=rooms, seed=seed, king_floor=1)
     state.roles_assigned = roles_assigned
+    state.episode_log = EpisodeLog(maxlen=cfg.EPISODE_LOG_MAXLEN)
 
     # 3. Setup Canonical Special Rooms & Motemey Deck
     # This populates state.rooms (via special rooms) and state.motemey_deck
@@ -199,7 +238,11 @@ def run_episode(
     policy_name: str = "GOAL",
 ) -> GameState:
     cfg = cfg or Config()
-    rng = RNG(seed)
+    rng = RNG(seed, log_level=cfg.RNG_LOG_LEVEL, log_size=cfg.RNG_LOG_SIZE)
+    # Stream propio para step(): sus draws no dependen de lo que consuman las
+    # policies, así el run se re-ejecuta desde (estado, acciones, snapshot)
+    # sin las policies (ver sim.replay)
+    step_rng = rng.fork("step")
     state = make_smoke_state(seed=seed, cfg=cfg)
 
     # Policy Selection
@@ -228,7 +271,13 @@ def run_episode(
 
     kpol = get_king_policy(getattr(cfg, "KING_POLICY", "RANDOM"), cfg)
 
-    records: List[Dict[str, Any]] = []
+    if out_path is None:
+        Path("runs").mkdir(exist_ok=True)
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        out_path = f"runs/run_{policy_name}_seed{seed}_{ts}.jsonl"
+    summary_path = out_path.replace(".jsonl", "_summary.json")
+
+    replay = ReplayRecorder(getattr(cfg, "REPLAY_KEYFRAME_EVERY", 1))
     step_idx = 0
     episode_stats: Dict[str, Dict[str, int]] = {
         "special_actions": {},
@@ -257,171 +306,177 @@ def run_episode(
     if hasattr(ppol, 'set_memory'):
         ppol.set_memory(team_memory, bot_memories)
 
-    while step_idx < max_steps and not state.game_over:
-        # Check for Sacrifice Interrupt
-        pending_sacrifice_pid = state.flags.get("PENDING_SACRIFICE_CHECK")
-        if isinstance(pending_sacrifice_pid, list):
-            pending_sacrifice_pid = pending_sacrifice_pid[0] if pending_sacrifice_pid else None
+    # Memoria de decisión de las policies: por episodio, fuera de state.flags
+    policy_context = PolicyContext()
+    for pol in (ppol, kpol):
+        if hasattr(pol, 'set_context'):
+            pol.set_context(policy_context)
+
+    # Registros en streaming: a disco a medida que se producen, no en memoria
+    completed = False
+    try:
+        with JsonlWriter(out_path, flush_every=getattr(cfg, "RUN_FLUSH_EVERY", 100)) as writer:
+            while step_idx < max_steps and not state.game_over:
+                # Check for Sacrifice Interrupt
+                pending_sacrifice_pid = state.flags.get("PENDING_SACRIFICE_CHECK")
+                if isinstance(pending_sacrifice_pid, list):
+                    pending_sacrifice_pid = pending_sacrifice_pid[0] if pending_sacrifice_pid else None
         
-        if pending_sacrifice_pid:
-            episode_stats["sacrifice"]["opportunities"] += 1
-            legal_for_pending = get_legal_actions(state, str(pending_sacrifice_pid))
-            if any(a.type == ActionType.SACRIFICE for a in legal_for_pending):
-                episode_stats["sacrifice"]["sacrifice_available"] += 1
-            # print(f"DEBUG RUNNER: Interrupt active for {pending_sacrifice_pid}")
-            # INTERRUPT: Only the pending player can act (Sacrifice/Accept)
-            actor = str(pending_sacrifice_pid)
-            # Use player policy for this decision
-            action = ppol.choose(state, rng) 
-            # Note: Policies must be robust enough to pick SACRIFICE/ACCEPT if available.
-        elif state.phase == "PLAYER":
-            if "PENDING_SACRIFICE_CHECK" in state.flags:
-                print(f"DEBUG RUNNER WARN: Flag exists but value is '{state.flags['PENDING_SACRIFICE_CHECK']}'")
-            actor = str(state.turn_order[state.turn_pos])
-            action = ppol.choose(state, rng)
-        else:
-            actor = "KING"
-            action = kpol.choose(state, rng)
-            
-        if action is None:
-            # Fallback if policy fails (should be rare)
-            if actor == "KING":
-                 action = Action(actor="KING", type=ActionType.KING_ENDROUND, data={})
-            else:
-                 action = Action(actor=actor, type=ActionType.END_TURN, data={})
-
-        # Safety: si la policy devuelve una acción ilegal, escoger una legal
-        legal = get_legal_actions(state, actor)
-        if action not in legal:
-            if legal:
-                action = rng.choice(legal)
-            else:
-                # Sin acciones legales: forzar END_TURN o KING_ENDROUND
-                if actor == "KING":
-                    action = Action(actor="KING", type=ActionType.KING_ENDROUND, data={})
+                if pending_sacrifice_pid:
+                    episode_stats["sacrifice"]["opportunities"] += 1
+                    legal_for_pending = get_legal_actions(state, str(pending_sacrifice_pid), cached=True)
+                    if any(a.type == ActionType.SACRIFICE for a in legal_for_pending):
+                        episode_stats["sacrifice"]["sacrifice_available"] += 1
+                    # print(f"DEBUG RUNNER: Interrupt active for {pending_sacrifice_pid}")
+                    # INTERRUPT: Only the pending player can act (Sacrifice/Accept)
+                    actor = str(pending_sacrifice_pid)
+                    # Use player policy for this decision
+                    action = ppol.choose(state, rng) 
+                    # Note: Policies must be robust enough to pick SACRIFICE/ACCEPT if available.
+                elif state.phase == "PLAYER":
+                    if "PENDING_SACRIFICE_CHECK" in state.flags:
+                        print(f"DEBUG RUNNER WARN: Flag exists but value is '{state.flags['PENDING_SACRIFICE_CHECK']}'")
+                    actor = str(state.turn_order[state.turn_pos])
+                    action = ppol.choose(state, rng)
                 else:
-                    action = Action(actor=actor, type=ActionType.END_TURN, data={})
-
-        if actor in state.players:
-            pid_actor = PlayerId(actor)
-            if action.type == ActionType.SACRIFICE:
-                episode_stats["sacrifice"]["sacrifice"] += 1
-                if state.players[pid_actor].keys > 0:
-                    episode_stats["sacrifice"]["sacrifice_with_keys"] += 1
-                mode = action.data.get("mode", "UNKNOWN")
-                _bump(episode_stats["sacrifice"]["sacrifice_mode"], str(mode))
-            elif action.type == ActionType.ACCEPT_SACRIFICE:
-                episode_stats["sacrifice"]["accept"] += 1
-                if state.players[pid_actor].keys > 0:
-                    episode_stats["sacrifice"]["accept_with_keys"] += 1
-
-        next_state = step(state, action, rng, cfg)
-
-        # Track d6 if KING_ENDROUND
-        action_dict = {"actor": actor, "type": action.type.value, "data": action.data}
-        if action.type.value == "KING_ENDROUND" and rng.last_king_d6 is not None:
-            action_dict["d6"] = rng.last_king_d6
-
-        # Episode metrics: specials/objects/status transitions
-        if action.type in SPECIAL_ACTION_TYPES:
-            _bump(episode_stats["special_actions"], action.type.value)
-        if action.type in OBJECT_ACTION_TYPES:
-            _bump(episode_stats["object_actions"], action.type.value)
-
-        keys_delta = next_state.keys_destroyed - state.keys_destroyed
-        if keys_delta > 0:
-            who = actor if actor in state.players else "UNKNOWN"
-            _bump(episode_stats["sacrifice"]["keys_destroyed_by"], str(who), keys_delta)
-            source = state.last_sanity_loss_event or "UNKNOWN"
-            _bump(episode_stats["sacrifice"]["keys_destroyed_sources"], str(source), keys_delta)
-
-        # === Memory System Updates ===
-        # Sincronizar posiciones de boxes después de rotación (KING_ENDROUND)
-        if action.type == ActionType.KING_ENDROUND:
-            team_memory.sync_from_state(next_state)
-            team_memory.age_all_memories(bot_memories)
-            # Re-optimizar asignaciones con memorias envejecidas
-            team_memory.optimize_assignments(bot_memories)
-        
-        # Detectar carta revelada por SEARCH
-        if action.type == ActionType.SEARCH and actor in state.players:
-            from sim.memory import CardMemory, card_priority
-            pid_actor = PlayerId(actor)
-            p = state.players[pid_actor]
-            # Obtener box_id de la habitación actual
-            box_id = state.box_at_room.get(p.room)
-            if box_id:
-                # Obtener posición actual del deck antes de SEARCH
-                from engine.boxes import active_deck_for_room
-                old_deck = active_deck_for_room(state, p.room)
-                if old_deck and old_deck.top < len(old_deck.cards):
-                    revealed_card = old_deck.cards[old_deck.top]
-                    priority = card_priority(str(revealed_card))
-                    card_mem = CardMemory(
-                        card_id=str(revealed_card),
-                        box_id=str(box_id),
-                        position_in_deck=old_deck.top,
-                        priority=priority
-                    )
-                    # Compartir con el equipo
-                    team_memory.share_card(card_mem, from_player=actor)
-                    # Re-optimizar quién recuerda qué
+                    actor = "KING"
+                    action = kpol.choose(state, rng)
+            
+                if action is None:
+                    # Fallback if policy fails (should be rare)
+                    if actor == "KING":
+                         action = Action(actor="KING", type=ActionType.KING_ENDROUND, data={})
+                    else:
+                         action = Action(actor=actor, type=ActionType.END_TURN, data={})
+
+                # Safety: si la policy devuelve una acción ilegal, escoger una legal
+                legal = get_legal_actions(state, actor, cached=True)
+                if action not in legal:
+                    if legal:
+                        action = rng.choice(legal)
+                    else:
+                        # Sin acciones legales: forzar END_TURN o KING_ENDROUND
+                        if actor == "KING":
+                            action = Action(actor="KING", type=ActionType.KING_ENDROUND, data={})
+                        else:
+                            action = Action(actor=actor, type=ActionType.END_TURN, data={})
+
+                if actor in state.players:
+                    pid_actor = PlayerId(actor)
+                    if action.type == ActionType.SACRIFICE:
+                        episode_stats["sacrifice"]["sacrifice"] += 1
+                        if state.players[pid_actor].keys > 0:
+                            episode_stats["sacrifice"]["sacrifice_with_keys"] += 1
+                        mode = action.data.get("mode", "UNKNOWN")
+                        _bump(episode_stats["sacrifice"]["sacrifice_mode"], str(mode))
+                    elif action.type == ActionType.ACCEPT_SACRIFICE:
+                        episode_stats["sacrifice"]["accept"] += 1
+                        if state.players[pid_actor].keys > 0:
+                            episode_stats["sacrifice"]["accept_with_keys"] += 1
+
+                # Si había acciones legales, `action` salió de `legal`: step no necesita revalidar
+                rng_state = step_rng.snapshot()
+                next_state = step(state, action, step_rng, cfg, trusted=bool(legal))
+
+                # Track d6 if KING_ENDROUND
+                action_dict = {"actor": actor, "type": action.type.value, "data": action.data}
+                if action.type.value == "KING_ENDROUND" and step_rng.last_king_d6 is not None:
+                    action_dict["d6"] = step_rng.last_king_d6
+
+                # Episode metrics: specials/objects/status transitions
+                if action.type in SPECIAL_ACTION_TYPES:
+                    _bump(episode_stats["special_actions"], action.type.value)
+                if action.type in OBJECT_ACTION_TYPES:
+                    _bump(episode_stats["object_actions"], action.type.value)
+
+                keys_delta = next_state.keys_destroyed - state.keys_destroyed
+                if keys_delta > 0:
+                    who = actor if actor in state.players else "UNKNOWN"
+                    _bump(episode_stats["sacrifice"]["keys_destroyed_by"], str(who), keys_delta)
+                    source = state.last_sanity_loss_event or "UNKNOWN"
+                    _bump(episode_stats["sacrifice"]["keys_destroyed_sources"], str(source), keys_delta)
+
+                # === Memory System Updates ===
+                # Sincronizar posiciones de boxes después de rotación (KING_ENDROUND)
+                if action.type == ActionType.KING_ENDROUND:
+                    team_memory.sync_from_state(next_state)
+                    team_memory.age_all_memories(bot_memories)
+                    # Re-optimizar asignaciones con memorias envejecidas
                     team_memory.optimize_assignments(bot_memories)
-
-        next_status_counts = _status_counts(next_state)
-        for st, count in next_status_counts.items():
-            prev = prev_status_counts.get(st, 0)
-            if count > prev:
-                _bump(episode_stats["status_gained"], st, count - prev)
-        for st, count in prev_status_counts.items():
-            nxt = next_status_counts.get(st, 0)
-            if count > nxt:
-                _bump(episode_stats["status_cleared"], st, count - nxt)
-        prev_status_counts = next_status_counts
-
-        # Add policy info to record for analysis
-        records.append(
-            transition_record(
-                state=state,
-                action=action_dict,
-                next_state=next_state,
-                cfg=cfg,
-                step_idx=step_idx,
-            )
-        )
-        # Inject Policy Name into record (hacky but useful)
-        records[-1]["policy"] = policy_name
-
-        state = next_state
-        step_idx += 1
-
-    if out_path is None:
-        Path("runs").mkdir(exist_ok=True)
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        out_path = f"runs/run_{policy_name}_seed{seed}_{ts}.jsonl"
-
-    write_jsonl(out_path, records)
-    role_draw_mode = getattr(cfg, "ROLE_DRAW_MODE", "FIXED")
-    role_pool = list(getattr(cfg, "ROLE_POOL", []) or [])
-    roles_assigned = state.roles_assigned or {str(pid): p.role_id for pid, p in state.players.items()}
-
-    summary = {
-        "policy": policy_name,
-        "seed": seed,
-        "steps": step_idx,
-        "round": state.round,
-        "game_over": state.game_over,
-        "outcome": state.outcome,
-        "keys_destroyed_total": state.keys_destroyed,
-        "keys_in_hand": sum(p.keys for p in state.players.values()),
-        "role_draw_mode": role_draw_mode,
-        "role_pool": role_pool,
-        "roles_assigned": roles_assigned,
-        **episode_stats,
-    }
-    summary_path = out_path.replace(".jsonl", "_summary.json")
-    with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, ensure_ascii=False, indent=2)
+        
+                # Detectar carta revelada por SEARCH
+                if action.type == ActionType.SEARCH and actor in state.players:
+                    from sim.memory import CardMemory, card_priority
+                    pid_actor = PlayerId(actor)
+                    p = state.players[pid_actor]
+                    # Obtener box_id de la habitación actual
+                    box_id = state.box_at_room.get(p.room)
+                    if box_id:
+                        # Obtener posición actual del deck antes de SEARCH
+                        from engine.boxes import active_deck_for_room
+                        old_deck = active_deck_for_room(state, p.room)
+                        revealed_card = old_deck.peek() if old_deck else None
+                        if revealed_card is not None:
+                            priority = card_priority(str(revealed_card))
+                            card_mem = CardMemory(
+                                card_id=str(revealed_card),
+                                box_id=str(box_id),
+                                position_in_deck=old_deck.top,
+                                priority=priority
+                            )
+                            # Compartir con el equipo
+                            team_memory.share_card(card_mem, from_player=actor)
+                            # Re-optimizar quién recuerda qué
+                            team_memory.optimize_assignments(bot_memories)
+
+                next_status_counts = _status_counts(next_state)
+                for st, count in next_status_counts.items():
+                    prev = prev_status_counts.get(st, 0)
+                    if count > prev:
+                        _bump(episode_stats["status_gained"], st, count - prev)
+                for st, count in prev_status_counts.items():
+                    nxt = next_status_counts.get(st, 0)
+                    if count > nxt:
+                        _bump(episode_stats["status_cleared"], st, count - nxt)
+                prev_status_counts = next_status_counts
+
+                rec = transition_record(
+                    state=state,
+                    action=action_dict,
+                    next_state=next_state,
+                    cfg=cfg,
+                    step_idx=step_idx,
+                    replay=replay,
+                    rng_state=rng_state,
+                )
+                # Inject Policy Name into record (hacky but useful)
+                rec["policy"] = policy_name
+
+                state = next_state
+                step_idx += 1
+
+                if writer.write(rec):
+                    # Summary parcial en cada flush: un run cortado deja salida usable
+                    partial = _episode_summary(policy_name, seed, step_idx, state, cfg, episode_stats, rng, step_rng)
+                    partial["partial"] = True
+                    write_json_atomic(summary_path, partial)
+        completed = True
+    finally:
+        # Summary final, o parcial si el episodio se cortó con una excepción
+        # (el writer ya volcó al cerrarse todos los registros escritos)
+        summary = _episode_summary(policy_name, seed, step_idx, state, cfg, episode_stats, rng, step_rng)
+        if not completed:
+            summary["partial"] = True
+        write_json_atomic(summary_path, summary)
+
+    if rng.log or step_rng.log:
+        rng_log_path = out_path.replace(".jsonl", "_rng_log.jsonl")
+        with open(rng_log_path, "w", encoding="utf-8") as f:
+            for stream, log in (("policy", rng.log), ("step", step_rng.log)):
+                for kind, data in log:
+                    # choice() puede registrar Actions u otros objetos: serializar como str
+                    f.write(json.dumps({"stream": stream, "kind": kind, "data": data}, ensure_ascii=False, default=str) + "\n")
+        print(f"Saved RNG log to: {rng_log_path}")
     print(f"Saved run to: {out_path}")
     print(f"Saved summary to: {summary_path}")
     print("Finished:", state.game_over, state.outcome, "round", state.round, "steps", step_idx)
@@ -445,6 +500,14 @@ def main():
                     help="Role draw mode for player setup")
     ap.add_argument("--role-pool", type=str, default=None,
                     help="Comma-separated role ids for draw pool (e.g., HEALER,TANK,SCOUT)")
+    # RNG draw logging (full for replay debugging)
+    ap.add_argument("--rng-log", type=str, default="off",
+                    choices=["off", "counters", "ring", "full"],
+                    help="RNG draw logging level")
+    ap.add_argument("--rng-log-size", type=int, default=256,
+                    help="Ring buffer size for --rng-log ring")
+    ap.add_argument("--keyframe-every", type=int, default=None,
+                    help="Replay keyframe interval: full_state every N steps, state deltas in between (1 = always full_state)")
     
     args = ap.parse_args()
     
@@ -452,7 +515,13 @@ def main():
     if args.role_pool:
         role_pool = [r.strip() for r in args.role_pool.split(",") if r.strip()]
 
-    cfg_kwargs = {"MCTS_ROLLOUTS": args.mcts_rollouts}
+    cfg_kwargs = {
+        "MCTS_ROLLOUTS": args.mcts_rollouts,
+        "RNG_LOG_LEVEL": args.rng_log,
+        "RNG_LOG_SIZE": args.rng_log_size,
+    }
+    if args.keyframe_every is not None:
+        cfg_kwargs["REPLAY_KEYFRAME_EVERY"] = args.keyframe_every
     if args.role_draw_mode:
         cfg_kwargs["ROLE_DRAW_MODE"] = args.role_draw_mode
     if role_pool is not None:
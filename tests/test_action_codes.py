@@ -0,0 +1,81 @@
+"""
+Tests para acciones hashables/internadas y pertenencia O(1) en LegalActions.
+"""
+import copy
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from engine.actions import (
+    Action,
+    ActionType,
+    LegalActions,
+    action_code,
+    decode_action,
+    export_action_table,
+    intern_action,
+    load_action_table,
+)
+from engine.legality import get_legal_actions
+from sim.runner import make_smoke_state
+
+
+def test_action_is_hashable_and_data_immutable():
+    a = Action(actor="P1", type=ActionType.MOVE, data={"to": "F1_R1"})
+    b = Action(actor="P1", type=ActionType.MOVE, data={"to": "F1_R1"})
+    assert a == b and hash(a) == hash(b)
+    assert a.data == {"to": "F1_R1"}
+    assert json.dumps(a.data) == '{"to": "F1_R1"}'
+    with pytest.raises(TypeError):
+        a.data["to"] = "F1_R2"
+    assert pickle.loads(pickle.dumps(a)) == a
+    assert copy.deepcopy(a) == a
+
+
+def test_action_codes_roundtrip():
+    a = Action(actor="P2", type=ActionType.USE_TABERNA_ROOMS, data={"room_a": "F1_R1", "room_b": "F2_R3"})
+    code = action_code(a)
+    assert action_code(Action(actor="P2", type=ActionType.USE_TABERNA_ROOMS, data=dict(a.data))) == code
+    assert decode_action(code) == a
+    assert intern_action(a) is decode_action(code)
+
+    table = export_action_table()
+    row = next(r for r in table if r["code"] == code)
+    assert row["type"] == "USE_TABERNA_ROOMS"
+    load_action_table(json.loads(json.dumps(table)))  # misma tabla: sin conflicto
+
+    bad = dict(row, code=code + 1)
+    with pytest.raises(ValueError):
+        load_action_table([bad])
+
+
+def test_action_codes_do_not_depend_on_first_seen_order():
+    probe = (
+        "from engine.actions import Action, ActionType, action_code; "
+        "[action_code(Action(actor='P1', type=ActionType.MOVE, data={'to': f'F1_R{i}'})) for i in range(5)]; "
+        "print(action_code(Action(actor='P2', type=ActionType.USE_TABERNA_ROOMS, data={'room_a': 'F1_R1', 'room_b': 'F2_R3'})))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", probe], cwd=root, capture_output=True, text=True, check=True)
+    a = Action(actor="P2", type=ActionType.USE_TABERNA_ROOMS, data={"room_b": "F2_R3", "room_a": "F1_R1"})
+    assert int(out.stdout) == action_code(a)
+    assert action_code(Action(actor="P1", type=ActionType.MOVE, data={"flag": True})) == \
+        action_code(Action(actor="P1", type=ActionType.MOVE, data={"flag": 1}))
+
+
+def test_legal_actions_membership():
+    s = make_smoke_state(seed=1)
+    actor = s.turn_order[s.turn_pos]
+    legal = get_legal_actions(s, actor)
+    assert isinstance(legal, LegalActions)
+    first = legal[0]
+    assert Action(actor=first.actor, type=first.type, data=dict(first.data)) in legal
+    assert Action(actor=actor, type=ActionType.MOVE, data={"to": "NOWHERE"}) not in legal
+
+    last = legal.pop()
+    if last not in legal[:]:
+        assert last not in legal
@@ -0,0 +1,142 @@
+"""
+Tests para acciones paramétricas (ActionFamily) y el espacio de acciones legales.
+"""
+import math
+import random
+
+from engine.actions import Action, ActionFamily, ActionType
+from engine.config import Config
+from engine.legality import get_legal_action_space, get_legal_actions
+from engine.rng import RNG
+from engine.types import PlayerId, RoomId
+from sim.mcts import MCTSNode, mcts_search
+from sim.mcts_policy import MCTSPlayerPolicy
+from sim.runner import make_smoke_state
+
+
+def _taberna_state():
+    s = make_smoke_state(seed=5)
+    s.turn_pos = s.turn_order.index(PlayerId("P1"))
+    s.remaining_actions[PlayerId("P1")] = 2
+    p = s.players[PlayerId("P1")]
+    p.room = RoomId("F1_R1")
+    p.sanity = 3
+    p.objects = ["VIAL", "COMPASS"]
+    s.rooms[RoomId("F1_R1")].special_card_id = "TABERNA"
+    s.rooms[RoomId("F1_R1")].special_revealed = True
+    s.rooms[RoomId("F1_R1")].special_destroyed = False
+    return s
+
+
+def test_space_expands_to_legal_actions():
+    s = _taberna_state()
+    space = get_legal_action_space(s, "P1")
+    legal = get_legal_actions(s, "P1")
+    families = space.families()
+
+    assert [f.type for f in families] == [ActionType.USE_TABERNA_ROOMS]
+    assert list(space.expand()) == list(legal)
+    assert space.size() == len(legal)
+    assert len(families[0]) == sum(1 for a in legal if a.type == ActionType.USE_TABERNA_ROOMS)
+    assert all(a in space for a in legal)
+
+
+def test_family_membership_sampling_and_argmax():
+    family = ActionFamily("P1", ActionType.USE_TABERNA_ROOMS, ("room_a", "room_b"), ("A", "B", "C"), kind="pairs")
+    pair = Action(actor="P1", type=ActionType.USE_TABERNA_ROOMS, data={"room_a": "A", "room_b": "C"})
+    assert family.contains(pair)
+    assert not family.contains(Action(actor="P1", type=ActionType.USE_TABERNA_ROOMS, data={"room_a": "C", "room_b": "A"}))
+    assert not family.contains(Action(actor="P2", type=ActionType.USE_TABERNA_ROOMS, data=dict(pair.data)))
+    assert len(family) == 3 and list(family) == list(family.actions())
+
+    rng = random.Random(0)
+    assert all(family.contains(family.sample(rng)) for _ in range(20))
+    assert family.argmax(lambda a, b: ord(a) + ord(b)) == Action(
+        actor="P1", type=ActionType.USE_TABERNA_ROOMS, data={"room_a": "B", "room_b": "C"}
+    )
+
+    drop = ActionFamily("P1", ActionType.USE_ARMORY_DROP, ("item_name",), ("VIAL",), fixed=(("item_type", "object"),))
+    assert drop.contains(Action(actor="P1", type=ActionType.USE_ARMORY_DROP, data={"item_name": "VIAL", "item_type": "object"}))
+    assert not drop.contains(Action(actor="P1", type=ActionType.USE_ARMORY_DROP, data={"item_name": "VIAL", "item_type": "key"}))
+
+
+def test_mcts_progressive_widening_limits_root_children():
+    s = _taberna_state()
+    node = MCTSNode(s)
+    node.set_untried_from_space(s, "P1", (1.0, 0.5))
+    assert node.untried_families and node.has_untried()
+
+    drawn = set()
+    for visits in (0, 4, 9):
+        node.visits = visits
+        while not node.is_fully_expanded():
+            action = node.pop_untried(RNG(visits).fork(len(drawn)))
+            assert action in get_legal_action_space(s, "P1") and action not in drawn
+            drawn.add(action)
+            node.children.append(MCTSNode(s, parent=node, action=action))
+        assert len(node.children) == max(1, math.ceil(visits ** 0.5))
+
+    def end_turn(st, r):
+        return Action(actor=str(st.turn_order[st.turn_pos]), type=ActionType.END_TURN, data={})
+
+    best = mcts_search(
+        s, Config(), RNG(1), "P1", end_turn, end_turn,
+        num_rollouts=12, max_depth=1, widening=1.0, widening_alpha=0.5,
+    )
+    assert best in get_legal_action_space(s, "P1")
+
+
+def test_pop_untried_drains_families_without_repeats():
+    s = _taberna_state()
+    node = MCTSNode(s)
+    node.set_untried_from_space(s, "P1", (1.0, 0.5))
+    expected = list(get_legal_action_space(s, "P1").expand())
+
+    rng = RNG(2).fork("drain")
+    drawn = []
+    while node.has_untried():
+        drawn.append(node.pop_untried(rng))
+    assert len(drawn) == len(set(drawn)) == len(expected)
+    assert set(drawn) == set(expected)
+
+
+def test_mcts_forks_widening_rng_only_when_widening(monkeypatch):
+    tags = []
+    real_fork = RNG.fork
+
+    def spy(self, tag):
+        tags.append(tag)
+        return real_fork(self, tag)
+
+    monkeypatch.setattr(RNG, "fork", spy)
+
+    def end_turn(st, r):
+        return Action(actor=str(st.turn_order[st.turn_pos]), type=ActionType.END_TURN, data={})
+
+    s = _taberna_state()
+    mcts_search(s, Config(), RNG(1), "P1", end_turn, end_turn, num_rollouts=6, max_depth=1)
+    assert not any(str(t).startswith("pw_") for t in tags)
+    mcts_search(s, Config(), RNG(1), "P1", end_turn, end_turn, num_rollouts=6, max_depth=1, widening=1.0)
+    assert any(str(t).startswith("pw_") for t in tags)
+
+
+def test_duplicate_objects_give_one_action_per_item():
+    s = make_smoke_state(seed=5)
+    s.turn_pos = s.turn_order.index(PlayerId("P1"))
+    s.motemey_event_active = True
+    s.players[PlayerId("P1")].objects = ["VIAL", "VIAL"]
+    s.touch()
+
+    sells = [a for a in get_legal_actions(s, "P1") if a.type == ActionType.USE_MOTEMEY_SELL]
+    assert sells == [Action(actor="P1", type=ActionType.USE_MOTEMEY_SELL, data={"item_name": "VIAL"})]
+
+    node = MCTSNode(s)
+    node.set_untried_from_space(s, "P1", (3.0, 0.5))
+    rng = RNG(5).fork("dup")
+    drawn = []
+    while node.has_untried():
+        drawn.append(node.pop_untried(rng))
+    assert len(drawn) == len(set(drawn)) == len(get_legal_actions(s, "P1"))
+
+    pol = MCTSPlayerPolicy(Config(MCTS_WIDENING=3.0), rollouts=8, depth=2)
+    assert pol.choose(s, RNG(5)) in get_legal_actions(s, "P1")
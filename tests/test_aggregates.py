@@ -0,0 +1,49 @@
+"""
+Tests para los agregados del estado cacheados por versión.
+"""
+import pytest
+
+from engine import aggregates
+from engine.aggregates import compute_aggregates
+from engine.config import Config
+from engine.legality import get_legal_actions
+from engine.rng import RNG
+from engine.transition import step
+from engine.types import PlayerId
+from sim.runner import make_smoke_state
+
+
+def test_cached_aggregates_match_recompute_across_steps():
+    cfg = Config()
+    rng = RNG(7)
+    s = make_smoke_state(seed=7)
+    for _ in range(40):
+        assert s.aggregates == compute_aggregates(s)
+        assert s.aggregates is s.aggregates
+        actor = str(s.turn_order[s.turn_pos]) if s.phase == "PLAYER" else "KING"
+        legal = get_legal_actions(s, actor)
+        if not legal or s.game_over:
+            break
+        s = step(s, rng.choice(legal), rng, cfg)
+
+
+def test_values_and_touch_invalidation():
+    s = make_smoke_state(seed=1)
+    agg = s.aggregates
+    assert agg.keys_in_hand == sum(p.keys for p in s.players.values())
+    assert agg.min_sanity == min(p.sanity for p in s.players.values())
+    assert sum(agg.players_per_floor.values()) == agg.n_players == len(s.players)
+    assert 0.0 <= agg.umbral_fraction <= 1.0
+
+    s.players[PlayerId("P1")].keys += 2
+    s.touch()
+    assert s.aggregates.keys_in_hand == agg.keys_in_hand + 2
+
+
+def test_debug_mode_detects_untouched_mutation(monkeypatch):
+    monkeypatch.setattr(aggregates, "CHECK_AGGREGATES", True)
+    s = make_smoke_state(seed=1)
+    s.aggregates
+    s.players[PlayerId("P1")].sanity -= 1
+    with pytest.raises(AssertionError):
+        s.aggregates
@@ -0,0 +1,71 @@
+"""
+Tests para el modelo entero del tablero (índices, tablas de vecinos, overlay de escaleras).
+"""
+from engine.board import (
+    NODE_FLOOR,
+    NODE_IS_CORRIDOR,
+    NODE_NEIGHBORS,
+    ROOM_IDS,
+    ROOM_INDEX,
+    _parse_neighbors,
+    bfs_dist_to_targets,
+    corridor_id,
+    floor_of,
+    is_corridor,
+    neighbors,
+    room_id,
+    stairs_key,
+    stairs_overlay,
+)
+
+
+def test_tables_match_string_model():
+    assert len(ROOM_IDS) == 15
+    for i, rid in enumerate(ROOM_IDS):
+        assert ROOM_INDEX[rid] == i
+        assert NODE_FLOOR[i] == floor_of(rid) == int(str(rid)[1])
+        assert NODE_IS_CORRIDOR[i] == is_corridor(rid) == str(rid).endswith("_P")
+        assert neighbors(rid) == _parse_neighbors(rid)
+        assert tuple(ROOM_IDS[j] for j in NODE_NEIGHBORS[i]) == neighbors(rid)
+
+
+def test_stairs_overlay_links_adjacent_floors():
+    stairs = {1: room_id(1, 2), 2: room_id(2, 4), 3: room_id(3, 1)}
+    adj = stairs_overlay(stairs_key(stairs))
+    f1, f2, f3 = (ROOM_INDEX[stairs[f]] for f in (1, 2, 3))
+    assert f2 in adj[f1] and f1 in adj[f2] and f3 in adj[f2] and f2 in adj[f3]
+    assert f3 not in adj[f1]
+    assert adj[ROOM_INDEX[corridor_id(1)]] == NODE_NEIGHBORS[ROOM_INDEX[corridor_id(1)]]
+
+
+def test_bfs_distances():
+    assert bfs_dist_to_targets(room_id(1, 1), {room_id(1, 1)}) == 0
+    assert bfs_dist_to_targets(room_id(1, 1), {room_id(1, 2)}) == 1
+    assert bfs_dist_to_targets(room_id(1, 1), {room_id(1, 3)}) == 2
+    # Sin escaleras no hay camino entre pisos
+    assert bfs_dist_to_targets(room_id(1, 1), {room_id(2, 1)}) == 999
+
+
+def test_distance_tables_match_bfs_moves():
+    import random
+
+    from engine.board import (
+        UNREACHABLE,
+        distance_matrix,
+        distances_to_targets,
+        get_next_move_away_from_targets,
+        get_next_move_to_targets,
+    )
+
+    # Con escaleras, todos los nodos quedan conectados
+    full = distance_matrix(stairs_key({1: room_id(1, 1), 2: room_id(2, 1), 3: room_id(3, 1)}))
+    assert all(d < UNREACHABLE for row in full for d in row)
+
+    r = random.Random(0)
+    for _ in range(200):
+        targets = set(r.sample(ROOM_IDS, r.randint(1, 4)))
+        table = distances_to_targets(targets)
+        for start in ROOM_IDS:
+            assert table[ROOM_INDEX[start]] == bfs_dist_to_targets(start, targets)
+            assert get_next_move_to_targets(start, targets, table) == get_next_move_to_targets(start, targets)
+            assert get_next_move_away_from_targets(start, targets, table) == get_next_move_away_from_targets(start, targets)
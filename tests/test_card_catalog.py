@@ -0,0 +1,49 @@
+"""
+Tests para el catálogo de cartas (códigos enteros y despacho pre-parseado).
+"""
+from engine.catalogs.cards import (
+    CARD_CROWN,
+    CARD_EVENT,
+    CARD_KEY,
+    CARD_NONE,
+    CARD_OBJECT,
+    CARD_OMEN,
+    CARD_STATE,
+    card_code,
+    card_codes,
+    card_ids,
+    card_spec,
+)
+from engine.config import Config
+from engine.handlers.cards import resolve_card_minimal
+from engine.types import CardId, PlayerId
+from sim.runner import make_smoke_state
+
+
+def test_specs_are_parsed_once_per_id():
+    assert card_spec("KEY").kind == CARD_KEY
+    assert card_spec("OBJECT:CROWN").kind == CARD_CROWN and card_spec("CROWN").kind == CARD_CROWN
+    assert (card_spec("OBJECT:VIAL").kind, card_spec("OBJECT:VIAL").arg) == (CARD_OBJECT, "VIAL")
+    assert (card_spec("COMPASS").kind, card_spec("COMPASS").arg) == (CARD_OBJECT, "COMPASS")
+    assert card_spec("OBJECT:NOPE").kind == CARD_NONE and card_spec("BOOK_CHAMBERS").kind == CARD_OBJECT
+    assert (card_spec("STATE:TRAPPED").kind, card_spec("STATE:TRAPPED").arg) == (CARD_STATE, "TRAPPED")
+    assert card_spec("OMEN:TUE_TUE").kind == CARD_OMEN
+    ev = card_spec("EVENTS:REFLEJO")
+    assert (ev.kind, ev.arg, ev.prefix) == (CARD_EVENT, "REFLEJO", "EVENTS")
+    assert card_code(CardId("KEY")) == card_code("KEY")
+
+
+def test_codes_roundtrip_deck():
+    s = make_smoke_state(seed=4)
+    cards = [c for r in s.rooms.values() for c in r.deck.cards]
+    codes = card_codes(cards)
+    assert card_ids(codes) == [str(c) for c in cards]
+    assert codes.itemsize == 2
+
+
+def test_dispatch_resolves_state_card():
+    s = make_smoke_state(seed=4)
+    pid = PlayerId("P1")
+    resolve_card_minimal(s, pid, CardId("STATE:TRAPPED"), Config())
+    st = s.players[pid].statuses[-1]
+    assert (st.status_id, st.remaining_rounds) == ("TRAPPED", 3)
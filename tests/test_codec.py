@@ -0,0 +1,58 @@
+"""
+Tests para el codec binario de GameState (to_bytes / from_bytes).
+"""
+import json
+
+import pytest
+
+from engine.codec import CODEC_VERSION, MAGIC, decode_state, decode_value, encode_value
+from engine.config import Config
+from engine.legality import get_legal_actions
+from engine.rng import RNG
+from engine.state import GameState
+from engine.systems.sacrifice import pending_sacrifice_pid
+from engine.transition import step
+from sim.runner import make_smoke_state
+
+
+def _states(seed: int, n: int):
+    s = make_smoke_state(seed=seed)
+    rng = RNG(seed)
+    for _ in range(n):
+        yield s
+        if s.game_over:
+            return
+        actor = pending_sacrifice_pid(s) or (str(s.turn_order[s.turn_pos]) if s.phase == "PLAYER" else "KING")
+        s = step(s, rng.choice(get_legal_actions(s, actor)), rng, Config())
+
+
+def test_roundtrip_matches_to_dict_and_from_dict():
+    for s in _states(seed=3, n=120):
+        data = s.to_bytes()
+        assert decode_state(data) == s.to_dict()
+        restored = GameState.from_bytes(data)
+        assert restored.to_dict() == GameState.from_dict(s.to_dict()).to_dict()
+    assert len(data) * 2 < len(json.dumps(s.to_dict()))
+
+
+def test_value_codec_edge_cases():
+    value = {
+        "ints": [0, -1, 127, -128, 128, 2**31, -(2**40)],
+        "floats": (1.5, -0.0),
+        "strs": ["ñandú", "", "ARAÑA"] * 200 + [str(i) for i in range(300)],
+        1: None,
+        "nested": [{"a": True, "b": False}, []],
+    }
+    decoded, end = decode_value(encode_value(value))
+    assert decoded == value and end == len(encode_value(value))
+
+
+def test_header_is_validated():
+    data = make_smoke_state(seed=1).to_bytes()
+    assert data[:4] == MAGIC and data[4] == CODEC_VERSION
+    with pytest.raises(ValueError):
+        decode_state(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        decode_state(data[:4] + bytes([CODEC_VERSION + 1]) + data[5:])
+    with pytest.raises(ValueError):
+        decode_state(data + b"\x00")
@@ -234,3 +234,33 @@ def test_proposed_solution_using_rotation():
     assert len(deck_deque) == 2
 
     # Solución usando deque es más eficiente para este patrón
+
+
+def test_peek_and_view_do_not_consume():
+    """peek()/view() leen las cartas restantes sin avanzar top ni copiar"""
+    deck = DeckState(cards=[CardId("A"), CardId("B"), CardId("C")])
+    deck.draw_top()
+    assert str(deck.peek()) == "B" and str(deck.peek(1)) == "C"
+    assert deck.peek(2) is None and deck.peek(-1) is None
+    view = deck.view()
+    assert len(view) == 2 and list(view) == ["B", "C"] and view[-1] == "C"
+    assert view[0:1] == ("B",)
+    assert deck.top == 1
+
+
+def test_compaction_is_in_place():
+    """La compactación reutiliza la lista propia y copia una sola vez si es compartida"""
+    deck = DeckState(cards=[CardId("A"), CardId("B")])
+    deck.put_bottom(CardId("X"))
+    own = deck.cards
+    deck.draw_top()
+    deck.draw_top()
+    deck.put_bottom(CardId("A"))
+    assert deck.cards is own and deck.top == 0
+    assert [str(c) for c in deck.cards] == ["X", "A"]
+
+    clone = deck.clone()
+    clone.draw_top()
+    clone.put_bottom(CardId("X"))
+    assert [str(c) for c in deck.cards] == ["X", "A"]
+    assert [str(c) for c in clone.cards] == ["A", "X"] and clone.top == 0
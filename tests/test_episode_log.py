@@ -0,0 +1,103 @@
+"""
+Tests para EpisodeLog: el log de acciones vive fuera del estado clonado.
+"""
+from engine.episode_log import EpisodeLog
+from engine.legality import get_legal_actions
+from engine.rng import RNG
+from engine.state import GameState
+from engine.transition import step
+from sim.runner import make_smoke_state
+
+
+def _actor(s):
+    return s.turn_order[s.turn_pos] if s.phase == "PLAYER" else "KING"
+
+
+def test_log_shared_between_steps_and_not_serialized():
+    s = make_smoke_state(seed=2)
+    rng = RNG(2)
+    states = [s]
+    for _ in range(10):
+        s = step(s, get_legal_actions(s, _actor(s))[0], rng)
+        states.append(s)
+
+    assert all(st.episode_log is states[0].episode_log for st in states)
+    lengths = [len(st.action_log) for st in states]
+    assert lengths == sorted(set(lengths))
+    assert "action_log" not in s.to_dict()
+    assert s.to_dict()["log_index"] == lengths[-1] == len(s.episode_log)
+
+
+def test_sibling_branches_keep_their_history():
+    s = make_smoke_state(seed=6)
+    rng = RNG(6)
+    legal = get_legal_actions(s, _actor(s))
+    a, b = legal[0], legal[-1]
+    sa = step(s, a, rng.fork("a"))
+    sb = step(s, b, rng.fork("b"))
+
+    assert sa.action_log[-1]["type"] == a.type.value
+    assert sb.action_log[-1]["type"] == b.type.value
+    assert s.action_log == []
+
+
+def test_ring_buffer_keeps_last_entries():
+    log = EpisodeLog(maxlen=3)
+    for i in range(5):
+        log.append({"i": i})
+    assert len(log) == 5
+    assert [e["i"] for e in log.entries_until(5)] == [2, 3, 4]
+    assert [e["i"] for e in log.entries_until(4)] == [2, 3]
+
+    off = EpisodeLog(maxlen=0)
+    off.append({"i": 0})
+    assert len(off) == 1 and off.entries_until(1) == []
+
+
+def test_from_dict_accepts_legacy_action_log():
+    s = make_smoke_state(seed=1)
+    data = s.to_dict()
+    data["action_log"] = [{"event": "X"}, {"event": "Y"}]
+    restored = GameState.from_dict(data)
+    assert restored.log_index == 2
+    assert [e["event"] for e in restored.action_log] == ["X", "Y"]
+
+
+def test_lookahead_does_not_write_to_episode_log():
+    s = make_smoke_state(seed=3)
+    rng = RNG(3)
+    for _ in range(4):
+        s = step(s, get_legal_actions(s, _actor(s))[0], rng)
+    log = s.episode_log
+    before = len(log)
+
+    root = s.lookahead()
+    legal = get_legal_actions(root, _actor(root))
+    branches = [step(root, a, rng.fork(str(i))) for i, a in enumerate(legal[:3])]
+    assert len(log) == before
+    for a, b in zip(legal, branches):
+        assert b.action_log[:before] == s.action_log
+        assert b.action_log[-1]["type"] == a.type.value
+
+    # El step real sigue escribiendo en el mismo log, sin bifurcarlo
+    s2 = step(s, legal[-1], rng)
+    assert s2.episode_log is log and len(log) == before + 1
+
+
+def test_branch_and_fork_read_base_history():
+    log = EpisodeLog(maxlen=4)
+    for i in range(3):
+        log.append({"i": i})
+    br = log.branch(2)
+    br.append({"i": "b2"})
+    br.append({"i": "b3"})
+    assert len(log) == 3 and len(br) == 4
+    assert [e["i"] for e in br.entries_until(4)] == [0, 1, "b2", "b3"]
+
+    sib = br.fork(3)
+    sib.append({"i": "s3"})
+    assert [e["i"] for e in sib.entries_until(4)] == [0, 1, "b2", "s3"]
+    assert [e["i"] for e in br.entries_until(4)] == [0, 1, "b2", "b3"]
+
+    br.append({"i": "b4"})
+    assert [e["i"] for e in br.entries_until(5)] == [1, "b2", "b3", "b4"]
@@ -0,0 +1,68 @@
+"""
+Tests para FlagStore: slots por entidad y shim de claves serializadas.
+"""
+import json
+import pickle
+
+from engine.flags import GOBLIN_HAS_LOOT, SKIP_TURN, TEMP_STAIRS, FlagStore, state_flags
+from engine.state import GameState
+from sim.runner import make_smoke_state
+
+
+def test_scoped_access_uses_legacy_keys():
+    flags = FlagStore()
+    flags.set_for(GOBLIN_HAS_LOOT, "DUENDE_1", True)
+    assert flags["GOBLIN_HAS_LOOT_DUENDE_1"] is True
+    assert flags.monster(GOBLIN_HAS_LOOT, "DUENDE_1") is True
+    assert flags.player(SKIP_TURN, "P1", False) is False
+    assert flags._slots == {GOBLIN_HAS_LOOT: {"DUENDE_1": True}} and not dict.__len__(flags)
+    assert flags.pop_for(GOBLIN_HAS_LOOT, "DUENDE_1") is True and not flags
+
+
+def test_legacy_keys_route_to_slots():
+    flags = FlagStore({"CROWN_YELLOW": True, "SKIP_TURN_P2": True})
+    flags["TEMP_STAIRS_F1_R2"] = {"round": 3}
+    assert flags.player(SKIP_TURN, "P2") is True
+    assert flags.room(TEMP_STAIRS, "F1_R2") == {"round": 3}
+    assert "SKIP_TURN_P2" in flags and "SKIP_TURN_P3" not in flags
+    assert len(flags) == 3 and set(flags) == {"CROWN_YELLOW", "SKIP_TURN_P2", "TEMP_STAIRS_F1_R2"}
+
+    expected = {"CROWN_YELLOW": True, "SKIP_TURN_P2": True, "TEMP_STAIRS_F1_R2": {"round": 3}}
+    assert flags == expected and dict(flags) == expected
+    assert json.loads(json.dumps(flags)) == expected
+    assert pickle.loads(pickle.dumps(flags)) == flags
+
+    del flags["SKIP_TURN_P2"]
+    assert flags.pop("TEMP_STAIRS_F1_R2") == {"round": 3}
+    assert flags == {"CROWN_YELLOW": True} and not flags._slots
+
+
+def test_plain_dict_flags_are_wrapped():
+    s = make_smoke_state(seed=1)
+    assert isinstance(s.flags, FlagStore)
+    s.flags = {"SKIP_TURN_P1": True}
+    assert state_flags(s).player(SKIP_TURN, "P1") is True
+    assert isinstance(s.flags, FlagStore)
+
+
+def test_clone_copies_store_and_roundtrips():
+    s = make_smoke_state(seed=2)
+    state_flags(s).set_for(TEMP_STAIRS, "F1_R1", {"round": 1, "pid": "P1"})
+    c = s.clone()
+    state_flags(c).set_for(TEMP_STAIRS, "F1_R1", {"round": 2, "pid": "P2"})
+    assert s.flags["TEMP_STAIRS_F1_R1"] == {"round": 1, "pid": "P1"}
+
+    restored = GameState.from_dict(s.to_dict())
+    assert isinstance(restored.flags, FlagStore)
+    assert restored.flags == s.flags
+
+
+def test_clone_does_not_share_mutable_flag_values():
+    s = make_smoke_state(seed=2)
+    s.flags["GOBLIN_LOOT_OBJECTS_DUENDE_1"] = ["BLUNT"]
+    state_flags(s).set_for(TEMP_STAIRS, "F1_R1", {"round": 1})
+    c = s.clone()
+    c.flags["GOBLIN_LOOT_OBJECTS_DUENDE_1"].append("COMPASS")
+    state_flags(c).room(TEMP_STAIRS, "F1_R1")["round"] = 2
+    assert s.flags["GOBLIN_LOOT_OBJECTS_DUENDE_1"] == ["BLUNT"]
+    assert s.flags["TEMP_STAIRS_F1_R1"] == {"round": 1}
@@ -0,0 +1,61 @@
+"""
+Tests para la caché de legalidad: versión por estado y sub-resultados cacheados.
+"""
+from engine.legality import get_legal_actions
+from engine.rng import RNG
+from engine.state import StatusInstance
+from engine.transition import step
+from engine.types import PlayerId
+from sim.runner import make_smoke_state
+
+
+def _actor(s):
+    return s.turn_order[s.turn_pos] if s.phase == "PLAYER" else "KING"
+
+
+def test_cached_matches_fresh_enumeration():
+    for seed in (1, 5, 11):
+        s = make_smoke_state(seed=seed)
+        rng = RNG(seed)
+        for _ in range(40):
+            if s.game_over:
+                break
+            actor = _actor(s)
+            cached = get_legal_actions(s, actor, cached=True)
+            assert list(cached) == list(get_legal_actions(s, actor))
+            assert list(get_legal_actions(s, actor, cached=True)) == list(cached)
+            s = step(s, rng.choice(cached), rng)
+
+
+def test_cache_follows_version():
+    s = make_smoke_state(seed=3)
+    rng = RNG(3)
+    actor = _actor(s)
+    before = list(get_legal_actions(s, actor, cached=True))
+
+    # La lista devuelta es del llamador: mutarla no afecta a la caché
+    get_legal_actions(s, actor, cached=True).clear()
+    assert list(get_legal_actions(s, actor, cached=True)) == before
+
+    s2 = step(s, before[0], rng)
+    assert list(get_legal_actions(s2, _actor(s2), cached=True)) == list(get_legal_actions(s2, _actor(s2)))
+    assert list(get_legal_actions(s, actor, cached=True)) == before
+
+    # Mutación a mano: touch() invalida
+    s.players[PlayerId(actor)].statuses.append(StatusInstance(status_id="TRAPPED", remaining_rounds=2))
+    s.touch()
+    assert [a.type.value for a in get_legal_actions(s, actor, cached=True)] == ["ESCAPE_TRAPPED"]
+
+
+def test_paranoia_blocks_moves_into_occupied_rooms():
+    s = make_smoke_state(seed=2)
+    p1, p2 = s.players[PlayerId("P1")], s.players[PlayerId("P2")]
+    s.turn_pos = s.turn_order.index(PlayerId("P1"))
+    s.remaining_actions[PlayerId("P1")] = 2
+    p1.room = "F1_P"
+    p2.room = "F1_R2"
+    assert any(a.data.get("to") == "F1_R2" for a in get_legal_actions(s, "P1"))
+
+    p2.statuses.append(StatusInstance(status_id="PARANOIA", remaining_rounds=2))
+    moves = [a.data["to"] for a in get_legal_actions(s, "P1") if a.type.value == "MOVE"]
+    assert "F1_R2" not in moves and moves
@@ -0,0 +1,70 @@
+"""
+Tests para los grafos de movimiento cacheados por configuración de escaleras.
+"""
+import itertools
+
+from engine.board import ROOM_IDS, room_id
+from engine.pathing import _graph_neighbors, find_nearest_empty_room
+from sim.pathing import _adjacency_ids, _bfs_next_step_ids, adjacency, bfs_next_step
+from sim.runner import make_smoke_state
+
+
+def _stair_layouts():
+    for r1, r2, r3 in itertools.product(range(1, 5), repeat=3):
+        yield {1: room_id(1, r1), 2: room_id(2, r2), 3: room_id(3, r3)}
+
+
+def test_next_hop_table_matches_bfs():
+    s = make_smoke_state(seed=1)
+    for stairs in _stair_layouts():
+        s.stairs = stairs
+        assert adjacency(s) == _adjacency_ids(s)
+        for start in ROOM_IDS:
+            assert bfs_next_step(s, start, start) is None
+            for goal in ROOM_IDS:
+                if goal == start:
+                    continue
+                assert bfs_next_step(s, start, goal) == _bfs_next_step_ids(s, start, goal)
+
+
+def test_next_hop_follows_stairs_changes():
+    s = make_smoke_state(seed=1)
+    s.stairs = {1: room_id(1, 1), 2: room_id(2, 1), 3: room_id(3, 1)}
+    assert bfs_next_step(s, room_id(1, 1), room_id(2, 3)) == "F2_P"
+    s.stairs = {1: room_id(1, 2), 2: room_id(2, 1), 3: room_id(3, 1)}
+    assert bfs_next_step(s, room_id(1, 1), room_id(2, 3)) == room_id(1, 2)
+
+
+def test_partial_or_foreign_stairs_match_bfs():
+    s = make_smoke_state(seed=1)
+    for stairs in ({1: room_id(1, 2), 3: room_id(3, 4)}, {1: room_id(1, 1), 2: "F9_R1"}, {}):
+        s.stairs = stairs
+        assert adjacency(s) == _adjacency_ids(s)
+        for start, goal in itertools.permutations(ROOM_IDS, 2):
+            assert bfs_next_step(s, start, goal) == _bfs_next_step_ids(s, start, goal)
+
+
+def test_find_nearest_empty_room_matches_generic_bfs():
+    from collections import deque
+
+    def reference(state, origin):
+        occupied = {p.room for p in state.players.values()}
+        queue, visited = deque([origin]), {origin}
+        while queue:
+            current = queue.popleft()
+            if current not in occupied and not current.endswith("_P"):
+                return current
+            for nb in _graph_neighbors(state, current):
+                if nb not in visited:
+                    visited.add(nb)
+                    queue.append(nb)
+        return origin
+
+    s = make_smoke_state(seed=2)
+    for i, stairs in enumerate(_stair_layouts()):
+        s.stairs = stairs
+        pids = list(s.players)
+        for k, pid in enumerate(pids):
+            s.players[pid].room = ROOM_IDS[(i + 3 * k) % len(ROOM_IDS)]
+        for origin in ROOM_IDS:
+            assert find_nearest_empty_room(s, origin) == reference(s, origin)
@@ -0,0 +1,64 @@
+"""
+Tests para PolicyContext: la memoria de las policies no vive en GameState.flags.
+"""
+from engine.actions import Action, ActionType
+from engine.config import Config
+from engine.rng import RNG
+from sim.mcts_policy import MCTSPlayerPolicy
+from sim.policies import GoalDirectedPlayerPolicy, HeuristicKingPolicy, _policy_record_action, _policy_update_stall
+from sim.policy_context import PolicyContext
+from sim.runner import make_smoke_state
+
+
+def test_choose_does_not_write_state_flags():
+    s = make_smoke_state(seed=3)
+    before = dict(s.flags)
+    ctx = PolicyContext()
+    pol = GoalDirectedPlayerPolicy(Config())
+    pol.set_context(ctx)
+    pol.choose(s, RNG(3))
+    assert dict(s.flags) == before
+    assert ctx.last_keys_total is not None and ctx.last_action
+
+
+def test_context_tracks_streak_and_stall():
+    ctx = PolicyContext()
+    take = Action(actor="P1", type=ActionType.USE_ARMORY_TAKE, data={})
+    _policy_record_action(ctx, "P1", take)
+    _policy_record_action(ctx, "P1", take)
+    assert ctx.armory_streak["P1"] == 2
+    _policy_record_action(ctx, "P1", Action(actor="P1", type=ActionType.END_TURN, data={}))
+    assert ctx.armory_streak["P1"] == 0 and ctx.last_action["P1"] == ActionType.END_TURN.value
+
+    assert [_policy_update_stall(ctx, k) for k in (1, 1, 2, 2)] == [1, 2, 0, 1]
+    ctx.reset()
+    assert ctx.last_keys_total is None and not ctx.armory_streak
+
+
+def test_policies_without_context_get_their_own():
+    a, b = HeuristicKingPolicy(Config()), HeuristicKingPolicy(Config())
+    assert a.context is a.context and a.context is not b.context
+
+
+def test_mcts_rollouts_get_independent_copies_of_episode_context():
+    s = make_smoke_state(seed=3)
+    episode = PolicyContext(last_keys_total=0, no_key_steps=5, win_ready_hits=1)
+    pol = MCTSPlayerPolicy(Config(), rollouts=2, depth=8)
+    pol.set_context(episode)
+
+    starts = []
+    begin = pol._begin_rollout
+
+    def spy():
+        begin()
+        ctx = pol._default_player_policy.context
+        starts.append((ctx, ctx.copy()))
+
+    pol._begin_rollout = spy
+    pol.choose(s, RNG(3))
+
+    (first, first_start), (second, second_start) = starts
+    assert first is not second and first is not episode
+    assert first.last_action  # el primer rollout jugó sobre su copia...
+    assert second_start == first_start == episode  # ...y el segundo no lo ve
+    assert episode.no_key_steps == 5 and not episode.last_action
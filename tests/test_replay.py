@@ -0,0 +1,59 @@
+"""
+Tests para el replay determinista verificado (sim.replay).
+"""
+import json
+
+from engine.config import Config
+from sim.replay import load_run, replay_run, run_config, seek
+from sim.replay_records import rebuild_state
+from sim.runner import run_episode
+
+
+def _run(tmp_path, max_steps=80):
+    out = tmp_path / "run.jsonl"
+    run_episode(max_steps=max_steps, seed=7, out_path=str(out), cfg=Config(REPLAY_KEYFRAME_EVERY=10))
+    return out
+
+
+def test_replay_verifies_every_step(tmp_path):
+    out = _run(tmp_path)
+    n = len(out.read_text(encoding="utf-8").splitlines())
+    report = replay_run(str(out))
+    assert report.ok, str(report.divergence)
+    assert report.steps == n
+
+
+def test_seek_starts_from_nearest_keyframe(tmp_path):
+    out = _run(tmp_path)
+    run = load_run(str(out))
+    state, rng = seek(run, 37)
+    assert state.to_dict() == rebuild_state(run[37][1]).to_dict()
+    assert rng.position == run[37][0]["rng_pos"]
+
+    report = replay_run(str(out), start=37, stop=50)
+    assert report.ok and report.steps == 13
+
+
+def test_reports_first_divergence(tmp_path):
+    out = _run(tmp_path)
+    lines = [json.loads(l) for l in out.read_text(encoding="utf-8").splitlines()]
+    lines[23]["summary_post"]["king_floor"] = 99
+    out.write_text("".join(json.dumps(r) + "\n" for r in lines), encoding="utf-8")
+
+    div = replay_run(str(out)).divergence
+    assert div is not None and div.step == 23
+    assert div.what == "summary" and div.path == "king_floor" and div.expected == 99
+
+
+def test_replay_uses_recorded_config(tmp_path):
+    out = tmp_path / "run.jsonl"
+    cfg = Config(REPLAY_KEYFRAME_EVERY=10, KEYS_TOTAL=7, HOUSE_LOSS_PER_ROUND=2)
+    run_episode(max_steps=60, seed=7, out_path=str(out), cfg=cfg)
+    run = load_run(str(out))
+    assert Config.from_dict(run[0][0]["config"]) == cfg
+    assert run_config(run) == cfg
+    assert replay_run(str(out)).ok
+
+    # Pisar la config grabada con otra regla hace divergir el replay
+    div = replay_run(str(out), overrides={"KEYS_TOTAL": 6}).divergence
+    assert div is not None and div.what == "summary" and div.path == "keys_in_game"
@@ -0,0 +1,38 @@
+"""
+Tests para el replay delta-codificado de los runs (sim.replay_records).
+"""
+import json
+
+from engine.config import Config
+from sim.replay_records import apply_delta, diff_state, iter_states, state_at
+from sim.runner import run_episode
+
+
+def _run(tmp_path, name, keyframe_every):
+    out = tmp_path / f"{name}.jsonl"
+    run_episode(max_steps=60, seed=5, out_path=str(out), cfg=Config(REPLAY_KEYFRAME_EVERY=keyframe_every))
+    return out
+
+
+def test_diff_apply_roundtrip_through_json():
+    old = {"a": 1, "b": {"x": [1, 2], "y": {"z": 0}}, "gone": True, "stairs": {1: "F1_R1"}}
+    new = {"a": 1, "b": {"x": [1, 2, 3], "y": {"z": 1}}, "new": None, "stairs": {}}
+    delta = json.loads(json.dumps(diff_state(old, new)))
+    assert "a" not in delta.get("set", {})
+    base = json.loads(json.dumps(old))
+    assert apply_delta(base, delta) == json.loads(json.dumps(new))
+    assert base == json.loads(json.dumps(old))  # base intacto
+
+
+def test_delta_run_rebuilds_every_state(tmp_path):
+    full = _run(tmp_path, "full", 1)
+    delta = _run(tmp_path, "delta", 10)
+    full_lines = [json.loads(l) for l in full.read_text(encoding="utf-8").splitlines()]
+    delta_lines = [json.loads(l) for l in delta.read_text(encoding="utf-8").splitlines()]
+    assert all("full_state" in r for r in full_lines)
+    assert sum("full_state" in r for r in delta_lines) == (len(delta_lines) + 9) // 10
+    assert delta.stat().st_size < full.stat().st_size
+
+    states = list(iter_states(str(delta)))
+    assert [s.to_dict() for s in states] == [s.to_dict() for s in iter_states(str(full))]
+    assert state_at(str(delta), 27).to_dict() == states[27].to_dict()
@@ -1,3 +1,5 @@
+import pytest
+
 from engine.rng import RNG
 
 
@@ -18,3 +20,80 @@ def test_rng_fork_deterministic():
 
     assert [a.randint(1, 100) for _ in range(10)] == [b.randint(1, 100) for _ in range(10)]
     assert [a.randint(1, 100) for _ in range(3)] != [c.randint(1, 100) for _ in range(3)]
+
+
+def test_rng_log_off_by_default():
+    r = RNG(5)
+    r.randint(1, 6)
+    r.sample([1, 2, 3], 2)
+    assert r.log == [] and r.counters == {}
+
+
+def test_rng_log_levels():
+    seq = lambda r: [r.randint(1, 6) for _ in range(10)]
+
+    counted = RNG(5, log_level="counters")
+    full = RNG(5, log_level="full")
+    ring = RNG(5, log_level="ring", log_size=3)
+    assert seq(counted) == seq(full) == seq(ring) == seq(RNG(5))
+
+    assert counted.counters == {"randint": 10} and len(counted.log) == 0
+    assert len(full.log) == 10
+    assert list(ring.log) == list(full.log)[-3:]
+    assert ring.fork("x").log_level == "ring"
+
+
+def test_rng_fork_counter_streams():
+    from engine.rng import CounterRandom
+
+    base = RNG(999)
+    child = base.fork("rollout-A")
+    assert child.algo == "counter"
+    # Key derivada solo de (seed, tag): no depende de la posición del padre
+    base.randint(1, 6)
+    again = base.fork("rollout-A")
+    assert [child.randint(1, 100) for _ in range(5)] == [again.randint(1, 100) for _ in range(5)]
+    assert base.fork(7).seed != base.fork(8).seed
+    assert base.fork("a").fork("b").seed != base.fork("b").fork("a").seed
+
+    # Stream fijo por key (bit-reproducible entre procesos)
+    r = CounterRandom(12345)
+    assert [r.getrandbits(64) for _ in range(2)] == [2454886589211414944, 3778200017661327597]
+    a, b = CounterRandom(1), CounterRandom(1)
+    assert [a.randint(1, 6) for _ in range(50)] == [b.randint(1, 6) for _ in range(50)]
+
+
+def test_rng_snapshot_restore_roundtrip():
+    import json
+
+    for rng in (RNG(77), RNG(77).fork("branch")):
+        for _ in range(13):
+            rng.randint(1, 6)
+        rng.last_king_d6, rng.last_king_d4 = 5, 2
+        snap = json.loads(json.dumps(rng.snapshot()))
+        expected = [rng.randint(1, 1000) for _ in range(10)]
+
+        restored = RNG.from_snapshot(snap)
+        assert [restored.randint(1, 1000) for _ in range(10)] == expected
+        assert (restored.last_king_d6, restored.last_king_d4) == (5, 2)
+
+        rng.restore(snap)
+        assert [rng.randint(1, 1000) for _ in range(10)] == expected
+
+
+def test_rng_seek():
+    stream = RNG(3).fork("seek")
+    for _ in range(20):
+        stream.randint(1, 6)
+    pos = stream.position
+    expected = [stream.randint(1, 1000) for _ in range(5)]
+
+    jumped = RNG(3).fork("seek")
+    jumped.seek(pos)
+    assert [jumped.randint(1, 1000) for _ in range(5)] == expected
+
+    jumped.seek(0)
+    assert jumped.randint(1, 1000) == RNG(3).fork("seek").randint(1, 1000)
+
+    with pytest.raises(ValueError):
+        RNG(3).seek(0)  # MT no tiene posición
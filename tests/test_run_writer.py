@@ -0,0 +1,43 @@
+"""
+Tests para la escritura en streaming de los runs (JsonlWriter + summary parcial).
+"""
+import json
+
+import pytest
+
+import sim.runner as runner
+from engine.config import Config
+from sim.metrics import JsonlWriter
+
+
+def test_writer_flushes_every_n_records(tmp_path):
+    path = tmp_path / "out.jsonl"
+    writer = JsonlWriter(str(path), flush_every=3)
+    flushed = [writer.write({"step": i}) for i in range(7)]
+    assert flushed == [False, False, True, False, False, True, False]
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 6
+    writer.close()
+    assert [json.loads(l)["step"] for l in path.read_text(encoding="utf-8").splitlines()] == list(range(7))
+
+
+def test_crashed_run_leaves_partial_output(tmp_path, monkeypatch):
+    real_record = runner.transition_record
+    calls = []
+
+    def crashing_record(**kwargs):
+        calls.append(1)
+        if len(calls) > 25:
+            raise RuntimeError("boom")
+        return real_record(**kwargs)
+
+    monkeypatch.setattr(runner, "transition_record", crashing_record)
+    out = tmp_path / "run.jsonl"
+    with pytest.raises(RuntimeError):
+        runner.run_episode(max_steps=200, seed=3, out_path=str(out), cfg=Config(RUN_FLUSH_EVERY=10))
+
+    # El writer se cierra con la excepción: quedan los 25 registros escritos
+    # y el summary parcial del finally, no el del último flush (step 20)
+    lines = out.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 25
+    summary = json.loads((tmp_path / "run_summary.json").read_text(encoding="utf-8"))
+    assert summary["partial"] is True and summary["steps"] == 25
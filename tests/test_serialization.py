@@ -194,3 +194,28 @@ def test_gamestate_roundtrip_comprehensive():
     assert "TREASURE_RING" in p.objects
 
 
+
+
+def test_slotted_entities_roundtrip():
+    """Entidades con __slots__: sin __dict__ y round-trip con metadata opcional"""
+    from engine.state import StatusInstance
+
+    original = make_game_state(
+        round=3,
+        players={"P1": {"room": "F1_R1", "sanity": 4}},
+        rooms={"F1_R1": {"cards": ["KEY"]}},
+    )
+    p = original.players[PlayerId("P1")]
+    p.statuses = [
+        StatusInstance(status_id="STUN", remaining_rounds=1),
+        StatusInstance(status_id="TRAPPED", remaining_rounds=3, metadata={"source_monster_id": "SPIDER"}),
+    ]
+
+    for entity in (p, p.statuses[0], original.rooms[RoomId("F1_R1")], original.rooms[RoomId("F1_R1")].deck):
+        assert not hasattr(entity, "__dict__")
+
+    restored = GameState.from_dict(original.to_dict())
+    statuses = restored.players[PlayerId("P1")].statuses
+    assert statuses[0].metadata is None
+    assert statuses[1].metadata == {"source_monster_id": "SPIDER"}
+    assert restored.to_dict() == original.to_dict()
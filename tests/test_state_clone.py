@@ -0,0 +1,69 @@
+"""
+Tests para GameState.clone(): structural sharing + copy-on-write de mazos.
+"""
+from engine.actions import Action
+from engine.legality import get_legal_actions
+from engine.rng import RNG
+from engine.state import DeckState
+from engine.transition import step
+from sim.runner import make_smoke_state
+
+
+def test_clone_shares_card_lists_until_write():
+    s = make_smoke_state(seed=3)
+    c = s.clone()
+
+    rid = next(r for r, room in s.rooms.items() if room.deck.remaining() > 1)
+    assert c.rooms[rid].deck is not s.rooms[rid].deck
+    assert c.rooms[rid].deck.cards is s.rooms[rid].deck.cards
+
+    before = list(s.rooms[rid].deck.cards)
+    c.rooms[rid].deck.put_bottom("KEY")
+    assert c.rooms[rid].deck.cards is not s.rooms[rid].deck.cards
+    assert s.rooms[rid].deck.cards == before
+
+
+def test_clone_preserves_room_box_aliasing():
+    s = make_smoke_state(seed=5)
+    c = s.clone()
+    for rid, bid in c.box_at_room.items():
+        if rid in c.rooms and bid in c.boxes:
+            assert c.rooms[rid].deck is c.boxes[bid].deck
+
+
+def test_clone_isolates_mutable_entities():
+    s = make_smoke_state(seed=7)
+    c = s.clone()
+    pid = next(iter(c.players))
+    c.players[pid].objects.append("COMPASS")
+    c.players[pid].sanity -= 1
+    c.flags["X"] = 1
+    assert s.players[pid].objects != c.players[pid].objects
+    assert s.players[pid].sanity == c.players[pid].sanity + 1
+    assert "X" not in s.flags
+
+
+def test_shuffle_remaining_does_not_leak_into_clone():
+    d = DeckState(cards=["A", "B", "C", "D", "E", "F"], top=1)
+    d2 = d.clone()
+    before = list(d.cards)
+    d2.shuffle_remaining(RNG(1))
+    assert d.cards == before
+    assert d2.cards[0] == "A"
+    assert sorted(d2.cards) == sorted(before)
+
+
+def test_step_leaves_input_untouched_and_matches_deep_clone():
+    s = make_smoke_state(seed=11)
+    rng = RNG(11)
+    for _ in range(40):
+        if s.game_over:
+            break
+        actor = s.turn_order[s.turn_pos] if s.phase == "PLAYER" else "KING"
+        legal = get_legal_actions(s, actor)
+        action = legal[0] if actor == "KING" else rng.choice(legal)
+        before = s.clone(deep=True).to_dict()
+        nxt = step(s, action, rng)
+        assert s.to_dict() == before
+        assert nxt.clone().to_dict() == nxt.clone(deep=True).to_dict()
+        s = nxt
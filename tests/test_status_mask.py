@@ -0,0 +1,61 @@
+"""
+Tests para el índice de estados por bits (has_status como un AND).
+"""
+from dataclasses import asdict
+
+from engine.effects.states_canonical import (
+    ALL_STATES,
+    STATE_ALIASES,
+    apply_status,
+    decrement_status_durations,
+    get_all_ids_for_state,
+    get_status,
+    has_status,
+    remove_status,
+    status_mask,
+)
+from engine.state import PlayerState, StatusInstance
+from engine.types import PlayerId, RoomId
+
+
+def _player():
+    return PlayerState(player_id=PlayerId("P1"), sanity=3, room=RoomId("F1_R1"))
+
+
+def test_bits_match_alias_sets():
+    ids = sorted(ALL_STATES | set(STATE_ALIASES) | {"CUSTOM_STATUS"})
+    for stored in ids:
+        p = _player()
+        p.statuses.append(StatusInstance(status_id=stored, remaining_rounds=2))
+        for query in ids:
+            assert has_status(p, query) == (stored in get_all_ids_for_state(query)), (stored, query)
+
+
+def test_mask_maintained_across_mutations():
+    p = _player()
+    apply_status(p, "PARANOID", duration=1)
+    apply_status(p, "TRAPPED", duration=3)
+    assert has_status(p, "PARANOIA") and has_status(p, "TRAPPED_SPIDER")
+    assert get_status(p, "PARANOIA").remaining_rounds == 1
+
+    assert decrement_status_durations(p) == ["PARANOIA"]
+    assert not has_status(p, "PARANOIA") and has_status(p, "TRAPPED")
+
+    # Ediciones directas de la lista también se reflejan
+    p.statuses.append(StatusInstance(status_id="SANIDAD", remaining_rounds=2))
+    assert has_status(p, "SANITY")
+    p.statuses = [st for st in p.statuses if st.status_id != "TRAPPED"]
+    assert not has_status(p, "TRAPPED")
+
+    assert remove_status(p, "SANIDAD")
+    assert status_mask(p) == 0
+
+
+def test_clone_keeps_index_and_serialization_ignores_it():
+    p = _player()
+    apply_status(p, "VANIDAD", duration=2)
+    c = p.clone()
+    assert has_status(c, "VANITY")
+    c.statuses.clear()
+    assert not has_status(c, "VANIDAD") and has_status(p, "VANIDAD")
+    assert "_status_index" not in asdict(p)
@@ -0,0 +1,52 @@
+"""
+Tests para el hash Zobrist del estado (GameState.zobrist / engine.zobrist).
+"""
+from engine.state import GameState
+from engine.zobrist import compute_zobrist, deck_hash
+from sim.runner import make_smoke_state
+
+
+def test_equal_positions_share_hash():
+    s = make_smoke_state(seed=3)
+    h = s.zobrist()
+    assert s.clone().zobrist() == h
+    assert GameState.from_dict(s.to_dict()).zobrist() == h
+    assert GameState.from_bytes(s.to_bytes()).zobrist() == h
+
+    # Historia y orden de inserción de dicts no cambian la posición
+    other = s.clone()
+    other.log_index += 5
+    other.flags = dict(reversed(list(s.flags.items())))
+    other.touch()
+    assert other.zobrist() == h
+
+
+def test_mutation_with_touch_changes_hash():
+    s = make_smoke_state(seed=3)
+    h = s.zobrist()
+    p = next(iter(s.players.values()))
+    p.sanity -= 1
+    assert s.zobrist() == h  # caché por versión: sin touch() no se entera
+    s.touch()
+    assert s.zobrist() != h
+    p.sanity += 1
+    s.touch()
+    assert s.zobrist() == h
+
+
+def test_deck_hash_is_incremental_and_shared_by_clones():
+    s = make_smoke_state(seed=4)
+    deck = next(b.deck for b in s.boxes.values() if b.deck.remaining() > 1)
+    before = deck_hash(deck)
+    c = s.clone()
+    c_deck = next(b.deck for b in c.boxes.values() if b.deck.cards is deck.cards)
+    c_deck.draw_top()
+    incremental = c_deck._zobrist[3]
+    c_deck._zobrist = None
+    assert deck_hash(c_deck) == incremental != before
+    assert deck_hash(deck) == before
+
+    c_deck.set_card(c_deck.top, "KEY" if c_deck.peek() != "KEY" else "CROWN")
+    assert c_deck._zobrist is None
+    c.touch()
+    assert c.zobrist() == compute_zobrist(c) != s.zobrist()
@@ -19,6 +19,8 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 from collections import defaultdict
 
+from sim.replay_records import iter_state_dicts
+
 try:
     import pandas as pd
     HAS_PANDAS = True
@@ -27,13 +29,24 @@ except ImportError:
 
 
 def load_jsonl(path: str) -> List[Dict[str, Any]]:
-    """Carga un archivo JSONL y retorna lista de registros."""
+    """
+    Carga un archivo JSONL y retorna lista de registros.
+
+    Los runs con replay delta-codificado (keyframes + state_delta) se
+    resuelven aquí: cada registro queda con su full_state (de solo lectura,
+    comparte estructura con los vecinos), así los filtros posteriores no
+    rompen la cadena de deltas.
+    """
     records = []
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
             if not line.strip():
                 continue
             records.append(json.loads(line))
+    for rec, state in iter_state_dicts(records):
+        if "state_delta" in rec:
+            rec["full_state"] = state
+            del rec["state_delta"]
     return records
 
 
@@ -0,0 +1,63 @@
+"""
+Benchmark de serialización de GameState: asdict+json vs codec binario.
+
+Sobre una población de estados (avanzados unos pasos desde el estado smoke
+con seeds distintas) mide, por estado:
+  - encode: json.dumps(state.to_dict())  vs  state.to_bytes()
+  - decode: GameState.from_dict(json.loads(...))  vs  GameState.from_bytes(...)
+  - tamaño en bytes
+
+Uso:
+    python tools/bench_codec.py --templates 50 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from engine.state import GameState
+from tools.bench_state import build_templates
+
+
+def _rate(fn, items, repeat: int) -> float:
+    """Mejor tiempo por ítem (µs) sobre `repeat` pasadas."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for it in items:
+            fn(it)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(items) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--templates", type=int, default=50)
+    ap.add_argument("--warmup-steps", type=int, default=30)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    states = build_templates(args.templates, args.warmup_steps)
+    blobs = [s.to_bytes() for s in states]
+    texts = [json.dumps(s.to_dict()) for s in states]
+    for s, b in zip(states, blobs):
+        assert GameState.from_bytes(b).to_dict() == GameState.from_dict(s.to_dict()).to_dict()
+
+    enc_json = _rate(lambda s: json.dumps(s.to_dict()), states, args.repeat)
+    enc_bin = _rate(lambda s: s.to_bytes(), states, args.repeat)
+    dec_json = _rate(lambda t: GameState.from_dict(json.loads(t)), texts, args.repeat)
+    dec_bin = _rate(GameState.from_bytes, blobs, args.repeat)
+    size_json = sum(len(t.encode("utf-8")) for t in texts) / len(texts)
+    size_bin = sum(len(b) for b in blobs) / len(blobs)
+
+    print(f"states: {len(states)}")
+    print(f"encode  asdict+json: {enc_json:8.1f} us   to_bytes:   {enc_bin:8.1f} us   ({enc_json / enc_bin:.1f}x)")
+    print(f"decode  json+from_dict: {dec_json:5.1f} us   from_bytes: {dec_bin:8.1f} us   ({dec_json / dec_bin:.1f}x)")
+    print(f"size    json: {size_json:,.0f} B   binary: {size_bin:,.0f} B   ({size_json / size_bin:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
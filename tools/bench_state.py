@@ -0,0 +1,80 @@
+"""
+Benchmark de memoria y throughput de clonado de GameState.
+
+Construye una población de N estados (avanzados unos pasos desde el estado
+smoke con seeds distintas) y mide:
+  - memoria retenida por la población (tracemalloc)
+  - clones estructurales por segundo y deepcopies por segundo
+
+Uso:
+    python tools/bench_state.py --states 10000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.getcwd())
+
+from engine.legality import get_legal_actions
+from engine.rng import RNG
+from engine.systems.sacrifice import pending_sacrifice_pid
+from engine.transition import step
+from sim.runner import make_smoke_state
+
+
+def _actor(s):
+    pending = pending_sacrifice_pid(s)
+    if pending:
+        return pending
+    return s.turn_order[s.turn_pos] if s.phase == "PLAYER" else "KING"
+
+
+def build_templates(n_templates: int, warmup_steps: int):
+    templates = []
+    for seed in range(1, n_templates + 1):
+        s = make_smoke_state(seed=seed)
+        rng = RNG(seed)
+        for _ in range(warmup_steps):
+            if s.game_over:
+                break
+            s = step(s, rng.choice(get_legal_actions(s, _actor(s))), rng)
+        templates.append(s)
+    return templates
+
+
+def measure_population(templates, n_states: int):
+    """Memoria de una población de estados independientes (deep clones)."""
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    population = [templates[i % len(templates)].clone(deep=True) for i in range(n_states)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return population, current - base
+
+
+def measure_clone_rate(population, deep: bool) -> float:
+    t0 = time.perf_counter()
+    for s in population:
+        s.clone(deep=deep)
+    return len(population) / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--states", type=int, default=10000)
+    ap.add_argument("--templates", type=int, default=50)
+    ap.add_argument("--warmup-steps", type=int, default=30)
+    args = ap.parse_args()
+
+    templates = build_templates(args.templates, args.warmup_steps)
+    population, mem = measure_population(templates, args.states)
+    print(f"states: {len(population)}")
+    print(f"population memory: {mem / 1e6:.1f} MB ({mem / len(population) / 1024:.1f} KiB/state)")
+    print(f"structural clone: {measure_clone_rate(population, deep=False):,.0f} states/s")
+    print(f"deep clone:       {measure_clone_rate(population, deep=True):,.0f} states/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ import argparse
 import subprocess
 import json
 import hashlib
+import os
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -35,8 +36,20 @@ def resolve_device(device_cfg: str) -> str:
     return device_cfg
 
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _subprocess_env(env=None) -> dict:
+    # Los scripts de tools/ importan engine/sim: raíz del repo en PYTHONPATH
+    env = dict(os.environ if env is None else env)
+    paths = [str(REPO_ROOT)] + [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p]
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+    return env
+
+
 def run_subprocess(cmd, cwd: Path = None, env=None, capture: bool = False):
     print(f"$ {' '.join(cmd)}")
+    env = _subprocess_env(env)
     res = subprocess.run([sys.executable, *cmd], cwd=cwd, env=env, capture_output=capture, text=True)
     if res.returncode != 0:
         print(res.stdout)
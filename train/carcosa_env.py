@@ -165,8 +165,8 @@ class CarcosaEnv(gym.Env):
             "round": self.state.round,
             "outcome": self.state.outcome,
             "step": self.step_count,
-            "keys_in_hand": sum(p.keys for p in self.state.players.values()),
-            "min_sanity": min(p.sanity for p in self.state.players.values()),
+            "keys_in_hand": self.state.aggregates.keys_in_hand,
+            "min_sanity": self.state.aggregates.min_sanity,
         }
     
     def reset(
@@ -236,8 +236,8 @@ class CarcosaEnv(gym.Env):
                 action = Action(actor=actor, type=ActionType.END_TURN, data={})
         
         # Estado previo para calcular reward
-        prev_keys = sum(p.keys for p in self.state.players.values())
-        prev_sanity = sum(p.sanity for p in self.state.players.values())
+        prev_keys = self.state.aggregates.keys_in_hand
+        prev_sanity = self.state.aggregates.sanity_total
         
         # Ejecutar transición
         next_state = step(self.state, action, self.rng, self.cfg)
@@ -276,12 +276,12 @@ class CarcosaEnv(gym.Env):
         reward = 0.0
         
         # Progreso de llaves
-        curr_keys = sum(p.keys for p in next_state.players.values())
+        curr_keys = next_state.aggregates.keys_in_hand
         if curr_keys > prev_keys:
             reward += self.reward_key * (curr_keys - prev_keys)
         
         # Pérdida de sanity
-        curr_sanity = sum(p.sanity for p in next_state.players.values())
+        curr_sanity = next_state.aggregates.sanity_total
         if curr_sanity < prev_sanity:
             reward += self.reward_sanity_loss * (prev_sanity - curr_sanity)
         
@@ -35,6 +35,7 @@ from sim.policies import (
     RandomPolicy,
     get_king_policy,
 )
+from sim.policy_context import PolicyContext
 
 from train.model import CarcosaPolicyNet, load_model
 
@@ -240,8 +241,8 @@ def run_evaluation_episode(
         "outcome": state.outcome or "TIMEOUT",
         "steps": step_idx,
         "rounds": state.round,
-        "keys_in_hand": sum(p.keys for p in state.players.values()),
-        "min_sanity": min(p.sanity for p in state.players.values()),
+        "keys_in_hand": state.aggregates.keys_in_hand,
+        "min_sanity": state.aggregates.min_sanity,
     }
 
 
@@ -270,6 +271,10 @@ def evaluate_policy(
     }
     
     for ep in range(episodes):
+        # Memoria de policies nueva por episodio (sim.policy_context)
+        for pol in (policy, king_policy):
+            if hasattr(pol, "set_context"):
+                pol.set_context(PolicyContext())
         ep_result = run_evaluation_episode(
             policy=policy,
             king_policy=king_policy,